@@ -0,0 +1,14 @@
+"""
+HTTP control API for the RGB Controller.
+This file makes 'api' a Python package.
+"""
+from .server import APIServer, create_app, create_api_server
+from .async_server import AsyncAPIServer
+from .client import APIClient, api_client
+from .stream import FrameFeed, StreamOutputDevice
+from .sse import FrameEventCache
+from .websocket import FrameStreamClient
+from .realtime import RealtimeReceiver
+from .mqtt import MQTTBridge, TopicTrie
+from .mqtt_registry import MQTTTopicRegistry, mqtt_registry
+__all__ = ['APIServer', 'create_app', 'create_api_server', 'AsyncAPIServer', 'APIClient', 'api_client', 'FrameFeed', 'StreamOutputDevice', 'FrameEventCache', 'FrameStreamClient', 'RealtimeReceiver', 'MQTTBridge', 'TopicTrie', 'MQTTTopicRegistry', 'mqtt_registry']
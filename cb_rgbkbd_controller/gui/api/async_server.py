@@ -0,0 +1,550 @@
+#!/usr/bin/env python3
+"""
+Asyncio server mode for the local HTTP control API
+
+Serves the same routes as the Flask server from a single event loop
+thread. Colour submissions are merged into the current frame and written
+by one writer task: while a hardware write is in flight, later requests
+coalesce into the next write, so the newest state always wins and a
+burst of N requests costs one or two writes instead of N. Requests that
+wait for their write are bounded by max_pending; beyond that the server
+answers 429 instead of queueing.
+"""
+
+import json
+import base64
+import asyncio
+import hashlib
+import logging
+import threading
+from http import HTTPStatus
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from ..core.constants import (
+    API_HOST, API_PORT, API_ASYNC_MAX_PENDING, API_ASYNC_MAX_BODY, SSE_KEEPALIVE_INTERVAL
+)
+from ..core.frame_codec import FRAME_MIME_TYPE, StreamCodec, encode_frame, unpack_frame
+from ..core.rgb_color import RGBColor
+from ..utils.frame_timing import frame_latency_tracker
+from ..utils.metrics import METRICS_CONTENT_TYPE, metrics_registry
+from .server import (
+    APIServer, api_requests, parse_zone_updates, parse_zone_color, parse_json_frame, parse_binary_frame
+)
+from .cache import CachedDocument, etag_matches
+from .websocket import WEBSOCKET_PATH
+from .sse import SSE_PATH, SSE_MIME_TYPE, SSE_HEADERS, SSE_KEEPALIVE, parse_rate, next_send_time
+
+WEBSOCKET_GUID = b'258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+
+_OP_CONTINUATION = 0x0
+_OP_TEXT = 0x1
+_OP_BINARY = 0x2
+_OP_CLOSE = 0x8
+_OP_PING = 0x9
+_OP_PONG = 0xA
+
+# (status, content type, body, extra headers)
+Reply = Tuple[int, str, bytes, Dict[str, str]]
+
+
+def _json_reply(payload: Any, status: int = 200, headers: Optional[Dict[str, str]] = None) -> Reply:
+    return status, 'application/json', json.dumps(payload).encode('utf-8'), headers or {}
+
+
+def _ws_frame(opcode: int, payload: bytes) -> bytes:
+    length = len(payload)
+    if length < 126:
+        header = bytes((0x80 | opcode, length))
+    elif length < 65536:
+        header = bytes((0x80 | opcode, 126)) + length.to_bytes(2, 'big')
+    else:
+        header = bytes((0x80 | opcode, 127)) + length.to_bytes(8, 'big')
+    return header + payload
+
+
+def _unmask(payload: bytes, mask: bytes) -> bytes:
+    if not payload:
+        return payload
+    # XOR as one big integer instead of byte by byte
+    key = (mask * (len(payload) // 4 + 1))[:len(payload)]
+    return (int.from_bytes(payload, 'big') ^ int.from_bytes(key, 'big')).to_bytes(len(payload), 'big')
+
+
+class AsyncAPIServer(APIServer):
+    """
+    API server running on an asyncio event loop in a background thread
+
+    Hardware writes run on a single executor thread, so a slow write never
+    blocks request parsing, and no thread is created per request.
+    """
+
+    def __init__(self, hardware=None, effect_manager=None, host: str = API_HOST,
+                 port: int = API_PORT, max_pending: int = API_ASYNC_MAX_PENDING,
+                 parent_logger: Optional[logging.Logger] = None):
+        """
+        Initialize asyncio API server
+
+        Args:
+            hardware: HardwareController instance
+            effect_manager: EffectManager instance
+            host: Interface to bind
+            port: TCP port to bind
+            max_pending: Requests allowed to wait for a write before 429
+            parent_logger: Parent logger instance
+        """
+        super().__init__(hardware, effect_manager, host, port, parent_logger)
+        self.logger = (parent_logger.getChild('AsyncAPIServer')
+                       if parent_logger else logging.getLogger('AsyncAPIServer'))
+        self.max_pending = max_pending
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stopped: Optional[asyncio.Event] = None
+        self._ready = threading.Event()
+        self._bound_port: Optional[int] = None
+        self._writer_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="AsyncAPIWriter")
+        self._writer_task: Optional[asyncio.Task] = None
+        self._dirty = False
+        self._waiters: List[asyncio.Future] = []
+        self._frame_event: Optional[asyncio.Event] = None
+        self._connections = set()
+        self._routes: Dict[Tuple[str, str], Callable[..., Awaitable[Reply]]] = {
+            ('GET', '/status'): self._status,
+            ('GET', '/effects'): self._effects,
+            ('POST', '/set_zone_color'): self._set_zone_color,
+            ('POST', '/set_zones'): self._set_zones,
+            ('GET', '/frame'): self._frame,
+            ('POST', '/set_frame'): self._set_frame,
+            ('GET', '/latency'): self._latency,
+            ('POST', '/latency/reset'): self._latency_reset,
+            ('GET', '/metrics'): self._metrics,
+        }
+
+        self.requests_served = 0
+        self.requests_rejected = 0
+        self.submissions = 0
+        self.writes = 0
+
+    def _build_app(self):
+        # Routes are dispatched by the event loop, not Flask
+        return None
+
+    @property
+    def bound_port(self) -> int:
+        return self._bound_port if self._bound_port is not None else self.port
+
+    def start(self) -> bool:
+        """
+        Start the event loop thread and bind the listening socket
+
+        Returns:
+            bool: True if the server is listening
+        """
+        if self.is_running:
+            return True
+        self._ready.clear()
+        self._bound_port = None
+        self._thread = threading.Thread(target=self._run_loop, name="AsyncAPIServer", daemon=True)
+        self._thread.start()
+        self._ready.wait(timeout=5.0)
+        if self._bound_port is None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+            return False
+
+        fanout = getattr(self.effect_manager, 'output_fanout', None) if self.effect_manager else None
+        if fanout is not None:
+            self.attach_fanout(fanout)
+        self.logger.info(f"Async API server listening on http://{self.host}:{self.bound_port}")
+        return True
+
+    def stop(self):
+        """Stop serving and wait for the loop thread"""
+        if self._loop is not None and self._stopped is not None:
+            self._loop.call_soon_threadsafe(self._stopped.set)
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+        self.feed.wake()
+
+    def _run_loop(self):
+        loop = asyncio.new_event_loop()
+        self._loop = loop
+        try:
+            loop.run_until_complete(self._serve())
+            # Let connection handlers and the writer task unwind before closing
+            pending = asyncio.all_tasks(loop)
+            for task in pending:
+                task.cancel()
+            if pending:
+                loop.run_until_complete(asyncio.wait(pending))
+        finally:
+            loop.close()
+            self._loop = None
+
+    async def _serve(self):
+        self._stopped = asyncio.Event()
+        self._frame_event = asyncio.Event()
+        try:
+            server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        except OSError as e:
+            self.logger.error(f"Could not bind async API server to {self.host}:{self.port}: {e}")
+            self._ready.set()
+            return
+        self._bound_port = server.sockets[0].getsockname()[1]
+        self.feed.add_listener(self._on_feed_published)
+        self._ready.set()
+        try:
+            await self._stopped.wait()
+        finally:
+            self.feed.remove_listener(self._on_feed_published)
+            server.close()
+            for writer in list(self._connections):
+                writer.close()
+            # Release requests still waiting on a hardware write
+            waiters, self._waiters = self._waiters, []
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_result(False)
+            await server.wait_closed()
+
+    def _on_feed_published(self):
+        # Runs on whichever thread published; hop onto the loop
+        loop = self._loop
+        if loop is not None:
+            try:
+                loop.call_soon_threadsafe(self._wake_subscribers)
+            except RuntimeError:
+                # Loop closed while we were publishing
+                pass
+
+    def _wake_subscribers(self):
+        event, self._frame_event = self._frame_event, asyncio.Event()
+        event.set()
+
+    # Coalescing writer
+
+    def _submit(self, updates: Optional[Dict[int, RGBColor]] = None,
+                frame: Optional[List[RGBColor]] = None, wait: bool = True) -> Optional[asyncio.Future]:
+        """
+        Merge a submission into the frame and schedule a write
+
+        Returns:
+            Optional[asyncio.Future]: Resolves to the write result when wait
+            is True; None if the pending queue is full (nothing is applied)
+        """
+        if wait and len(self._waiters) >= self.max_pending:
+            self.requests_rejected += 1
+            return None
+        with self._frame_lock:
+            if frame is not None:
+                self.frame = list(frame) + [RGBColor() for _ in range(len(self.frame) - len(frame))]
+            if updates:
+                for index, color in updates.items():
+                    self.frame[index] = color
+        self.submissions += 1
+        self._dirty = True
+
+        future = None
+        if wait:
+            future = self._loop.create_future()
+            self._waiters.append(future)
+        if self._writer_task is None or self._writer_task.done():
+            self._writer_task = self._loop.create_task(self._drain_writes())
+        return future
+
+    async def _drain_writes(self):
+        while self._dirty:
+            self._dirty = False
+            waiters, self._waiters = self._waiters, []
+            with self._frame_lock:
+                snapshot = list(self.frame)
+            try:
+                success = await self._loop.run_in_executor(self._writer_executor, self._write_frame, snapshot)
+            except Exception as e:
+                self.logger.error(f"Frame write failed: {e}")
+                success = False
+            self.writes += 1
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_result(bool(success))
+
+    async def _apply(self, updates: Optional[Dict[int, RGBColor]] = None,
+                     frame: Optional[List[RGBColor]] = None) -> Optional[bool]:
+        future = self._submit(updates=updates, frame=frame)
+        if future is None:
+            return None
+        return await future
+
+    def _busy_reply(self) -> Reply:
+        return _json_reply({'error': 'Too many pending updates'}, 429, {'Retry-After': '1'})
+
+    # Routes
+
+    @staticmethod
+    def _document_reply(document: CachedDocument, headers: Dict[str, str]) -> Reply:
+        etag, body = document.get()
+        reply_headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+        if etag_matches(headers.get('if-none-match'), etag):
+            return 304, 'application/json', b'', reply_headers
+        return 200, 'application/json', body, reply_headers
+
+    async def _status(self, headers, body) -> Reply:
+        return self._document_reply(self.status_document, headers)
+
+    async def _effects(self, headers, body) -> Reply:
+        return self._document_reply(self.effects_document, headers)
+
+    async def _set_zone_color(self, headers, body) -> Reply:
+        try:
+            updates = parse_zone_color(self._json_body(body))
+        except ValueError as e:
+            return _json_reply({'error': str(e)}, 400)
+        return await self._apply_reply(updates=updates)
+
+    async def _set_zones(self, headers, body) -> Reply:
+        try:
+            updates = parse_zone_updates(self._json_body(body))
+        except ValueError as e:
+            return _json_reply({'error': str(e)}, 400)
+        return await self._apply_reply({'zones': len(updates)}, updates=updates)
+
+    async def _frame(self, headers, body) -> Reply:
+        packed = self.get_packed_frame()
+        if FRAME_MIME_TYPE in headers.get('accept', ''):
+            return 200, FRAME_MIME_TYPE, encode_frame(packed), {}
+        return _json_reply({'colors': [color.to_hex() for color in unpack_frame(packed)]})
+
+    async def _set_frame(self, headers, body) -> Reply:
+        try:
+            if headers.get('content-type', '').split(';')[0].strip() == FRAME_MIME_TYPE:
+                frame = parse_binary_frame(body, self.get_packed_frame())
+            else:
+                frame = parse_json_frame(self._json_body(body))
+        except ValueError as e:
+            return _json_reply({'error': str(e)}, 400)
+        return await self._apply_reply({'keys': len(frame)}, frame=frame)
+
+    async def _latency(self, headers, body) -> Reply:
+        return _json_reply(frame_latency_tracker.get_stats())
+
+    async def _latency_reset(self, headers, body) -> Reply:
+        frame_latency_tracker.reset()
+        return _json_reply({'success': True})
+
+    async def _metrics(self, headers, body) -> Reply:
+        return 200, METRICS_CONTENT_TYPE, metrics_registry.render().encode('utf-8'), {}
+
+    async def _apply_reply(self, extra: Optional[Dict[str, Any]] = None, **submission) -> Reply:
+        if not self.output_available:
+            return _json_reply({'error': 'Hardware not available'}, 503)
+        success = await self._apply(**submission)
+        if success is None:
+            return self._busy_reply()
+        return _json_reply({'success': success, **(extra or {})})
+
+    @staticmethod
+    def _json_body(body: bytes) -> Any:
+        # Mirrors Flask's get_json(silent=True)
+        try:
+            return json.loads(body) if body else {}
+        except ValueError:
+            return {}
+
+    # Connection handling
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._connections.add(writer)
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+                try:
+                    request_line, *header_lines = head[:-4].decode('latin-1').split('\r\n')
+                    method, target, version = request_line.split(' ', 2)
+                    headers = {name.strip().lower(): value.strip() for name, value in
+                               (line.split(':', 1) for line in header_lines if ':' in line)}
+                    length = int(headers.get('content-length') or 0)
+                except ValueError:
+                    await self._write_reply(writer, _json_reply({'error': 'Malformed request'}, 400), False)
+                    break
+                if length > API_ASYNC_MAX_BODY:
+                    await self._write_reply(writer, _json_reply({'error': 'Request too large'}, 413), False)
+                    break
+                body = await reader.readexactly(length) if length else b''
+                path = target.split('?', 1)[0]
+
+                if path == WEBSOCKET_PATH and headers.get('upgrade', '').lower() == 'websocket':
+                    await self._websocket(reader, writer, headers, target)
+                    break
+                if path == SSE_PATH and method == 'GET':
+                    await self._event_stream(writer, target)
+                    break
+
+                handler = self._routes.get((method, path))
+                route = path
+                if handler is not None:
+                    reply = await handler(headers, body)
+                elif any(route_path == path for _, route_path in self._routes):
+                    reply = _json_reply({'error': 'Method not allowed'}, 405)
+                else:
+                    reply = _json_reply({'error': 'Not found'}, 404)
+                    route = 'unmatched'
+                self.requests_served += 1
+                api_requests.labels(route, method, reply[0]).inc()
+
+                keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                await self._write_reply(writer, reply, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except asyncio.CancelledError:
+            # Server shutting down; end the handler quietly
+            pass
+        finally:
+            self._connections.discard(writer)
+            writer.close()
+
+    async def _write_reply(self, writer: asyncio.StreamWriter, reply: Reply, keep_alive: bool):
+        status, content_type, body, extra_headers = reply
+        lines = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}",
+                 f"Content-Type: {content_type}",
+                 f"Content-Length: {len(body)}",
+                 f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        lines.extend(f"{name}: {value}" for name, value in extra_headers.items())
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body)
+        await writer.drain()
+
+    # WebSocket frame stream (same protocol as the Flask /ws/frames route)
+
+    async def _websocket(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                         headers: Dict[str, str], target: str):
+        key = headers.get('sec-websocket-key', '').encode('latin-1')
+        accept = base64.b64encode(hashlib.sha1(key + WEBSOCKET_GUID).digest()).decode('ascii')
+        writer.write(("HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\n"
+                      f"Connection: Upgrade\r\nSec-WebSocket-Accept: {accept}\r\n\r\n").encode('latin-1'))
+        await writer.drain()
+
+        query = target.split('?', 1)[1] if '?' in target else ''
+        params = dict(part.split('=', 1) for part in query.split('&') if '=' in part)
+        try:
+            codec = StreamCodec.from_params(params)
+        except ValueError as e:
+            self.logger.debug(f"Rejecting frame stream: {e}")
+            writer.write(_ws_frame(_OP_CLOSE, (1008).to_bytes(2, 'big')))
+            return
+        sender = None
+        if params.get('emit', '1') != '0':
+            sender = self._loop.create_task(self._ws_send_loop(writer, codec))
+
+        message = bytearray()
+        binary = False
+        try:
+            while True:
+                first, second = await reader.readexactly(2)
+                opcode, length = first & 0x0F, second & 0x7F
+                if length == 126:
+                    length = int.from_bytes(await reader.readexactly(2), 'big')
+                elif length == 127:
+                    length = int.from_bytes(await reader.readexactly(8), 'big')
+                if length > API_ASYNC_MAX_BODY:
+                    break
+                mask = await reader.readexactly(4) if second & 0x80 else b''
+                payload = await reader.readexactly(length)
+                if mask:
+                    payload = _unmask(payload, mask)
+
+                if opcode == _OP_CLOSE:
+                    writer.write(_ws_frame(_OP_CLOSE, payload[:2]))
+                    break
+                if opcode == _OP_PING:
+                    writer.write(_ws_frame(_OP_PONG, payload))
+                    continue
+                if opcode in (_OP_BINARY, _OP_TEXT, _OP_CONTINUATION):
+                    if opcode != _OP_CONTINUATION:
+                        message = bytearray(payload) if opcode == _OP_BINARY else bytearray()
+                        binary = opcode == _OP_BINARY
+                    else:
+                        message += payload
+                    if not first & 0x80 or not binary:
+                        continue
+                    try:
+                        packed = codec.decode(bytes(message))
+                    except ValueError as e:
+                        self.logger.debug(f"Ignoring malformed frame message: {e}")
+                        continue
+                    # Streams are latest-wins: never rejected, never awaited
+                    self._submit(frame=unpack_frame(packed), wait=False)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            if sender is not None:
+                sender.cancel()
+
+    async def _ws_send_loop(self, writer: asyncio.StreamWriter, codec: StreamCodec):
+        version, packed = self.feed.latest()
+        try:
+            writer.write(_ws_frame(_OP_BINARY, codec.encode(packed)))
+            await writer.drain()
+            while True:
+                event = self._frame_event
+                if self.feed.version == version:
+                    await event.wait()
+                version, packed = self.feed.latest()
+                writer.write(_ws_frame(_OP_BINARY, codec.encode(packed)))
+                await writer.drain()
+        except (asyncio.CancelledError, ConnectionError):
+            pass
+
+    # Server-sent events (same stream as the Flask /events/frames route)
+
+    async def _event_stream(self, writer: asyncio.StreamWriter, target: str):
+        query = target.split('?', 1)[1] if '?' in target else ''
+        params = dict(part.split('=', 1) for part in query.split('&') if '=' in part)
+        interval = 1.0 / parse_rate(params.get('fps'))
+        lines = ["HTTP/1.1 200 OK", f"Content-Type: {SSE_MIME_TYPE}", "Connection: close"]
+        lines.extend(f"{name}: {value}" for name, value in SSE_HEADERS.items())
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+
+        events = self.frame_events
+        version, packed = self.feed.latest()
+        try:
+            writer.write(b'retry: 1000\n' + events.event(version, packed))
+            await writer.drain()
+            sent_at = self._loop.time()
+            while True:
+                event = self._frame_event
+                if self.feed.version == version:
+                    try:
+                        await asyncio.wait_for(event.wait(), SSE_KEEPALIVE_INTERVAL)
+                    except asyncio.TimeoutError:
+                        writer.write(SSE_KEEPALIVE)
+                        await writer.drain()
+                        continue
+                delay = next_send_time(sent_at, interval) - self._loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                latest_version, latest = self.feed.latest()
+                writer.write(events.event(latest_version, latest, version, packed))
+                await writer.drain()
+                version, packed = latest_version, latest
+                sent_at = self._loop.time()
+        except ConnectionError:
+            pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get request and write counters
+
+        Returns:
+            Dict[str, Any]: Served, rejected, submitted and written counts
+        """
+        return {
+            'requests_served': self.requests_served,
+            'requests_rejected': self.requests_rejected,
+            'submissions': self.submissions,
+            'writes': self.writes,
+            'pending': len(self._waiters)
+        }
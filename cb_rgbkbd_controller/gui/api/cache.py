@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""Versioned JSON documents with ETags for conditional GET"""
+
+import json
+import secrets
+import threading
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+from ..utils.metrics import cache_requests
+
+_document_hits = cache_requests.labels('api_document', 'hit')
+_document_misses = cache_requests.labels('api_document', 'miss')
+
+
+class CachedDocument:
+    """
+    JSON document rebuilt only when the state it describes changes
+
+    key_func returns a cheap, hashable summary of that state and
+    build_func turns the summary into the document. While the key stays
+    the same, requests reuse the serialized body and its ETag; a changed
+    key bumps the version, which changes the ETag. The ETag also carries a
+    per-process token so versions restarting at 1 after a relaunch never
+    match a client's stale tag.
+    """
+
+    def __init__(self, name: str, key_func: Callable[[], Hashable], build_func: Callable[[Any], Any]):
+        """
+        Initialize cached document
+
+        Args:
+            name: Document name, used as the ETag prefix
+            key_func: Returns the state summary the document depends on
+            build_func: Builds the JSON-serializable document from the key
+        """
+        self.name = name
+        self.key_func = key_func
+        self.build_func = build_func
+        self.version = 0
+        self._token = secrets.token_hex(4)
+        self._lock = threading.Lock()
+        self._key: Optional[Hashable] = None
+        self._body = b''
+        self._etag = ''
+
+    def get(self) -> Tuple[str, bytes]:
+        """
+        Get the current document
+
+        Returns:
+            Tuple[str, bytes]: (quoted ETag, JSON body)
+        """
+        key = self.key_func()
+        with self._lock:
+            if self.version and key == self._key:
+                _document_hits.inc()
+                return self._etag, self._body
+            _document_misses.inc()
+            self._body = json.dumps(self.build_func(key)).encode('utf-8')
+            self._key = key
+            self.version += 1
+            self._etag = f'"{self.name}-{self._token}-{self.version}"'
+            return self._etag, self._body
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check an If-None-Match header against an ETag
+
+    Uses the weak comparison RFC 7232 prescribes for If-None-Match.
+
+    Args:
+        if_none_match: Header value, may be None
+        etag: Quoted ETag of the current representation
+
+    Returns:
+        bool: True if the client's copy is current
+    """
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate == '*':
+            return True
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""Pooled keep-alive client for the local HTTP control API"""
+
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ..core.constants import (
+    API_HOST, API_PORT, API_CLIENT_TIMEOUT, API_CLIENT_RETRIES,
+    API_CLIENT_BACKOFF, API_CLIENT_POOL_SIZE
+)
+from ..core.frame_codec import FRAME_MIME_TYPE, encode_frame, decode_frame
+
+# Gateway errors are retried; the API's own 4xx/503 answers are final
+RETRY_STATUS_CODES = (502, 504)
+
+
+class APIClient:
+    """
+    HTTP client sharing one connection pool across all GUI callers
+
+    A single requests.Session keeps connections to the API server alive,
+    so colour updates no longer pay for a TCP handshake each. Setting a
+    colour is idempotent, so POSTs are retried as well as GETs.
+    """
+
+    def __init__(self, base_url: Optional[str] = None, timeout: float = API_CLIENT_TIMEOUT,
+                 retries: int = API_CLIENT_RETRIES, backoff: float = API_CLIENT_BACKOFF,
+                 pool_size: int = API_CLIENT_POOL_SIZE, parent_logger: Optional[logging.Logger] = None):
+        """
+        Initialize API client
+
+        Args:
+            base_url: Server root, defaults to http://API_HOST:API_PORT
+            timeout: Per-request timeout in seconds
+            retries: Retries for connection errors and gateway failures
+            backoff: Exponential backoff factor between retries
+            pool_size: Maximum pooled connections (and async workers)
+            parent_logger: Parent logger instance
+        """
+        self.logger = (parent_logger.getChild('APIClient')
+                       if parent_logger else logging.getLogger('APIClient'))
+        self.base_url = (base_url or f"http://{API_HOST}:{API_PORT}").rstrip('/')
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.pool_size = pool_size
+        self._lock = threading.Lock()
+        self._session = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._latest: Dict[str, Any] = {}
+        self._draining: Dict[str, bool] = {}
+        self._documents: Dict[str, Tuple[str, Any]] = {}
+
+    def _get_session(self):
+        with self._lock:
+            if self._session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                from urllib3.util.retry import Retry
+
+                retry = Retry(total=self.retries, connect=self.retries, read=self.retries,
+                              backoff_factor=self.backoff, status_forcelist=RETRY_STATUS_CODES,
+                              allowed_methods=frozenset(('GET', 'POST')), raise_on_status=False)
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=retry)
+                session = requests.Session()
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                self._session = session
+            return self._session
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.pool_size,
+                                                    thread_name_prefix="APIClient")
+            return self._executor
+
+    def url(self, path: str) -> str:
+        """Absolute URL for an API path"""
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def request(self, method: str, path: str, **kwargs):
+        """
+        Send a request over the pooled session
+
+        Args:
+            method: HTTP method
+            path: API path, e.g. '/status'
+            **kwargs: Passed through to requests (json, params, headers...)
+
+        Returns:
+            requests.Response: Server response
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        return self._get_session().request(method, self.url(path), **kwargs)
+
+    def get(self, path: str, **kwargs):
+        """GET an API path"""
+        return self.request('GET', path, **kwargs)
+
+    def post(self, path: str, json: Any = None, **kwargs):
+        """POST JSON to an API path"""
+        return self.request('POST', path, json=json, **kwargs)
+
+    def request_async(self, method: str, path: str,
+                      callback: Optional[Callable[[Any], None]] = None, **kwargs) -> Future:
+        """
+        Send a request on a worker thread
+
+        Args:
+            method: HTTP method
+            path: API path
+            callback: Called with the response (or the exception) when done
+            **kwargs: Passed through to requests
+
+        Returns:
+            Future: Resolves to the response
+        """
+        future = self._get_executor().submit(self.request, method, path, **kwargs)
+        if callback is not None:
+            future.add_done_callback(
+                lambda f: callback(f.exception() if f.exception() else f.result()))
+        return future
+
+    def get_async(self, path: str, callback: Optional[Callable[[Any], None]] = None, **kwargs) -> Future:
+        """GET an API path without blocking the caller"""
+        return self.request_async('GET', path, callback=callback, **kwargs)
+
+    def post_async(self, path: str, json: Any = None,
+                   callback: Optional[Callable[[Any], None]] = None, **kwargs) -> Future:
+        """POST JSON to an API path without blocking the caller"""
+        return self.request_async('POST', path, callback=callback, json=json, **kwargs)
+
+    def get_json(self, path: str) -> Any:
+        """
+        GET a JSON document, revalidating any cached copy
+
+        Documents served with an ETag are remembered; the next request
+        sends If-None-Match and a 304 answer returns the remembered copy
+        without the server re-serializing anything.
+
+        Args:
+            path: API path
+
+        Returns:
+            Any: Decoded document
+        """
+        with self._lock:
+            cached = self._documents.get(path)
+        headers = {'If-None-Match': cached[0]} if cached else {}
+        response = self.get(path, headers=headers)
+        if response.status_code == 304 and cached:
+            return cached[1]
+        response.raise_for_status()
+        document = response.json()
+        etag = response.headers.get('ETag')
+        if etag:
+            with self._lock:
+                self._documents[path] = (etag, document)
+        return document
+
+    def get_json_async(self, path: str, callback: Optional[Callable[[Any], None]] = None) -> Future:
+        """
+        get_json() on a worker thread
+
+        Args:
+            path: API path
+            callback: Called with the document (or the exception) when done
+
+        Returns:
+            Future: Resolves to the document
+        """
+        future = self._get_executor().submit(self.get_json, path)
+        if callback is not None:
+            future.add_done_callback(
+                lambda f: callback(f.exception() if f.exception() else f.result()))
+        return future
+
+    def post_latest(self, path: str, json: Any):
+        """
+        POST without blocking, keeping only the newest pending payload per path
+
+        Meant for streaming callers such as the audio visualizer: if the
+        server falls behind, intermediate updates are dropped rather than
+        queued, so the keyboard always converges on the latest state.
+
+        Args:
+            path: API path
+            json: JSON payload
+        """
+        with self._lock:
+            self._latest[path] = json
+            if self._draining.get(path):
+                return
+            self._draining[path] = True
+        self._get_executor().submit(self._drain_latest, path)
+
+    def _drain_latest(self, path: str):
+        while True:
+            with self._lock:
+                if path not in self._latest:
+                    self._draining[path] = False
+                    return
+                payload = self._latest.pop(path)
+            try:
+                self.post(path, json=payload)
+            except Exception as e:
+                self.logger.debug(f"Dropped update to {path}: {e}")
+
+    def set_zones(self, zones: Dict[int, str]):
+        """
+        Apply several zone colours in one request
+
+        Args:
+            zones: Mapping of 1-based zone number to colour string
+
+        Returns:
+            requests.Response: Server response
+        """
+        return self.post('/set_zones', json={'zones': {str(zone): color for zone, color in zones.items()}})
+
+    def set_frame(self, colors: List[str]):
+        """
+        Replace the whole key frame in one request
+
+        Args:
+            colors: Per-key colour strings
+
+        Returns:
+            requests.Response: Server response
+        """
+        return self.post('/set_frame', json={'colors': list(colors)})
+
+    def set_frame_packed(self, packed: bytes, previous: Optional[bytes] = None):
+        """
+        Replace the key frame using the compact binary format
+
+        Args:
+            packed: Packed RGB frame
+            previous: Frame the server last applied, to send only a delta
+
+        Returns:
+            requests.Response: Server response
+        """
+        return self.request('POST', '/set_frame', data=encode_frame(packed, previous),
+                            headers={'Content-Type': FRAME_MIME_TYPE})
+
+    def get_frame_packed(self) -> bytes:
+        """
+        Fetch the current frame in the compact binary format
+
+        Returns:
+            bytes: Packed RGB frame
+        """
+        response = self.get('/frame', headers={'Accept': FRAME_MIME_TYPE})
+        response.raise_for_status()
+        return decode_frame(response.content)
+
+    def status(self) -> Dict[str, Any]:
+        """
+        Fetch the server status
+
+        Returns:
+            Dict[str, Any]: Decoded /status response
+        """
+        return self.get_json('/status')
+
+    def effects(self) -> Dict[str, Any]:
+        """
+        Fetch the available effects and their categories
+
+        Returns:
+            Dict[str, Any]: Decoded /effects response
+        """
+        return self.get_json('/effects')
+
+    def close(self):
+        """Close pooled connections and stop async workers"""
+        with self._lock:
+            session, self._session = self._session, None
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+        if session is not None:
+            session.close()
+
+
+# Global instance for convenience
+api_client = APIClient()
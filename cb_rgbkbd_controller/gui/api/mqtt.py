@@ -0,0 +1,799 @@
+#!/usr/bin/env python3
+"""
+MQTT bridge from home-automation publishers to keyboard zones
+
+Topic filters (with the MQTT '+' and '#' wildcards) are mapped to zones
+and compiled into a TopicTrie, so an incoming message resolves to its key
+indices by walking the topic once; resolutions are cached per topic until
+the mappings change. With a MQTTTopicRegistry attached, zone assignments
+and every topic seen (with the shape of its last payload) persist across
+runs, so the bridge restores its subscriptions at startup without a
+discovery sweep.
+
+Publishers often flood rapid-fire and retained messages, so messages are
+not applied as they arrive: each topic keeps only its latest pending
+payload, a payload equal to what the topic last applied is dropped, and
+everything pending is applied together as one frame submitted to the
+output fan-out at most once per frame window.
+
+Accepted payloads:
+
+    #ff0000, red, rgb(255, 0, 0)        colour for every key mapped to the topic
+    {"color": "#ff0000"}                same; also {"color": {"r": 255, ...}}
+    {"state": "OFF"}                    mapped keys off
+    {"zones": {"1": "#ff0000", ...}}    explicit 1-based zones (the /set_zones format)
+"""
+
+import sys
+import json
+import time
+import logging
+import argparse
+import threading
+from collections import namedtuple
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from ..core.constants import (
+    OSIRIS_KEY_COUNT, OSIRIS_KEY_LAYOUT, MQTT_BROKER, MQTT_PORT, MQTT_KEEPALIVE,
+    MQTT_FRAME_WINDOW, MQTT_DEFAULT_TOPIC_ZONES
+)
+from ..core.rgb_color import RGBColor, validate_color_list
+from ..utils.frame_timing import frame_latency_tracker
+from ..utils.metrics import metrics_registry
+from .server import parse_zone_updates
+from .mqtt_registry import MQTTTopicRegistry, payload_schema
+
+# Topic resolutions cached before the cache is reset
+_RESOLVE_CACHE_SIZE = 4096
+
+mqtt_messages = metrics_registry.counter(
+    'rgbkbd_mqtt_messages_total', 'MQTT messages by outcome', ('result',))
+_messages_applied = mqtt_messages.labels('applied')
+_messages_coalesced = mqtt_messages.labels('coalesced')
+_messages_dropped = mqtt_messages.labels('dropped')
+_messages_unmapped = mqtt_messages.labels('unmapped')
+_messages_invalid = mqtt_messages.labels('invalid')
+_mqtt_frames = metrics_registry.counter('rgbkbd_mqtt_frames_total', 'Frames submitted by the MQTT bridge')
+
+
+def validate_filter(pattern: str):
+    """
+    Check an MQTT topic filter
+
+    Raises:
+        ValueError: If the filter is empty or misuses a wildcard
+    """
+    if not pattern or '\x00' in pattern:
+        raise ValueError("Topic filter must be a non-empty string")
+    levels = pattern.split('/')
+    for depth, level in enumerate(levels):
+        if '#' in level and (level != '#' or depth != len(levels) - 1):
+            raise ValueError(f"'#' must be the whole last level of a topic filter: {pattern}")
+        if '+' in level and level != '+':
+            raise ValueError(f"'+' must be a whole level of a topic filter: {pattern}")
+
+
+class _TrieNode:
+    __slots__ = ('children', 'value', 'terminal')
+
+    def __init__(self):
+        self.children: Dict[str, '_TrieNode'] = {}
+        self.value: Any = None
+        self.terminal = False
+
+
+class TopicTrie:
+    """
+    Maps MQTT topic filters to values and matches topics against them
+
+    Filters are split into levels once, when added; matching walks the
+    topic's levels following the literal, '+' and '#' branches, so its cost
+    depends on the topic depth rather than the number of filters. As in the
+    MQTT spec, wildcards at the first level never match '$'-topics.
+    """
+
+    def __init__(self):
+        self._root = _TrieNode()
+        self._filters: Dict[str, Any] = {}
+
+    def __len__(self) -> int:
+        return len(self._filters)
+
+    def __contains__(self, pattern: str) -> bool:
+        return pattern in self._filters
+
+    def filters(self) -> Dict[str, Any]:
+        """Get a copy of the filter -> value mapping"""
+        return dict(self._filters)
+
+    def get(self, pattern: str, default: Any = None) -> Any:
+        """Get the value stored for a filter"""
+        return self._filters.get(pattern, default)
+
+    def add(self, pattern: str, value: Any):
+        """
+        Store a value for a topic filter, replacing any previous one
+
+        Raises:
+            ValueError: If the filter is invalid
+        """
+        validate_filter(pattern)
+        node = self._root
+        for level in pattern.split('/'):
+            node = node.children.setdefault(level, _TrieNode())
+        node.value = value
+        node.terminal = True
+        self._filters[pattern] = value
+
+    def remove(self, pattern: str) -> bool:
+        """
+        Remove a topic filter
+
+        Returns:
+            bool: True if the filter existed
+        """
+        if pattern not in self._filters:
+            return False
+        del self._filters[pattern]
+        path = [self._root]
+        for level in pattern.split('/'):
+            path.append(path[-1].children[level])
+        path[-1].value = None
+        path[-1].terminal = False
+        # Prune branches that no longer lead to any filter
+        for level, parent, node in zip(reversed(pattern.split('/')), reversed(path[:-1]), reversed(path[1:])):
+            if node.terminal or node.children:
+                break
+            del parent.children[level]
+        return True
+
+    def match(self, topic: str) -> List[Any]:
+        """
+        Get the values of all filters matching a topic
+
+        Args:
+            topic: Concrete topic name (no wildcards)
+
+        Returns:
+            List[Any]: Matching values, one per matching filter
+        """
+        results = []
+        nodes = [self._root]
+        levels = topic.split('/')
+        system = topic.startswith('$')
+        for depth, level in enumerate(levels):
+            wildcards = depth or not system
+            next_nodes = []
+            for node in nodes:
+                if wildcards:
+                    multi = node.children.get('#')
+                    if multi is not None:
+                        results.append(multi.value)
+                    single = node.children.get('+')
+                    if single is not None:
+                        next_nodes.append(single)
+                child = node.children.get(level)
+                if child is not None:
+                    next_nodes.append(child)
+            nodes = next_nodes
+            if not nodes:
+                return results
+        for node in nodes:
+            if node.terminal:
+                results.append(node.value)
+            # 'a/#' also matches 'a' itself
+            multi = node.children.get('#')
+            if multi is not None:
+                results.append(multi.value)
+        return results
+
+
+def resolve_zones(zones: Union[str, Iterable[Union[int, str]]]) -> Tuple[int, ...]:
+    """
+    Resolve a zone list to sorted 0-based key indices
+
+    Args:
+        zones: 1-based zone numbers and/or OSIRIS_KEY_LAYOUT key names, as
+            an iterable or a comma-separated string
+
+    Returns:
+        Tuple[int, ...]: Key indices
+
+    Raises:
+        ValueError: If a zone is out of range or an unknown key name
+    """
+    if isinstance(zones, str):
+        zones = [zone.strip() for zone in zones.split(',') if zone.strip()]
+    indices = set()
+    for zone in zones:
+        if isinstance(zone, str) and not zone.isdigit():
+            if zone not in OSIRIS_KEY_LAYOUT:
+                raise ValueError(f"Unknown key name: {zone}")
+            indices.add(OSIRIS_KEY_LAYOUT[zone])
+            continue
+        index = int(zone) - 1
+        if not 0 <= index < OSIRIS_KEY_COUNT:
+            raise ValueError(f"zone {zone} out of range 1-{OSIRIS_KEY_COUNT}")
+        indices.add(index)
+    return tuple(sorted(indices))
+
+
+def parse_payload(payload: bytes) -> Tuple[Optional[RGBColor], Dict[int, RGBColor]]:
+    """
+    Decode an MQTT colour message
+
+    Args:
+        payload: Raw message payload
+
+    Returns:
+        Tuple[Optional[RGBColor], Dict[int, RGBColor]]: Colour for the keys
+        mapped to the topic (None if the message has none) and explicit
+        0-based key updates
+
+    Raises:
+        ValueError: If the payload is not a recognised colour message
+    """
+    try:
+        text = payload.decode('utf-8').strip()
+    except UnicodeDecodeError as e:
+        raise ValueError(f"Payload is not UTF-8: {e}")
+    if not text.startswith('{'):
+        return validate_color_list([text])[0], {}
+
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid JSON payload: {e}")
+    updates = parse_zone_updates(data) if 'zones' in data else {}
+    color = None
+    if str(data.get('state', '')).upper() == 'OFF':
+        color = RGBColor()
+    elif 'color' in data:
+        color = validate_color_list([data['color']])[0]
+    if color is None and not updates:
+        raise ValueError("Payload has no 'color', 'state' or 'zones'")
+    return color, updates
+
+
+def _create_paho_client():
+    import paho.mqtt.client as mqtt
+    # paho-mqtt 2.x requires choosing a callback API; 1.x has no such argument
+    api_version = getattr(mqtt, 'CallbackAPIVersion', None)
+    if api_version is not None:
+        return mqtt.Client(api_version.VERSION2)
+    return mqtt.Client()
+
+
+class MQTTBridge:
+    """
+    Applies MQTT colour messages to keyboard zones through an output fan-out
+
+    One bridge serves every MQTT feature of the GUI: zone mappings, plain
+    listen subscriptions and topic discovery all live in the same trie and
+    share one broker connection. Subscriptions are (re)sent on every
+    connect, so a reconnect restores them.
+
+    Messages are queued per topic by the network thread and applied by a
+    worker thread, so a burst of any size costs at most one frame per
+    frame window.
+    """
+
+    def __init__(self, fanout, mappings: Optional[Dict[str, Any]] = None,
+                 client_factory: Optional[Callable[[], Any]] = None,
+                 frame_window: float = MQTT_FRAME_WINDOW,
+                 registry: Optional[MQTTTopicRegistry] = None,
+                 parent_logger: Optional[logging.Logger] = None):
+        """
+        Initialize bridge
+
+        Args:
+            fanout: OutputFanout receiving frames
+            mappings: Initial topic filter -> zones mapping (see resolve_zones)
+            client_factory: Creates a paho-compatible client; defaults to paho-mqtt
+            frame_window: Minimum seconds between submitted frames
+            registry: Registry to restore mappings and known topics from and
+                to record them in; None keeps them in memory only
+            parent_logger: Parent logger instance
+        """
+        self.logger = (parent_logger.getChild('MQTTBridge')
+                       if parent_logger else logging.getLogger('MQTTBridge'))
+        self.fanout = fanout
+        self.client_factory = client_factory or _create_paho_client
+        self.frame_window = frame_window
+        self.registry = registry
+        self.broker: Optional[str] = None
+        self.port = MQTT_PORT
+
+        self._lock = threading.Lock()
+        self._trie = TopicTrie()
+        self._resolved: Dict[str, Tuple[int, ...]] = {}
+        self._client = None
+        self._connected = False
+        self._topic_listeners: List[Callable[[str], None]] = []
+        self._frame: List[RGBColor] = [RGBColor() for _ in range(OSIRIS_KEY_COUNT)]
+        self._pending: Dict[str, bytes] = {}
+        self._applied: Dict[str, bytes] = {}
+        # Topic whose message last set each key
+        self._writers: List[Optional[str]] = [None] * OSIRIS_KEY_COUNT
+        self._pending_event = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.seen_topics: set = set()
+
+        self.messages_received = 0
+        self.frames_submitted = 0
+        self.messages_applied = 0
+        self.messages_coalesced = 0
+        self.messages_dropped = 0
+        self.messages_unmapped = 0
+        self.messages_invalid = 0
+
+        if registry is not None:
+            self.seen_topics.update(registry.get_topics())
+            for pattern, zones in registry.get_mappings().items():
+                try:
+                    self.set_mapping(pattern, zones, persist=False)
+                except ValueError as e:
+                    self.logger.warning(f"Ignoring stored MQTT mapping {pattern}: {e}")
+        for pattern, zones in (mappings or {}).items():
+            self.set_mapping(pattern, zones, persist=False)
+
+    @property
+    def is_running(self) -> bool:
+        return self._client is not None
+
+    @property
+    def is_connected(self) -> bool:
+        return self._connected
+
+    def set_mapping(self, pattern: str, zones: Union[str, Iterable[Union[int, str]]], persist: bool = True):
+        """
+        Map a topic filter to zones and subscribe to it
+
+        Args:
+            pattern: Topic filter, '+' and '#' allowed
+            zones: Zones lit by plain colour messages on matching topics;
+                empty to only accept explicit {"zones": ...} messages
+            persist: Store the mapping in the registry, if there is one
+
+        Raises:
+            ValueError: If the filter or a zone is invalid
+        """
+        keys = resolve_zones(zones)
+        with self._lock:
+            is_new = pattern not in self._trie
+            self._trie.add(pattern, keys)
+            self._resolved.clear()
+            self._applied.clear()
+            client = self._client if self._connected else None
+        if persist and self.registry is not None:
+            self.registry.set_mapping(pattern, [index + 1 for index in keys])
+        if is_new and client is not None:
+            client.subscribe(pattern)
+
+    def listen(self, pattern: str):
+        """Subscribe to a topic filter for this session without mapping it to zones"""
+        if pattern not in self._trie:
+            self.set_mapping(pattern, (), persist=False)
+
+    def remove_mapping(self, pattern: str) -> bool:
+        """
+        Unmap and unsubscribe a topic filter
+
+        Returns:
+            bool: True if the filter was mapped
+        """
+        with self._lock:
+            removed = self._trie.remove(pattern)
+            self._resolved.clear()
+            self._applied.clear()
+            client = self._client if self._connected else None
+        if self.registry is not None:
+            self.registry.remove_mapping(pattern)
+        if removed and client is not None:
+            client.unsubscribe(pattern)
+        return removed
+
+    def get_mappings(self) -> Dict[str, List[int]]:
+        """Get topic filter -> 1-based zones"""
+        with self._lock:
+            return {pattern: [index + 1 for index in keys] for pattern, keys in self._trie.filters().items()}
+
+    def add_topic_listener(self, listener: Callable[[str], None]):
+        """
+        Register a callback run with each topic seen for the first time
+
+        The callback runs on the MQTT network thread and must not block.
+        """
+        with self._lock:
+            self._topic_listeners.append(listener)
+
+    def resolve(self, topic: str) -> Tuple[int, ...]:
+        """
+        Get the key indices mapped to a topic
+
+        Args:
+            topic: Concrete topic name
+
+        Returns:
+            Tuple[int, ...]: Union of the keys of every matching filter
+        """
+        keys = self._resolved.get(topic)
+        if keys is not None:
+            return keys
+        with self._lock:
+            matches = self._trie.match(topic)
+            keys = matches[0] if len(matches) == 1 else tuple(sorted(set().union(*matches)))
+            if len(self._resolved) >= _RESOLVE_CACHE_SIZE:
+                self._resolved.clear()
+            self._resolved[topic] = keys
+        return keys
+
+    def start(self, broker: str = MQTT_BROKER, port: int = MQTT_PORT) -> bool:
+        """
+        Connect to a broker and start the network thread
+
+        Restarts the connection if the bridge is running against another broker.
+
+        Args:
+            broker: Broker host name
+            port: Broker TCP port
+
+        Returns:
+            bool: True if the connection was started
+        """
+        if self.is_running:
+            if (broker, port) == (self.broker, self.port):
+                return True
+            self.stop()
+        try:
+            client = self.client_factory()
+        except ImportError:
+            self.logger.error("MQTT support requires paho-mqtt (pip install paho-mqtt)")
+            return False
+        client.on_connect = self._on_connect
+        client.on_disconnect = self._on_disconnect
+        client.on_message = self._on_message
+        self.broker, self.port = broker, port
+        try:
+            client.connect(broker, port, MQTT_KEEPALIVE)
+        except (OSError, ValueError) as e:
+            self.logger.error(f"Could not connect to MQTT broker {broker}:{port}: {e}")
+            return False
+        with self._lock:
+            self._client = client
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="MQTTBridge", daemon=True)
+        self._thread.start()
+        client.loop_start()
+        self.logger.info(f"MQTT bridge connecting to {broker}:{port}")
+        return True
+
+    def stop(self):
+        """Disconnect and stop the network thread"""
+        with self._lock:
+            client, self._client = self._client, None
+            self._connected = False
+        if client is not None:
+            client.disconnect()
+            client.loop_stop()
+        self._stop_event.set()
+        self._pending_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+
+    def _on_connect(self, client, userdata, flags, reason_code, properties=None):
+        if reason_code != 0:
+            self.logger.error(f"MQTT broker refused connection: {reason_code}")
+            return
+        with self._lock:
+            self._connected = True
+            patterns = list(self._trie.filters())
+        if patterns:
+            client.subscribe([(pattern, 0) for pattern in patterns])
+        self.logger.info(f"MQTT bridge connected, {len(patterns)} subscription(s)")
+
+    def _on_disconnect(self, client, userdata, *args):
+        self._connected = False
+
+    def _on_message(self, client, userdata, message):
+        self.handle_message(message.topic, message.payload)
+
+    def handle_message(self, topic: str, payload: bytes) -> bool:
+        """
+        Queue one MQTT message for the next frame
+
+        Replaces any message still pending for the same topic; the topic
+        then moves to the back of the queue so messages apply in arrival order.
+
+        Args:
+            topic: Topic the message was published to
+            payload: Raw payload
+
+        Returns:
+            bool: False if the message was dropped as a repeat of the
+            topic's current state
+        """
+        self.messages_received += 1
+        if topic not in self.seen_topics:
+            self.seen_topics.add(topic)
+            for listener in list(self._topic_listeners):
+                listener(topic)
+
+        with self._lock:
+            if topic in self._pending:
+                del self._pending[topic]
+                self._pending[topic] = payload
+                self.messages_coalesced += 1
+                _messages_coalesced.inc()
+                return True
+            if self._applied.get(topic) == payload:
+                self.messages_dropped += 1
+                _messages_dropped.inc()
+                return False
+            self._pending[topic] = payload
+        self._pending_event.set()
+        return True
+
+    def _run(self):
+        last_flush = 0.0
+        while not self._stop_event.is_set():
+            self._pending_event.wait()
+            # Leading edge goes out at once; later messages wait for the next window
+            delay = last_flush + self.frame_window - time.monotonic()
+            if delay > 0 and self._stop_event.wait(delay):
+                return
+            if self._stop_event.is_set():
+                return
+            last_flush = time.monotonic()
+            self.flush()
+
+    def flush(self) -> bool:
+        """
+        Apply every pending message as one frame
+
+        Called by the worker thread once per frame window; only the
+        latest payload of each topic is decoded.
+
+        Returns:
+            bool: True if a frame was submitted
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._pending_event.clear()
+        if not pending:
+            return False
+        if self.registry is not None:
+            self.registry.record_topics({topic: payload_schema(payload) for topic, payload in pending.items()})
+
+        updates: Dict[int, RGBColor] = {}
+        writers: Dict[int, str] = {}
+        topic_keys: Dict[str, Tuple[int, ...]] = {}
+        applied = {}
+        for topic, payload in pending.items():
+            try:
+                color, explicit = parse_payload(payload)
+            except ValueError as e:
+                self.messages_invalid += 1
+                _messages_invalid.inc()
+                self.logger.debug(f"Ignoring MQTT message on {topic}: {e}")
+                continue
+            if color is not None:
+                keys = self.resolve(topic)
+                if not keys and not explicit:
+                    self.messages_unmapped += 1
+                    _messages_unmapped.inc()
+                    continue
+                updates.update(dict.fromkeys(keys, color))
+            else:
+                keys = ()
+            updates.update(explicit)
+            topic_keys[topic] = tuple(keys) + tuple(explicit)
+            writers.update(dict.fromkeys(topic_keys[topic], topic))
+            applied[topic] = payload
+        if not updates:
+            return False
+
+        stamp = frame_latency_tracker.new_frame()
+        with self._lock:
+            frame = list(self._frame)
+            for index, value in updates.items():
+                frame[index] = value
+            self._frame = frame
+            # A topic whose keys another topic overwrote no longer shows its
+            # last payload, so a repeat of it must not be dropped
+            for index, topic in writers.items():
+                previous = self._writers[index]
+                if previous is not None and previous != topic:
+                    self._applied.pop(previous, None)
+                self._writers[index] = topic
+            for topic, payload in applied.items():
+                if all(writers[index] == topic for index in topic_keys[topic]):
+                    self._applied[topic] = payload
+                else:
+                    self._applied.pop(topic, None)
+        stamp.mark_composed()
+        self.fanout.submit(frame, stamp)
+        self.frames_submitted += 1
+        self.messages_applied += len(applied)
+        _messages_applied.inc(len(applied))
+        _mqtt_frames.inc()
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get connection state and message counters"""
+        return {
+            'running': self.is_running,
+            'connected': self.is_connected,
+            'broker': f"{self.broker}:{self.port}" if self.broker else None,
+            'subscriptions': len(self._trie),
+            'topics_seen': len(self.seen_topics),
+            'messages_received': self.messages_received,
+            'frames_submitted': self.frames_submitted,
+            'messages_applied': self.messages_applied,
+            'messages_coalesced': self.messages_coalesced,
+            'messages_dropped': self.messages_dropped,
+            'messages_unmapped': self.messages_unmapped,
+            'messages_invalid': self.messages_invalid
+        }
+
+
+LocalMessage = namedtuple('LocalMessage', 'topic payload qos retain')
+
+
+class LocalBroker:
+    """
+    In-process stand-in for an MQTT broker
+
+    Routes messages between LocalClient instances using the same TopicTrie
+    as the bridge, and keeps retained messages. Delivery happens on the
+    publishing thread. Used for loopback checks and offline testing.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._subscriptions = TopicTrie()
+        self._retained: Dict[str, bytes] = {}
+
+    def client(self) -> 'LocalClient':
+        """Create a client attached to this broker (usable as a client_factory)"""
+        return LocalClient(self)
+
+    def subscribe(self, client: 'LocalClient', pattern: str):
+        with self._lock:
+            subscribers = self._subscriptions.get(pattern)
+            if subscribers is None:
+                subscribers = set()
+                self._subscriptions.add(pattern, subscribers)
+            subscribers.add(client)
+            retained = [(topic, payload) for topic, payload in self._retained.items()
+                        if any(client in match for match in self._subscriptions.match(topic))]
+        for topic, payload in retained:
+            client.deliver(LocalMessage(topic, payload, 0, True))
+
+    def unsubscribe(self, client: 'LocalClient', pattern: Optional[str] = None):
+        with self._lock:
+            patterns = [pattern] if pattern is not None else list(self._subscriptions.filters())
+            for name in patterns:
+                subscribers = self._subscriptions.get(name)
+                if subscribers is not None:
+                    subscribers.discard(client)
+                    if not subscribers:
+                        self._subscriptions.remove(name)
+
+    def publish(self, topic: str, payload: Union[str, bytes], retain: bool = False) -> int:
+        """
+        Deliver a message to every matching subscriber
+
+        Returns:
+            int: Number of clients the message was delivered to
+        """
+        if isinstance(payload, str):
+            payload = payload.encode('utf-8')
+        with self._lock:
+            if retain:
+                if payload:
+                    self._retained[topic] = payload
+                else:
+                    self._retained.pop(topic, None)
+            # A client subscribed through several filters receives the message once
+            clients = set().union(*self._subscriptions.match(topic))
+        for client in clients:
+            client.deliver(LocalMessage(topic, payload, 0, False))
+        return len(clients)
+
+
+class LocalClient:
+    """The subset of the paho-mqtt client interface used by MQTTBridge, backed by a LocalBroker"""
+
+    def __init__(self, broker: LocalBroker):
+        self.broker = broker
+        self.on_connect = None
+        self.on_disconnect = None
+        self.on_message = None
+        self.connected = False
+
+    def connect(self, host: str, port: int = MQTT_PORT, keepalive: int = MQTT_KEEPALIVE):
+        self.connected = True
+        if self.on_connect:
+            self.on_connect(self, None, {}, 0, None)
+
+    def disconnect(self):
+        self.broker.unsubscribe(self)
+        self.connected = False
+        if self.on_disconnect:
+            self.on_disconnect(self, None, 0)
+
+    def loop_start(self):
+        pass
+
+    def loop_stop(self):
+        pass
+
+    def subscribe(self, topic: Union[str, List[Tuple[str, int]]], qos: int = 0):
+        for pattern in ([topic] if isinstance(topic, str) else [entry[0] for entry in topic]):
+            self.broker.subscribe(self, pattern)
+
+    def unsubscribe(self, topic: str):
+        self.broker.unsubscribe(self, topic)
+
+    def publish(self, topic: str, payload: Union[str, bytes] = b'', qos: int = 0, retain: bool = False):
+        self.broker.publish(topic, payload, retain)
+
+    def deliver(self, message: LocalMessage):
+        if self.connected and self.on_message:
+            self.on_message(self, None, message)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point: publish a colour, or run a local loopback check"""
+    parser = argparse.ArgumentParser(description="MQTT colour publisher and bridge check")
+    parser.add_argument('--broker', default=MQTT_BROKER)
+    parser.add_argument('--port', type=int, default=MQTT_PORT)
+    parser.add_argument('--topic', default=next(iter(MQTT_DEFAULT_TOPIC_ZONES)))
+    parser.add_argument('--color', default='#ff0000')
+    parser.add_argument('--loopback', action='store_true',
+                        help="Run the bridge against an in-process broker with a virtual device")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    if not args.loopback:
+        client = _create_paho_client()
+        client.connect(args.broker, args.port, MQTT_KEEPALIVE)
+        client.loop_start()
+        client.publish(args.topic, args.color).wait_for_publish()
+        client.loop_stop()
+        client.disconnect()
+        print(f"Published {args.color} to {args.topic} on {args.broker}:{args.port}")
+        return 0
+
+    from ..hardware.fanout import OutputFanout, VirtualOutputDevice
+    fanout = OutputFanout()
+    preview = VirtualOutputDevice("Loopback", rate_hz=1000.0)
+    fanout.add_device(preview)
+    fanout.start()
+    broker = LocalBroker()
+    bridge = MQTTBridge(fanout, MQTT_DEFAULT_TOPIC_ZONES, client_factory=broker.client)
+    bridge.listen('rgb/#')
+    color = validate_color_list([args.color])[0]
+    try:
+        bridge.start()
+        broker.publish(args.topic, args.color, retain=True)
+        broker.publish('rgb/unmapped', args.color)
+        time.sleep(0.2)
+    finally:
+        bridge.stop()
+        fanout.stop()
+
+    keys = resolve_zones(MQTT_DEFAULT_TOPIC_ZONES.get(args.topic, ()))
+    ok = bool(keys) and all(preview.last_frame[index] == color for index in keys)
+    stats = bridge.get_stats()
+    print(f"{stats['messages_received']} messages, {stats['frames_submitted']} frames, "
+          f"{stats['messages_coalesced']} coalesced, {stats['messages_dropped']} dropped, "
+          f"{stats['messages_unmapped']} unmapped; mapped keys {'match' if ok else 'DIFFER'}")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""Persistent registry of discovered MQTT topics and their zone assignments"""
+
+import json
+import time
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from ..core.constants import CONFIG_DIR
+
+MQTT_REGISTRY_FILE = CONFIG_DIR / 'mqtt_registry.db'
+MQTT_REGISTRY_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS topics (
+    topic TEXT PRIMARY KEY,
+    payload_schema TEXT NOT NULL,
+    first_seen REAL NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS mappings (
+    pattern TEXT PRIMARY KEY,
+    zones TEXT NOT NULL,
+    updated REAL NOT NULL
+);
+"""
+
+
+def payload_schema(payload: bytes) -> str:
+    """
+    Describe the shape of an MQTT payload
+
+    Args:
+        payload: Raw message payload
+
+    Returns:
+        str: 'binary', 'text', 'json', or 'json:' plus the sorted top-level
+        keys of a JSON object (e.g. 'json:brightness,color,state')
+    """
+    try:
+        text = payload.decode('utf-8').strip()
+    except UnicodeDecodeError:
+        return 'binary'
+    if not text.startswith(('{', '[')):
+        return 'text'
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return 'text'
+    if isinstance(data, dict):
+        return 'json:' + ','.join(sorted(data))
+    return 'json'
+
+
+class MQTTTopicRegistry:
+    """
+    On-disk registry of MQTT topics and topic filter -> zone assignments
+
+    Backed by SQLite so new topics and changed assignments are written
+    incrementally, one small transaction at a time, and looked up through
+    the primary key index. Everything is also held in memory once loaded,
+    so unchanged topics cost no disk access; the MQTT bridge loads the
+    registry at startup and restores its subscriptions from it instead of
+    rediscovering topics.
+    """
+
+    def __init__(self, path: Optional[Path] = None, parent_logger: Optional[logging.Logger] = None):
+        """
+        Initialize registry; the database is opened on first use
+
+        Args:
+            path: Optional custom database path
+            parent_logger: Parent logger instance
+        """
+        self.logger = (parent_logger.getChild('MQTTTopicRegistry')
+                       if parent_logger else logging.getLogger('MQTTTopicRegistry'))
+        self.path = Path(path or MQTT_REGISTRY_FILE)
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._unavailable = False
+        self._topics: Dict[str, str] = {}
+        self._mappings: Dict[str, List[int]] = {}
+        self.writes = 0
+
+    def _open(self) -> Optional[sqlite3.Connection]:
+        # Caller holds the lock
+        if self._db is not None or self._unavailable:
+            return self._db
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(str(self.path), check_same_thread=False)
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('PRAGMA synchronous=NORMAL')
+            if db.execute('PRAGMA user_version').fetchone()[0] not in (0, MQTT_REGISTRY_VERSION):
+                self.logger.info("MQTT registry format changed - starting a new registry")
+                db.executescript('DROP TABLE IF EXISTS topics; DROP TABLE IF EXISTS mappings;')
+            db.executescript(_SCHEMA)
+            db.execute(f'PRAGMA user_version = {MQTT_REGISTRY_VERSION}')
+            self._topics = dict(db.execute('SELECT topic, payload_schema FROM topics'))
+            self._mappings = {pattern: json.loads(zones)
+                              for pattern, zones in db.execute('SELECT pattern, zones FROM mappings')}
+        except (OSError, sqlite3.Error, ValueError) as e:
+            self.logger.warning(f"MQTT registry unavailable, topics will not be remembered: {e}")
+            self._unavailable = True
+            return None
+        self._db = db
+        return db
+
+    def _write(self, statement: str, rows: list) -> bool:
+        # Caller holds the lock
+        db = self._open()
+        if db is None:
+            return False
+        try:
+            with db:
+                db.executemany(statement, rows)
+            self.writes += 1
+            return True
+        except sqlite3.Error as e:
+            self.logger.warning(f"Could not update MQTT registry: {e}")
+            return False
+
+    def get_topics(self) -> Dict[str, str]:
+        """Get known topics and their last payload schema"""
+        with self._lock:
+            self._open()
+            return dict(self._topics)
+
+    def get_mappings(self) -> Dict[str, List[int]]:
+        """Get stored topic filter -> 1-based zones"""
+        with self._lock:
+            self._open()
+            return {pattern: list(zones) for pattern, zones in self._mappings.items()}
+
+    def record_topics(self, schemas: Dict[str, str]) -> int:
+        """
+        Record topics seen and their payload schemas
+
+        Only new topics and changed schemas are written, all in one transaction.
+
+        Args:
+            schemas: Topic to payload schema (see payload_schema)
+
+        Returns:
+            int: Number of topics added or changed
+        """
+        with self._lock:
+            self._open()
+            changed = {topic: schema for topic, schema in schemas.items()
+                       if self._topics.get(topic) != schema}
+            if not changed:
+                return 0
+            self._topics.update(changed)
+            now = time.time()
+            self._write('INSERT INTO topics VALUES (?, ?, ?, ?) ON CONFLICT(topic) DO UPDATE '
+                        'SET payload_schema = excluded.payload_schema, updated = excluded.updated',
+                        [(topic, schema, now, now) for topic, schema in changed.items()])
+            return len(changed)
+
+    def set_mapping(self, pattern: str, zones: List[int]):
+        """Store the zones assigned to a topic filter"""
+        with self._lock:
+            self._open()
+            if self._mappings.get(pattern) == list(zones):
+                return
+            self._mappings[pattern] = list(zones)
+            self._write('INSERT OR REPLACE INTO mappings VALUES (?, ?, ?)',
+                        [(pattern, json.dumps(list(zones)), time.time())])
+
+    def remove_mapping(self, pattern: str):
+        """Forget the zones assigned to a topic filter"""
+        with self._lock:
+            self._open()
+            if self._mappings.pop(pattern, None) is not None:
+                self._write('DELETE FROM mappings WHERE pattern = ?', [(pattern,)])
+
+    def clear(self):
+        """Forget all topics and mappings"""
+        with self._lock:
+            self._open()
+            self._topics.clear()
+            self._mappings.clear()
+            self._write('DELETE FROM topics', [()])
+            self._write('DELETE FROM mappings', [()])
+
+    def close(self):
+        """Close the database; it is reopened on next use"""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+# Global instance for convenience
+mqtt_registry = MQTTTopicRegistry()
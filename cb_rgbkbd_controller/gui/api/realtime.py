@@ -0,0 +1,421 @@
+#!/usr/bin/env python3
+"""
+UDP realtime pixel receiver for DDP and E1.31 (sACN) senders
+
+Lighting software drives the keyboard as a 100 pixel strip: pixel N is
+the Nth entry of the pixel map (key names resolved through
+OSIRIS_KEY_LAYOUT, row order by default). Completed frames go straight
+into the latest-wins output fan-out, so the Flask server is not involved
+and a burst of packets only ever costs one hardware write.
+"""
+
+import sys
+import time
+import socket
+import select
+import struct
+import logging
+import argparse
+import threading
+from typing import Any, Dict, List, Optional
+
+from ..core.constants import (
+    OSIRIS_KEY_COUNT, OSIRIS_KEY_LAYOUT, REALTIME_HOST, REALTIME_DDP_PORT,
+    REALTIME_E131_PORT, REALTIME_E131_UNIVERSE
+)
+from ..core.rgb_color import RGBColor
+from ..utils.frame_timing import frame_latency_tracker
+
+# DDP (http://www.3waylabs.com/ddp/)
+DDP_HEADER = struct.Struct('>BBBBLH')
+DDP_FLAG_VERSION_MASK = 0xC0
+DDP_FLAG_VERSION_1 = 0x40
+DDP_FLAG_TIMECODE = 0x10
+DDP_FLAG_QUERY = 0x02
+DDP_FLAG_PUSH = 0x01
+DDP_ID_DISPLAY = 1
+
+# E1.31 (ANSI E1.31-2018), offsets into the data packet
+E131_ACN_ID = b'ASC-E1.17\x00\x00\x00'
+E131_ROOT_VECTOR = 0x00000004
+E131_FRAMING_VECTOR = 0x00000002
+E131_SEQUENCE_OFFSET = 111
+E131_OPTIONS_OFFSET = 112
+E131_UNIVERSE_OFFSET = 113
+E131_START_CODE_OFFSET = 125
+E131_DATA_OFFSET = 126
+E131_OPTION_PREVIEW = 0x80
+E131_OPTION_TERMINATED = 0x40
+
+# A packet whose sequence number is up to this far behind the last one is late
+SEQUENCE_WINDOW_DDP = 8
+SEQUENCE_WINDOW_E131 = 20
+
+
+def default_pixel_map() -> List[int]:
+    """Key indices in pixel order: every OSIRIS key, in layout (row) order"""
+    return sorted(set(OSIRIS_KEY_LAYOUT.values()))
+
+
+def resolve_pixel_map(key_names: List[str]) -> List[int]:
+    """
+    Resolve a list of key names to key indices
+
+    Args:
+        key_names: OSIRIS_KEY_LAYOUT names in the sender's pixel order
+
+    Returns:
+        List[int]: Key index for each pixel
+    """
+    unknown = [name for name in key_names if name not in OSIRIS_KEY_LAYOUT]
+    if unknown:
+        raise ValueError(f"Unknown key names in pixel map: {', '.join(unknown)}")
+    return [OSIRIS_KEY_LAYOUT[name] for name in key_names]
+
+
+def is_late(sequence: int, last: Optional[int], modulus: int, window: int) -> bool:
+    """
+    Check whether a packet arrived after a newer one
+
+    Args:
+        sequence: Sequence number of the packet
+        last: Last accepted sequence number, None if none yet
+        modulus: Sequence number range (16 for DDP, 256 for E1.31)
+        window: How far behind the last packet still counts as late
+
+    Returns:
+        bool: True if the packet should be dropped
+    """
+    if last is None:
+        return False
+    # A repeat of the last number (behind == 0) is a duplicate
+    return (last - sequence) % modulus < window
+
+
+class RealtimeReceiver:
+    """
+    Listens for DDP and E1.31 packets and submits frames to an output fan-out
+
+    Each protocol tracks its own sequence numbers; packets that arrive
+    after a newer one are dropped instead of briefly rewinding the
+    keyboard to an older frame.
+    """
+
+    def __init__(self, fanout, host: str = REALTIME_HOST, ddp_port: Optional[int] = REALTIME_DDP_PORT,
+                 e131_port: Optional[int] = REALTIME_E131_PORT, universe: int = REALTIME_E131_UNIVERSE,
+                 pixel_map: Optional[List[int]] = None, parent_logger: Optional[logging.Logger] = None):
+        """
+        Initialize receiver
+
+        Args:
+            fanout: OutputFanout receiving completed frames
+            host: Interface to bind
+            ddp_port: DDP port, None to disable DDP
+            e131_port: E1.31 port, None to disable E1.31
+            universe: E1.31 universe carrying the keyboard
+            pixel_map: Key index for each pixel, defaults to layout order
+            parent_logger: Parent logger instance
+        """
+        self.logger = (parent_logger.getChild('RealtimeReceiver')
+                       if parent_logger else logging.getLogger('RealtimeReceiver'))
+        self.fanout = fanout
+        self.host = host
+        self.ddp_port = ddp_port
+        self.e131_port = e131_port
+        self.universe = universe
+        self.pixel_map = pixel_map or default_pixel_map()
+
+        self._sockets: Dict[socket.socket, str] = {}
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._ddp_buffer = bytearray(len(self.pixel_map) * 3)
+        self._ddp_sequence: Optional[int] = None
+        self._e131_sequence: Optional[int] = None
+        self._last_frame: List[RGBColor] = [RGBColor() for _ in range(OSIRIS_KEY_COUNT)]
+
+        self.packets_received = 0
+        self.frames_submitted = 0
+        self.packets_late = 0
+        self.packets_invalid = 0
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def bound_ports(self) -> Dict[str, int]:
+        """Ports actually listened on, by protocol"""
+        return {protocol: sock.getsockname()[1] for sock, protocol in self._sockets.items()}
+
+    def start(self) -> bool:
+        """
+        Bind the UDP sockets and start receiving
+
+        Returns:
+            bool: True if at least one protocol is listening
+        """
+        if self.is_running:
+            return True
+        for protocol, port in (('ddp', self.ddp_port), ('e131', self.e131_port)):
+            if port is None:
+                continue
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            try:
+                sock.bind((self.host, port))
+            except OSError as e:
+                self.logger.error(f"Could not bind {protocol} receiver to {self.host}:{port}: {e}")
+                sock.close()
+                continue
+            self._sockets[sock] = protocol
+        if not self._sockets:
+            return False
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="RealtimeReceiver", daemon=True)
+        self._thread.start()
+        self.logger.info("Realtime receiver listening: " +
+                         ", ".join(f"{p} on {self.host}:{port}" for p, port in self.bound_ports.items()))
+        return True
+
+    def stop(self):
+        """Stop receiving and close the sockets"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+        for sock in self._sockets:
+            sock.close()
+        self._sockets.clear()
+
+    def _run(self):
+        sockets = list(self._sockets)
+        while not self._stop_event.is_set():
+            try:
+                readable, _, _ = select.select(sockets, [], [], 0.25)
+            except (OSError, ValueError):
+                return
+            for sock in readable:
+                try:
+                    data = sock.recv(2048)
+                except OSError:
+                    continue
+                self.packets_received += 1
+                try:
+                    if self._sockets.get(sock) == 'ddp':
+                        self.handle_ddp(data)
+                    else:
+                        self.handle_e131(data)
+                except (ValueError, struct.error):
+                    self.packets_invalid += 1
+
+    def handle_ddp(self, data: bytes):
+        """Process one DDP packet"""
+        flags, sequence, _, dest_id, offset, length = DDP_HEADER.unpack_from(data, 0)
+        if flags & DDP_FLAG_VERSION_MASK != DDP_FLAG_VERSION_1:
+            raise ValueError("Unsupported DDP version")
+        if flags & DDP_FLAG_QUERY or dest_id not in (DDP_ID_DISPLAY, 0):
+            return
+        header_size = DDP_HEADER.size + (4 if flags & DDP_FLAG_TIMECODE else 0)
+        payload = data[header_size:header_size + length]
+
+        # Sequence 0 means the sender does not number its packets
+        sequence &= 0x0F
+        if sequence:
+            if is_late(sequence, self._ddp_sequence, 16, SEQUENCE_WINDOW_DDP):
+                self.packets_late += 1
+                return
+            self._ddp_sequence = sequence
+
+        end = min(offset + len(payload), len(self._ddp_buffer))
+        if offset < end:
+            self._ddp_buffer[offset:end] = payload[:end - offset]
+        if flags & DDP_FLAG_PUSH:
+            self._submit(self._ddp_buffer)
+
+    def handle_e131(self, data: bytes):
+        """Process one E1.31 data packet"""
+        if len(data) < E131_DATA_OFFSET or data[4:16] != E131_ACN_ID:
+            raise ValueError("Not an E1.31 packet")
+        root_vector = struct.unpack_from('>L', data, 18)[0]
+        framing_vector = struct.unpack_from('>L', data, 40)[0]
+        if root_vector != E131_ROOT_VECTOR or framing_vector != E131_FRAMING_VECTOR:
+            return
+        universe = struct.unpack_from('>H', data, E131_UNIVERSE_OFFSET)[0]
+        options = data[E131_OPTIONS_OFFSET]
+        if universe != self.universe or options & E131_OPTION_PREVIEW or data[E131_START_CODE_OFFSET] != 0:
+            return
+        if options & E131_OPTION_TERMINATED:
+            self._e131_sequence = None
+            return
+
+        sequence = data[E131_SEQUENCE_OFFSET]
+        if is_late(sequence, self._e131_sequence, 256, SEQUENCE_WINDOW_E131):
+            self.packets_late += 1
+            return
+        self._e131_sequence = sequence
+        self._submit(data[E131_DATA_OFFSET:E131_DATA_OFFSET + len(self.pixel_map) * 3])
+
+    def _submit(self, channels: bytes):
+        stamp = frame_latency_tracker.new_frame()
+        frame = list(self._last_frame)
+        for pixel, key in enumerate(self.pixel_map[:len(channels) // 3]):
+            offset = pixel * 3
+            frame[key] = RGBColor(channels[offset], channels[offset + 1], channels[offset + 2])
+        self._last_frame = frame
+        stamp.mark_composed()
+        self.fanout.submit(frame, stamp)
+        self.frames_submitted += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get packet and frame counters"""
+        return {
+            'running': self.is_running,
+            'ports': self.bound_ports,
+            'packets_received': self.packets_received,
+            'frames_submitted': self.frames_submitted,
+            'packets_late': self.packets_late,
+            'packets_invalid': self.packets_invalid
+        }
+
+
+def build_ddp_packet(pixels: bytes, sequence: int = 0, offset: int = 0, push: bool = True) -> bytes:
+    """
+    Build a DDP data packet
+
+    Args:
+        pixels: Packed RGB channel data
+        sequence: Sequence number 1-15, 0 for unnumbered
+        offset: Byte offset of the data in the display buffer
+        push: Mark the packet as the end of a frame
+
+    Returns:
+        bytes: Packet
+    """
+    flags = DDP_FLAG_VERSION_1 | (DDP_FLAG_PUSH if push else 0)
+    # Data type 0x0B: RGB, 8 bits per channel
+    return DDP_HEADER.pack(flags, sequence & 0x0F, 0x0B, DDP_ID_DISPLAY, offset, len(pixels)) + pixels
+
+
+def build_e131_packet(pixels: bytes, sequence: int, universe: int = REALTIME_E131_UNIVERSE,
+                      source_name: str = "cb-rgbkbd sender", priority: int = 100) -> bytes:
+    """
+    Build an E1.31 data packet
+
+    Args:
+        pixels: DMX channel data (at most 512 bytes)
+        sequence: Sequence number 0-255
+        universe: Destination universe
+        source_name: Source name shown by receivers
+        priority: Data priority 0-200
+
+    Returns:
+        bytes: Packet
+    """
+    slots = b'\x00' + pixels
+    dmp = struct.pack('>HBBHHH', 0x7000 | (10 + len(slots)), 0x02, 0xA1, 0, 1, len(slots)) + slots
+    framing = (struct.pack('>HL', 0x7000 | (77 + len(dmp)), E131_FRAMING_VECTOR) +
+               source_name.encode('utf-8')[:63].ljust(64, b'\x00') +
+               struct.pack('>BHBBH', priority, 0, sequence & 0xFF, 0, universe) + dmp)
+    root = (struct.pack('>HH', 0x0010, 0) + E131_ACN_ID +
+            struct.pack('>HL', 0x7000 | (22 + len(framing)), E131_ROOT_VECTOR) +
+            b'\x00' * 16 + framing)
+    return root
+
+
+def _test_pattern(step: int, pixels: int) -> bytes:
+    # Moving hue gradient, different every frame
+    out = bytearray()
+    for pixel in range(pixels):
+        color = RGBColor.from_hsv((pixel * 360 / pixels + step * 6) % 360)
+        out += bytes(color.to_tuple())
+    return bytes(out)
+
+
+def send_test_frames(host: str, port: int, protocol: str, frames: int, fps: float,
+                     universe: int = REALTIME_E131_UNIVERSE) -> int:
+    """
+    Send a moving test pattern to a receiver
+
+    Args:
+        host: Receiver address
+        port: Receiver port
+        protocol: 'ddp' or 'e131'
+        frames: Number of frames to send
+        fps: Frames per second, 0 for as fast as possible
+        universe: E1.31 universe
+
+    Returns:
+        int: Frames sent
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    interval = 1.0 / fps if fps > 0 else 0.0
+    next_time = time.monotonic()
+    try:
+        for step in range(frames):
+            pixels = _test_pattern(step, OSIRIS_KEY_COUNT)
+            if protocol == 'ddp':
+                packet = build_ddp_packet(pixels, sequence=step % 15 + 1)
+            else:
+                packet = build_e131_packet(pixels, sequence=step, universe=universe)
+            sock.sendto(packet, (host, port))
+            if interval:
+                next_time += interval
+                time.sleep(max(0.0, next_time - time.monotonic()))
+    finally:
+        sock.close()
+    return frames
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point: send test frames, or run a local loopback check"""
+    parser = argparse.ArgumentParser(description="DDP/E1.31 realtime test sender")
+    parser.add_argument('--protocol', choices=('ddp', 'e131'), default='ddp')
+    parser.add_argument('--host', default=REALTIME_HOST, help="Receiver address")
+    parser.add_argument('--port', type=int, default=None, help="Receiver port (protocol default)")
+    parser.add_argument('--universe', type=int, default=REALTIME_E131_UNIVERSE)
+    parser.add_argument('--frames', type=int, default=300)
+    parser.add_argument('--fps', type=float, default=60.0, help="0 sends as fast as possible")
+    parser.add_argument('--loopback', action='store_true',
+                        help="Start a local receiver with a virtual device and report what arrived")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    port = args.port
+    if port is None:
+        port = REALTIME_DDP_PORT if args.protocol == 'ddp' else REALTIME_E131_PORT
+
+    if not args.loopback:
+        send_test_frames(args.host, port, args.protocol, args.frames, args.fps, args.universe)
+        print(f"Sent {args.frames} {args.protocol} frames to {args.host}:{port}")
+        return 0
+
+    from ..hardware.fanout import OutputFanout, VirtualOutputDevice
+    fanout = OutputFanout()
+    preview = VirtualOutputDevice("Loopback", rate_hz=1000.0)
+    fanout.add_device(preview)
+    fanout.start()
+    receiver = RealtimeReceiver(fanout, host='127.0.0.1', universe=args.universe,
+                                ddp_port=0 if args.protocol == 'ddp' else None,
+                                e131_port=0 if args.protocol == 'e131' else None)
+    if not receiver.start():
+        return 1
+    try:
+        send_test_frames('127.0.0.1', receiver.bound_ports[args.protocol], args.protocol,
+                         args.frames, args.fps, args.universe)
+        time.sleep(0.2)
+    finally:
+        receiver.stop()
+        fanout.stop()
+
+    expected = _test_pattern(args.frames - 1, OSIRIS_KEY_COUNT)
+    received = bytes(c for color in preview.last_frame for c in color.to_tuple())
+    stats = receiver.get_stats()
+    print(f"{stats['packets_received']} packets, {stats['frames_submitted']} frames, "
+          f"{stats['packets_late']} late, {stats['packets_invalid']} invalid; "
+          f"final frame {'matches' if received == expected else 'DIFFERS'}")
+    return 0 if received == expected else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
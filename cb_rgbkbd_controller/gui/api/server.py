@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+"""Local HTTP control API for the RGB Controller"""
+
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+from flask import Flask, Response, jsonify, request
+from werkzeug.serving import make_server
+
+from ..core.constants import APP_NAME, VERSION, API_HOST, API_PORT, API_SERVER_MODE, OSIRIS_KEY_COUNT
+from ..core.rgb_color import RGBColor, parse_color_string
+from ..core.frame_codec import (
+    FRAME_BYTES, FRAME_MIME_TYPE, pack_frame, unpack_frame, encode_frame, decode_frame
+)
+from ..utils.frame_timing import frame_latency_tracker
+from ..utils.metrics import METRICS_CONTENT_TYPE, metrics_registry
+from ..effects.library import EFFECT_CATEGORIES, get_available_effects
+from .cache import CachedDocument, etag_matches
+from .stream import FrameFeed, StreamOutputDevice, STREAM_DEVICE_NAME
+from .websocket import register_websocket_routes
+from .sse import FrameEventCache, register_sse_routes
+
+api_requests = metrics_registry.counter(
+    'rgbkbd_api_requests_total', 'API requests by route, method and status', ('route', 'method', 'status'))
+
+
+class APIServer:
+    """
+    Flask application serving the controller API on a background thread
+
+    Route handlers only touch the hardware controller and effect manager
+    passed in, so the same server works for the GUI and headless use.
+    """
+
+    def __init__(self, hardware=None, effect_manager=None, host: str = API_HOST,
+                 port: int = API_PORT, parent_logger: Optional[logging.Logger] = None):
+        """
+        Initialize API server
+
+        Args:
+            hardware: HardwareController instance
+            effect_manager: EffectManager instance
+            host: Interface to bind
+            port: TCP port to bind
+            parent_logger: Parent logger instance
+        """
+        self.logger = (parent_logger.getChild('APIServer')
+                       if parent_logger else logging.getLogger('APIServer'))
+        self.hardware = hardware
+        self.effect_manager = effect_manager
+        self.host = host
+        self.port = port
+        self._server = None
+        self._thread: Optional[threading.Thread] = None
+        self._frame_lock = threading.Lock()
+        self.frame: List[RGBColor] = [RGBColor() for _ in range(OSIRIS_KEY_COUNT)]
+        self.feed = FrameFeed()
+        self.frame_events = FrameEventCache(self.feed)
+        self.status_document = CachedDocument('status', self._status_key, self._build_status)
+        self.effects_document = CachedDocument('effects', lambda: tuple(get_available_effects()),
+                                               self._build_effects)
+        self.app = self._build_app()
+
+    def _build_app(self):
+        return create_app(self)
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def bound_port(self) -> int:
+        """Port actually listened on (differs from port when binding port 0)"""
+        return self._server.server_port if self._server is not None else self.port
+
+    def attach_fanout(self, fanout):
+        """
+        Publish frames rendered through an output fan-out to the stream endpoints
+
+        Args:
+            fanout: OutputFanout fed by the effect manager
+        """
+        if fanout.get_device(STREAM_DEVICE_NAME) is None:
+            fanout.add_device(StreamOutputDevice(self.feed))
+
+    def start(self) -> bool:
+        """
+        Start serving in a daemon thread
+
+        Returns:
+            bool: True if the server is listening
+        """
+        if self.is_running:
+            return True
+        try:
+            self._server = make_server(self.host, self.port, self.app, threaded=True)
+        except OSError as e:
+            self.logger.error(f"Could not bind API server to {self.host}:{self.port}: {e}")
+            return False
+        self._thread = threading.Thread(target=self._server.serve_forever, name="APIServer", daemon=True)
+        self._thread.start()
+        fanout = getattr(self.effect_manager, 'output_fanout', None) if self.effect_manager else None
+        if fanout is not None:
+            self.attach_fanout(fanout)
+        self.logger.info(f"API server listening on http://{self.host}:{self.bound_port}")
+        return True
+
+    def stop(self):
+        """Shut the server down and wait for its thread"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server = None
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+        self.feed.wake()
+
+    def apply_zones(self, updates: Dict[int, RGBColor]) -> bool:
+        """
+        Update several keys of the current frame and write it in one call
+
+        Args:
+            updates: Mapping of 0-based key index to colour
+
+        Returns:
+            bool: True if the frame was written
+        """
+        with self._frame_lock:
+            for index, color in updates.items():
+                self.frame[index] = color
+            return self._write_frame(list(self.frame))
+
+    def apply_frame(self, colors: List[RGBColor]) -> bool:
+        """
+        Replace the current frame; keys beyond the given colours go dark
+
+        Args:
+            colors: Per-key colours, at most OSIRIS_KEY_COUNT
+
+        Returns:
+            bool: True if the frame was written
+        """
+        with self._frame_lock:
+            self.frame = list(colors) + [RGBColor() for _ in range(OSIRIS_KEY_COUNT - len(colors))]
+            return self._write_frame(list(self.frame))
+
+    @property
+    def output_available(self) -> bool:
+        """True if frames have somewhere to go (hardware or a running fan-out)"""
+        fanout = getattr(self.effect_manager, 'output_fanout', None) if self.effect_manager else None
+        return bool(self.hardware) or (fanout is not None and fanout.is_running)
+
+    def _status_key(self) -> tuple:
+        hardware = self.hardware
+        current_effect = self.effect_manager.current_effect if self.effect_manager else None
+        return (hardware.active_control_method if hardware else 'none',
+                hardware.current_brightness if hardware else 0,
+                current_effect.name if current_effect else None)
+
+    @staticmethod
+    def _build_status(key: tuple) -> Dict[str, Any]:
+        control_method, brightness, effect = key
+        return {
+            'app': APP_NAME,
+            'version': VERSION,
+            'hardware_ready': control_method != 'none',
+            'control_method': control_method,
+            'brightness': brightness,
+            'effect': effect
+        }
+
+    @staticmethod
+    def _build_effects(key: tuple) -> Dict[str, Any]:
+        return {'effects': list(key), 'categories': EFFECT_CATEGORIES}
+
+    def get_status(self) -> Dict[str, Any]:
+        """
+        Get the /status payload
+
+        Returns:
+            Dict[str, Any]: Application, hardware and effect state
+        """
+        return self._build_status(self._status_key())
+
+    def get_packed_frame(self) -> bytes:
+        """Get the current API frame as packed RGB"""
+        with self._frame_lock:
+            return pack_frame(self.frame)
+
+    def _write_frame(self, frame: List[RGBColor]) -> bool:
+        # Prefer the fan-out when it is running so every output device sees the frame
+        fanout = getattr(self.effect_manager, 'output_fanout', None) if self.effect_manager else None
+        if fanout is not None and fanout.is_running:
+            # The attached stream device publishes it; don't send it twice
+            if fanout.get_device(STREAM_DEVICE_NAME) is None:
+                self.feed.publish(frame)
+            fanout.submit(frame)
+            return True
+        self.feed.publish(frame)
+        if not self.hardware:
+            return False
+        return bool(self.hardware.set_zone_colors(frame))
+
+
+def parse_zone_updates(data: Any) -> Dict[int, RGBColor]:
+    """
+    Validate a /set_zones payload
+
+    Accepts {"zones": {"1": "#ff0000", ...}} or
+    {"zones": [{"zone": 1, "color": "#ff0000"}, ...]} with 1-based zones.
+
+    Args:
+        data: Decoded JSON body
+
+    Returns:
+        Dict[int, RGBColor]: 0-based key index to colour
+
+    Raises:
+        ValueError: If any entry is invalid; nothing should be applied then
+    """
+    zones = data.get('zones') if isinstance(data, dict) else None
+    if isinstance(zones, dict):
+        items = list(zones.items())
+    elif isinstance(zones, list):
+        try:
+            items = [(entry['zone'], entry['color']) for entry in zones]
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"Invalid zone entry: {e}")
+    else:
+        raise ValueError("Invalid request: 'zones' must be an object or list")
+
+    updates: Dict[int, RGBColor] = {}
+    for zone, color in items:
+        try:
+            index = int(zone) - 1
+            if not 0 <= index < OSIRIS_KEY_COUNT:
+                raise ValueError(f"zone {zone} out of range 1-{OSIRIS_KEY_COUNT}")
+            updates[index] = parse_color_string(str(color))
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Invalid zone {zone!r}: {e}")
+    return updates
+
+
+def parse_zone_color(data: Any) -> Dict[int, RGBColor]:
+    """
+    Validate a /set_zone_color payload ({"zone": 1-based, "color": ...})
+
+    Returns:
+        Dict[int, RGBColor]: Single 0-based key index to colour
+
+    Raises:
+        ValueError: If the zone is missing or out of range, or the colour is invalid
+    """
+    try:
+        zone = int(data['zone'])
+        color = parse_color_string(str(data['color']))
+    except (KeyError, TypeError, ValueError) as e:
+        raise ValueError(f"Invalid request: {e}")
+    if not 1 <= zone <= OSIRIS_KEY_COUNT:
+        raise ValueError(f"Invalid zone {zone!r}: zone {zone} out of range 1-{OSIRIS_KEY_COUNT}")
+    return {zone - 1: color}
+
+
+def parse_json_frame(data: Any) -> List[RGBColor]:
+    """
+    Validate a JSON /set_frame payload ({"colors": [...]})
+
+    Returns:
+        List[RGBColor]: Frame colours
+    """
+    colors = data.get('colors') if isinstance(data, dict) else None
+    if not isinstance(colors, list) or len(colors) > OSIRIS_KEY_COUNT:
+        raise ValueError(f"Invalid request: 'colors' must be a list of at most "
+                         f"{OSIRIS_KEY_COUNT} colours")
+    try:
+        return [parse_color_string(str(color)) for color in colors]
+    except ValueError as e:
+        raise ValueError(f"Invalid colour: {e}")
+
+
+def parse_binary_frame(body: bytes, base: bytes) -> List[RGBColor]:
+    """
+    Decode a binary /set_frame body; deltas apply to the given base frame
+
+    Returns:
+        List[RGBColor]: Frame colours
+    """
+    try:
+        packed = decode_frame(body, base)
+    except ValueError as e:
+        raise ValueError(f"Invalid frame: {e}")
+    if len(packed) > FRAME_BYTES:
+        raise ValueError(f"Frame has more than {OSIRIS_KEY_COUNT} keys")
+    return unpack_frame(packed.ljust(FRAME_BYTES, b'\0'))[:len(packed) // 3]
+
+
+def create_app(server: APIServer) -> Flask:
+    """
+    Build the Flask application for a server instance
+
+    Args:
+        server: Server holding the hardware and effect manager references
+
+    Returns:
+        Flask: Configured application
+    """
+    app = Flask(APP_NAME)
+
+    def document_response(document: CachedDocument) -> Response:
+        etag, body = document.get()
+        headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+        if etag_matches(request.headers.get('If-None-Match'), etag):
+            return Response(status=304, headers=headers)
+        return Response(body, mimetype='application/json', headers=headers)
+
+    @app.route('/status', methods=['GET'])
+    def status():
+        return document_response(server.status_document)
+
+    @app.route('/effects', methods=['GET'])
+    def effects():
+        return document_response(server.effects_document)
+
+    @app.route('/set_zone_color', methods=['POST'])
+    def set_zone_color():
+        try:
+            updates = parse_zone_color(request.get_json(silent=True) or {})
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        if not server.output_available:
+            return jsonify({'error': 'Hardware not available'}), 503
+        return jsonify({'success': server.apply_zones(updates)})
+
+    @app.route('/set_zones', methods=['POST'])
+    def set_zones():
+        try:
+            updates = parse_zone_updates(request.get_json(silent=True) or {})
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        if not server.output_available:
+            return jsonify({'error': 'Hardware not available'}), 503
+        success = server.apply_zones(updates)
+        return jsonify({'success': success, 'zones': len(updates)})
+
+    @app.route('/frame', methods=['GET'])
+    def frame():
+        packed = server.get_packed_frame()
+        if request.accept_mimetypes.best_match(['application/json', FRAME_MIME_TYPE]) == FRAME_MIME_TYPE:
+            return Response(encode_frame(packed), mimetype=FRAME_MIME_TYPE)
+        return jsonify({'colors': [color.to_hex() for color in unpack_frame(packed)]})
+
+    @app.route('/set_frame', methods=['POST'])
+    def set_frame():
+        try:
+            if request.mimetype == FRAME_MIME_TYPE:
+                frame = parse_binary_frame(request.get_data(), server.get_packed_frame())
+            else:
+                frame = parse_json_frame(request.get_json(silent=True) or {})
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        if not server.output_available:
+            return jsonify({'error': 'Hardware not available'}), 503
+        success = server.apply_frame(frame)
+        return jsonify({'success': success, 'keys': len(frame)})
+
+    register_websocket_routes(app, server)
+    register_sse_routes(app, server)
+
+    @app.route('/latency', methods=['GET'])
+    def latency():
+        return jsonify(frame_latency_tracker.get_stats())
+
+    @app.route('/latency/reset', methods=['POST'])
+    def latency_reset():
+        frame_latency_tracker.reset()
+        return jsonify({'success': True})
+
+    @app.route('/metrics', methods=['GET'])
+    def metrics():
+        return Response(metrics_registry.render(), content_type=METRICS_CONTENT_TYPE)
+
+    @app.after_request
+    def count_request(response):
+        # Label by route pattern, not raw path, to keep cardinality bounded
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        api_requests.labels(route, request.method, response.status_code).inc()
+        return response
+
+    return app
+
+
+def create_api_server(mode: str = API_SERVER_MODE, **kwargs) -> APIServer:
+    """
+    Create an API server in the requested mode
+
+    Args:
+        mode: 'flask' for the threaded Flask server, 'asyncio' for the
+            event loop server with write coalescing and backpressure
+        **kwargs: Passed to the server constructor
+
+    Returns:
+        APIServer: Server instance (not started)
+    """
+    if mode == 'asyncio':
+        from .async_server import AsyncAPIServer
+        return AsyncAPIServer(**kwargs)
+    if mode != 'flask':
+        raise ValueError(f"Unknown API server mode: {mode}")
+    return APIServer(**kwargs)
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Server-sent events stream of the live frame
+
+GET /events/frames?fps=N streams the current frame as text/event-stream
+for remote previews. Each event carries the frame in the versioned wire
+format (see core.frame_codec), base64 encoded:
+
+    id: <frame version>
+    event: frame
+    data: <base64 of RGBF frame>
+
+The first event is a full frame; later ones are encoded against the frame
+that client last received, so they are DELTA spans whenever that is
+smaller. A client never receives more than N events per second and skips
+intermediate frames instead of falling behind.
+"""
+
+import math
+import time
+import base64
+import threading
+from collections import OrderedDict
+from typing import Iterator, Optional, Tuple
+
+from ..core.constants import SSE_DEFAULT_FPS, SSE_MAX_FPS, SSE_KEEPALIVE_INTERVAL
+from ..core.frame_codec import encode_frame
+from ..utils.metrics import cache_requests
+from .stream import FrameFeed
+
+SSE_PATH = '/events/frames'
+SSE_MIME_TYPE = 'text/event-stream'
+SSE_HEADERS = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+SSE_KEEPALIVE = b': keepalive\n\n'
+
+# Encoded events kept for subscribers that are a frame or two behind
+_EVENT_CACHE_SIZE = 32
+
+_event_cache_hits = cache_requests.labels('sse_event', 'hit')
+_event_cache_misses = cache_requests.labels('sse_event', 'miss')
+
+
+def parse_rate(value: Optional[str]) -> float:
+    """
+    Parse a client-requested event rate
+
+    Args:
+        value: Query string value, may be None
+
+    Returns:
+        float: Events per second, clamped to (0, SSE_MAX_FPS]
+    """
+    try:
+        fps = float(value) if value else SSE_DEFAULT_FPS
+    except ValueError:
+        fps = SSE_DEFAULT_FPS
+    if not fps > 0:
+        fps = SSE_DEFAULT_FPS
+    return min(fps, SSE_MAX_FPS)
+
+
+def next_send_time(sent_at: float, interval: float) -> float:
+    """
+    Earliest time a throttled subscriber may send again
+
+    Deadlines are aligned to a grid of the interval on the monotonic clock,
+    so subscribers at the same rate wake together and pick up the same
+    frame, sharing one encoded event.
+
+    Args:
+        sent_at: Monotonic time of the last send
+        interval: Minimum seconds between sends
+
+    Returns:
+        float: Monotonic time of the next grid point after sent_at
+    """
+    return (math.floor(sent_at / interval) + 1) * interval
+
+
+class FrameEventCache:
+    """
+    Shared encoder for frame events
+
+    An event depends only on the frame version being sent and the version
+    the client last received, so subscribers in step with each other share
+    one encoded event: ten viewers cost one encode per frame, not ten.
+    """
+
+    def __init__(self, feed: FrameFeed):
+        self.feed = feed
+        self._lock = threading.Lock()
+        self._events: "OrderedDict[Tuple[int, Optional[int]], bytes]" = OrderedDict()
+        self.encodes = 0
+        self.hits = 0
+
+    def event(self, version: int, packed: bytes,
+              previous_version: Optional[int] = None, previous: Optional[bytes] = None) -> bytes:
+        """
+        Get the SSE event taking a client from one frame to the next
+
+        Args:
+            version: Version of the frame to send
+            packed: Packed frame to send
+            previous_version: Version the client last received, None if none
+            previous: Packed frame the client last received
+
+        Returns:
+            bytes: Complete SSE event
+        """
+        key = (version, previous_version)
+        with self._lock:
+            cached = self._events.get(key)
+            if cached is not None:
+                self.hits += 1
+                _event_cache_hits.inc()
+                return cached
+        _event_cache_misses.inc()
+
+        data = base64.b64encode(encode_frame(packed, previous))
+        event = b'id: %d\nevent: frame\ndata: %s\n\n' % (version, data)
+
+        with self._lock:
+            self.encodes += 1
+            self._events[key] = event
+            while len(self._events) > _EVENT_CACHE_SIZE:
+                self._events.popitem(last=False)
+        return event
+
+    def stream(self, fps: float = SSE_DEFAULT_FPS) -> Iterator[bytes]:
+        """
+        Yield events for one subscriber, throttled to fps
+
+        Blocks between frames, so it is meant for a worker thread such as a
+        Flask streaming response.
+
+        Args:
+            fps: Maximum events per second for this subscriber
+
+        Yields:
+            bytes: SSE events and keepalive comments
+        """
+        interval = 1.0 / fps
+        version, packed = self.feed.latest()
+        yield b'retry: 1000\n' + self.event(version, packed)
+        sent_at = time.monotonic()
+        while True:
+            if self.feed.wait(version, timeout=SSE_KEEPALIVE_INTERVAL) is None:
+                yield SSE_KEEPALIVE
+                continue
+            delay = next_send_time(sent_at, interval) - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            # Take the newest frame after throttling; anything in between is skipped
+            latest_version, latest = self.feed.latest()
+            yield self.event(latest_version, latest, version, packed)
+            version, packed = latest_version, latest
+            sent_at = time.monotonic()
+
+    def get_stats(self) -> dict:
+        """Get encode and cache hit counts"""
+        with self._lock:
+            return {'encodes': self.encodes, 'hits': self.hits}
+
+
+def register_sse_routes(app, server):
+    """
+    Add the /events/frames endpoint to a Flask app
+
+    Args:
+        app: Flask application
+        server: APIServer owning the feed and event cache
+    """
+    from flask import Response, request, stream_with_context
+
+    @app.route(SSE_PATH, methods=['GET'])
+    def frame_events():
+        fps = parse_rate(request.args.get('fps'))
+        return Response(stream_with_context(server.frame_events.stream(fps)),
+                        mimetype=SSE_MIME_TYPE, headers=SSE_HEADERS)
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""Live frame feed shared by the streaming API endpoints"""
+
+import threading
+from typing import Callable, List, Optional, Tuple
+
+from ..core.frame_codec import FRAME_BYTES, pack_frame
+from ..core.rgb_color import RGBColor
+from ..hardware.fanout import OutputDevice
+
+STREAM_DEVICE_NAME = "API Stream"
+
+
+class FrameFeed:
+    """
+    Latest-wins broadcast of the current frame
+
+    Frames are packed once when published; every subscriber reads the same
+    bytes and only ever sees the newest frame, so a slow client skips
+    frames instead of building a backlog.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition(threading.Lock())
+        self._packed = bytes(FRAME_BYTES)
+        self._listeners: List[Callable[[], None]] = []
+        self.version = 0
+
+    def publish(self, colors: List[RGBColor]):
+        """Publish a frame given as colours"""
+        self.publish_packed(pack_frame(colors))
+
+    def publish_packed(self, packed: bytes):
+        """Publish an already packed frame; identical frames are ignored"""
+        with self._condition:
+            if packed == self._packed and self.version:
+                return
+            self._packed = packed
+            self.version += 1
+            self._condition.notify_all()
+            listeners = list(self._listeners)
+        for listener in listeners:
+            listener()
+
+    def add_listener(self, listener: Callable[[], None]):
+        """
+        Register a callback run after each publish
+
+        Lets event-loop based consumers wake up without a blocked thread;
+        the callback runs on the publishing thread and must not block.
+
+        Args:
+            listener: Callback taking no arguments
+        """
+        with self._condition:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[], None]):
+        """Unregister a publish callback"""
+        with self._condition:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def latest(self) -> Tuple[int, bytes]:
+        """Get the current (version, packed frame)"""
+        with self._condition:
+            return self.version, self._packed
+
+    def wait(self, last_version: int, timeout: Optional[float] = None) -> Optional[Tuple[int, bytes]]:
+        """
+        Wait for a frame newer than last_version
+
+        Args:
+            last_version: Version the caller already has
+            timeout: Seconds to wait, None to wait forever
+
+        Returns:
+            Optional[Tuple[int, bytes]]: (version, packed frame), or None on timeout
+        """
+        with self._condition:
+            if self.version == last_version:
+                self._condition.wait(timeout)
+            if self.version == last_version:
+                return None
+            return self.version, self._packed
+
+    def wake(self):
+        """Wake all waiting subscribers without publishing"""
+        with self._condition:
+            self._condition.notify_all()
+
+
+class StreamOutputDevice(OutputDevice):
+    """Fan-out device that publishes rendered effect frames to a FrameFeed"""
+
+    def __init__(self, feed: FrameFeed, name: str = STREAM_DEVICE_NAME, rate_hz: float = 60.0):
+        super().__init__(name, rate_hz=rate_hz)
+        self.feed = feed
+
+    def write_frame(self, colors: List[RGBColor]) -> bool:
+        self.feed.publish(colors)
+        return True
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Binary WebSocket frame stream for the local HTTP API
+
+The message format is chosen once, when the client connects:
+?format=rgbf (the default) carries versioned frames from core.frame_codec
+and ?format=raw carries bare packed RGB, FRAME_BYTES per message. On rgbf
+streams ?delta=1 lets both sides send DELTA frames where they are
+smaller. Clients send frames to drive the keyboard and, unless they
+connect with ?emit=0, receive the live frame.
+
+Requires the optional flask-sock package; without it the endpoint is
+simply not registered.
+"""
+
+import sys
+import time
+import logging
+import argparse
+import threading
+from typing import List, Optional
+
+from ..core.constants import API_HOST
+from ..core.frame_codec import (
+    FRAME_BYTES, STREAM_FORMAT_VERSIONED, STREAM_FORMATS, StreamCodec, pack_frame, unpack_frame
+)
+from ..core.rgb_color import RGBColor
+
+WEBSOCKET_PATH = '/ws/frames'
+
+
+def register_websocket_routes(app, server) -> bool:
+    """
+    Add the /ws/frames endpoint to a Flask app
+
+    Args:
+        app: Flask application
+        server: APIServer owning the frame and feed
+
+    Returns:
+        bool: True if the endpoint was registered
+    """
+    try:
+        from flask import request
+        from flask_sock import Sock
+        from simple_websocket import ConnectionClosed
+    except ImportError:
+        server.logger.info("flask-sock not installed, WebSocket frame stream disabled")
+        return False
+
+    sock = Sock(app)
+
+    @sock.route(WEBSOCKET_PATH)
+    def frames(ws):
+        try:
+            codec = StreamCodec.from_params(request.args)
+        except ValueError as e:
+            server.logger.debug(f"Rejecting frame stream: {e}")
+            ws.close()
+            return
+        if request.args.get('emit', '1') != '0':
+            threading.Thread(target=_send_loop, args=(ws, server.feed, codec),
+                             name="WSFrameSender", daemon=True).start()
+
+        try:
+            while True:
+                data = ws.receive()
+                if not isinstance(data, (bytes, bytearray)):
+                    continue
+                try:
+                    packed = codec.decode(data)
+                except ValueError as e:
+                    server.logger.debug(f"Ignoring malformed frame message: {e}")
+                    continue
+                server.apply_frame(unpack_frame(packed))
+        except ConnectionClosed:
+            pass
+
+    return True
+
+
+def _send_loop(ws, feed, codec: StreamCodec):
+    """Push the newest frame to one client until it disconnects"""
+    version, packed = feed.latest()
+    try:
+        ws.send(codec.encode(packed))
+        while ws.connected:
+            update = feed.wait(version, timeout=1.0)
+            if update is None:
+                continue
+            version, packed = update
+            ws.send(codec.encode(packed))
+    except Exception:
+        # Connection closed underneath us; the receive loop handles cleanup
+        pass
+
+
+class FrameStreamClient:
+    """
+    Client for the /ws/frames endpoint
+
+    Asks the server for its stream format when connecting and encodes and
+    decodes every message in that format.
+    """
+
+    def __init__(self, url: str, delta: bool = True, stream_format: str = STREAM_FORMAT_VERSIONED):
+        """
+        Connect to a frame stream
+
+        Args:
+            url: WebSocket URL, e.g. ws://127.0.0.1:5000/ws/frames
+            delta: Use DELTA frames in both directions when they are smaller
+            stream_format: STREAM_FORMAT_VERSIONED or STREAM_FORMAT_RAW
+        """
+        import simple_websocket
+        self.codec = StreamCodec(stream_format, delta)
+        separator = '&' if '?' in url else '?'
+        self._ws = simple_websocket.Client.connect(f"{url}{separator}{self.codec.query()}")
+        self.bytes_sent = 0
+
+    def send_frame(self, colors: List[RGBColor]):
+        """Send a frame given as colours"""
+        self.send_packed(pack_frame(colors))
+
+    def send_packed(self, packed: bytes):
+        """Send a packed frame in the negotiated format"""
+        message = self.codec.encode(packed)
+        self._ws.send(message)
+        self.bytes_sent += len(message)
+
+    def receive_packed(self, timeout: Optional[float] = None) -> Optional[bytes]:
+        """
+        Receive the next frame from the server
+
+        Args:
+            timeout: Seconds to wait, None to wait forever
+
+        Returns:
+            Optional[bytes]: Packed frame, or None on timeout
+        """
+        data = self._ws.receive(timeout)
+        if data is None:
+            return None
+        return self.codec.decode(data)
+
+    def receive_frame(self, timeout: Optional[float] = None) -> Optional[List[RGBColor]]:
+        """Receive the next frame as colours"""
+        packed = self.receive_packed(timeout)
+        return unpack_frame(packed) if packed is not None else None
+
+    def close(self):
+        """Close the connection"""
+        self._ws.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _test_frame(step: int) -> bytes:
+    # A single lit key sweeping across the keyboard: small deltas, easy to verify
+    data = bytearray(FRAME_BYTES)
+    key = step % (FRAME_BYTES // 3)
+    data[key * 3:key * 3 + 3] = bytes(((step * 7) % 256, 255, (step * 13) % 256))
+    return bytes(data)
+
+
+def run_loopback(url: str, frames: int, delta: bool,
+                 stream_format: str = STREAM_FORMAT_VERSIONED) -> dict:
+    """
+    Stream test frames to a server and check each one is echoed back
+
+    Args:
+        url: Base WebSocket URL of the frame stream
+        frames: Number of frames to send
+        delta: Use delta encoding in both directions
+        stream_format: Stream format to negotiate
+
+    Returns:
+        dict: Frame counts, mismatches, bytes sent and frame rate
+    """
+    mismatches = 0
+    with FrameStreamClient(url, delta=delta, stream_format=stream_format) as client:
+        client.receive_packed(timeout=5.0)  # current frame on connect
+        start = time.monotonic()
+        for step in range(frames):
+            frame = _test_frame(step)
+            client.send_packed(frame)
+            # Frames are latest-wins, so skip ahead until our frame comes back
+            while True:
+                echoed = client.receive_packed(timeout=5.0)
+                if echoed is None or echoed == frame:
+                    break
+            if echoed != frame:
+                mismatches += 1
+        elapsed = time.monotonic() - start
+    return {
+        'frames': frames,
+        'mismatches': mismatches,
+        'bytes_sent': client.bytes_sent,
+        'elapsed': elapsed,
+        'fps': frames / elapsed if elapsed > 0 else 0.0
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point: loopback test of the WebSocket frame stream"""
+    parser = argparse.ArgumentParser(description="Loopback test of the WebSocket frame stream")
+    parser.add_argument('--url', default=None, help="Server to test (default: start a local one)")
+    parser.add_argument('--frames', type=int, default=500, help="Frames to send")
+    parser.add_argument('--full', action='store_true', help="Send full frames instead of deltas")
+    parser.add_argument('--format', choices=STREAM_FORMATS, default=STREAM_FORMAT_VERSIONED,
+                        help="Stream format to negotiate")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+
+    server = None
+    url = args.url
+    if url is None:
+        from .server import APIServer
+        server = APIServer(host=API_HOST, port=0)
+        if not server.start():
+            return 1
+        url = f"ws://{API_HOST}:{server.bound_port}{WEBSOCKET_PATH}"
+    try:
+        stats = run_loopback(url, args.frames, delta=not args.full, stream_format=args.format)
+    finally:
+        if server is not None:
+            server.stop()
+
+    print(f"{stats['frames']} frames in {stats['elapsed']:.2f}s ({stats['fps']:.0f} fps), "
+          f"{stats['bytes_sent']} bytes sent, {stats['mismatches']} mismatched")
+    return 0 if stats['mismatches'] == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
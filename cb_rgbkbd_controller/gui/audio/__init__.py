@@ -0,0 +1,10 @@
+"""
+Audio analysis for the RGB Controller's audio-reactive effects.
+This file makes 'audio' a Python package.
+"""
+from .analysis import AudioAnalyzer, BandLevels, band_bins, hann_window, render_band_frame
+from .ring import BlockRingBuffer
+from .capture import AudioCapture
+from .beat import AudioEvent, BeatTracker, make_effect_trigger
+from .waveform import WavInfo, WaveformPyramid
+__all__ = ['AudioAnalyzer', 'BandLevels', 'band_bins', 'hann_window', 'render_band_frame', 'BlockRingBuffer', 'AudioCapture', 'AudioEvent', 'BeatTracker', 'make_effect_trigger', 'WavInfo', 'WaveformPyramid']
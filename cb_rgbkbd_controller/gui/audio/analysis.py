@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Streaming audio analysis for audio-reactive lighting
+
+AudioAnalyzer turns blocks of captured samples into smoothed per-band
+levels. Samples go into a ring of the last fft_size samples; each block
+is analysed over that window with a Hann window (cached per size) and the
+band energies are gathered through bin index arrays computed once when
+the bands change, not by slicing the spectrum per block.
+
+Results are published as immutable BandLevels snapshots by replacing a
+single reference, so readers (the GUI render tick, effects) never take a
+lock and never see a half-written result. Analysis runs on its own
+thread, fed from the audio callback through a BlockRingBuffer, and does
+no I/O or Tk calls; everything that touches the keyboard or the screen
+reads the latest snapshot from its own thread.
+"""
+
+import time
+import logging
+from functools import lru_cache
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..core.constants import (
+    AUDIO_SAMPLE_RATE, AUDIO_FFT_SIZE, AUDIO_BANDS, AUDIO_LEVEL_FLOOR_DB,
+    AUDIO_SMOOTHING_ATTACK, AUDIO_SMOOTHING_RELEASE, AUDIO_SENSITIVITY_DEFAULT, OSIRIS_KEY_COUNT
+)
+from ..core.rgb_color import RGBColor, Colors
+
+_EPSILON = 1e-12
+
+
+class BandLevels(NamedTuple):
+    """Smoothed band levels from one analysis step"""
+    sequence: int
+    timestamp: float
+    stream_time: float
+    bands: Tuple[str, ...]
+    levels: Tuple[float, ...]
+    peak: float
+
+    def get(self, band: str, default: float = 0.0) -> float:
+        """Get a band's level (0.0 to 1.0) by name"""
+        try:
+            return self.levels[self.bands.index(band)]
+        except ValueError:
+            return default
+
+
+@lru_cache(maxsize=8)
+def hann_window(size: int) -> np.ndarray:
+    """
+    Get a periodic Hann window, cached per size
+
+    Args:
+        size: Window length in samples
+
+    Returns:
+        np.ndarray: Read-only float32 window
+    """
+    window = (0.5 - 0.5 * np.cos(2.0 * np.pi * np.arange(size) / size)).astype(np.float32)
+    window.flags.writeable = False
+    return window
+
+
+def band_bins(bands: Dict[str, Tuple[float, float]], fft_size: int,
+              sample_rate: int = AUDIO_SAMPLE_RATE) -> Dict[str, np.ndarray]:
+    """
+    Compute the rfft bin indices of each frequency band
+
+    Args:
+        bands: Band name -> (low Hz, high Hz)
+        fft_size: Analysis window length in samples
+        sample_rate: Sample rate in Hz
+
+    Returns:
+        Dict[str, np.ndarray]: Band name -> bin indices; a band narrower
+        than one bin gets the bin nearest its centre
+
+    Raises:
+        ValueError: If a band's range is empty or above the Nyquist frequency
+    """
+    nyquist = sample_rate / 2
+    resolution = sample_rate / fft_size
+    last_bin = fft_size // 2
+    bins = {}
+    for name, (low, high) in bands.items():
+        low, high = float(low), float(high)
+        if not 0 <= low < high:
+            raise ValueError(f"Band {name}: invalid range {low:g}-{high:g} Hz")
+        if low >= nyquist:
+            raise ValueError(f"Band {name}: {low:g} Hz is above the Nyquist frequency ({nyquist:g} Hz)")
+        start = max(1, int(np.ceil(low / resolution)))
+        stop = min(last_bin, int(np.ceil(high / resolution)) - 1)
+        if stop < start:
+            centre = min(last_bin, max(1, int(round((low + high) / 2 / resolution))))
+            start = stop = centre
+        bins[name] = np.arange(start, stop + 1, dtype=np.intp)
+    return bins
+
+
+class _BandPlan:
+    """Band layout and smoothing state, replaced as a whole when the bands change"""
+
+    def __init__(self, bands: Dict[str, Tuple[float, float]], fft_size: int, sample_rate: int):
+        self.names = tuple(bands)
+        bins = band_bins(bands, fft_size, sample_rate)
+        # One gather over the concatenated bins plus reduceat over the
+        # band offsets sums every band in two vectorised calls
+        self.index = np.concatenate([bins[name] for name in self.names])
+        counts = np.array([len(bins[name]) for name in self.names], dtype=np.intp)
+        self.offsets = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        self.counts = counts
+        self.smoothed = np.zeros(len(self.names), dtype=np.float64)
+
+
+class AudioAnalyzer:
+    """
+    Per-band level analysis over a sliding window of samples
+
+    process() is driven by AudioCapture's analysis thread; it keeps its
+    working buffers preallocated and publishes each result by swapping the
+    reference read by the levels property.
+    """
+
+    def __init__(self, bands: Optional[Dict[str, Tuple[float, float]]] = None,
+                 sample_rate: int = AUDIO_SAMPLE_RATE, fft_size: int = AUDIO_FFT_SIZE,
+                 attack: float = AUDIO_SMOOTHING_ATTACK, release: float = AUDIO_SMOOTHING_RELEASE,
+                 sensitivity: float = AUDIO_SENSITIVITY_DEFAULT,
+                 parent_logger: Optional[logging.Logger] = None):
+        """
+        Initialize analyzer
+
+        Args:
+            bands: Band name -> (low Hz, high Hz), defaults to AUDIO_BANDS
+            sample_rate: Sample rate of the captured audio in Hz
+            fft_size: Analysis window length in samples
+            attack: Smoothing factor (0-1] applied while a level rises
+            release: Smoothing factor (0-1] applied while a level falls
+            sensitivity: Input gain applied before levels are scaled
+            parent_logger: Parent logger instance
+        """
+        self.logger = (parent_logger.getChild('AudioAnalyzer')
+                       if parent_logger else logging.getLogger('AudioAnalyzer'))
+        self.sample_rate = int(sample_rate)
+        self.fft_size = int(fft_size)
+        self.attack = attack
+        self.release = release
+        self.sensitivity = sensitivity
+        self.floor_db = AUDIO_LEVEL_FLOOR_DB
+
+        self._window = hann_window(self.fft_size)
+        # Mean-square of the signal = sum(|X|^2) * _power_scale (Parseval,
+        # corrected for the window's energy; x2 for the one-sided spectrum)
+        self._power_scale = 2.0 / (self.fft_size * float(np.sum(self._window.astype(np.float64) ** 2)))
+        self._ring = np.zeros(self.fft_size, dtype=np.float32)
+        self._ring_pos = 0
+        self._frame = np.empty(self.fft_size, dtype=np.float32)
+
+        self._plan = _BandPlan(bands or AUDIO_BANDS, self.fft_size, self.sample_rate)
+        self._sequence = 0
+        self._latest = BandLevels(0, 0.0, 0.0, self._plan.names, (0.0,) * len(self._plan.names), 0.0)
+        self._spectrum_listeners: List[Callable[[np.ndarray, BandLevels], None]] = []
+        self.blocks_processed = 0
+        self.samples_processed = 0
+
+    @property
+    def levels(self) -> BandLevels:
+        """Latest published band levels; safe to read from any thread"""
+        return self._latest
+
+    @property
+    def bands(self) -> Tuple[str, ...]:
+        """Names of the analysed bands"""
+        return self._plan.names
+
+    def set_bands(self, bands: Dict[str, Tuple[float, float]]):
+        """
+        Change the analysed frequency bands
+
+        The bin index arrays are rebuilt here, once, and swapped in for the
+        next block.
+
+        Args:
+            bands: Band name -> (low Hz, high Hz)
+
+        Raises:
+            ValueError: If a band's range is invalid
+        """
+        self._plan = _BandPlan(bands, self.fft_size, self.sample_rate)
+        self.logger.debug(f"Analysing bands {', '.join(self._plan.names)}")
+
+    @property
+    def band_bin_counts(self) -> np.ndarray:
+        """Number of rfft bins in each band, in band order"""
+        return self._plan.counts
+
+    def band_sums(self, values: np.ndarray) -> np.ndarray:
+        """
+        Sum per-bin values (e.g. a power spectrum) over each band's bins
+
+        Args:
+            values: One value per rfft bin
+
+        Returns:
+            np.ndarray: One sum per band, in band order
+        """
+        plan = self._plan
+        return np.add.reduceat(values[plan.index], plan.offsets)
+
+    def add_spectrum_listener(self, listener: Callable[[np.ndarray, BandLevels], None]):
+        """
+        Register a callback run with each analysed power spectrum
+
+        The callback runs on the analysis thread with the rfft power
+        spectrum and the snapshot just published; it must not block or
+        keep the spectrum array.
+        """
+        # Copy-on-write so the analysis thread iterates without a lock
+        self._spectrum_listeners = self._spectrum_listeners + [listener]
+
+    def remove_spectrum_listener(self, listener: Callable[[np.ndarray, BandLevels], None]):
+        """Unregister a spectrum callback"""
+        self._spectrum_listeners = [registered for registered in self._spectrum_listeners
+                                    if registered != listener]
+
+    def push(self, samples: np.ndarray):
+        """
+        Append samples to the analysis ring
+
+        Args:
+            samples: 1-D block of samples in [-1.0, 1.0]
+        """
+        count = len(samples)
+        size = self.fft_size
+        if count >= size:
+            self._ring[:] = samples[-size:]
+            self._ring_pos = 0
+            return
+        pos = self._ring_pos
+        first = min(count, size - pos)
+        self._ring[pos:pos + first] = samples[:first]
+        if first < count:
+            self._ring[:count - first] = samples[first:]
+        self._ring_pos = (pos + count) % size
+
+    def analyze(self) -> BandLevels:
+        """
+        Analyse the current window and publish the smoothed band levels
+
+        Returns:
+            BandLevels: The published snapshot
+        """
+        plan = self._plan
+        pos = self._ring_pos
+        frame = self._frame
+        # Unroll the ring oldest-first, then window in place
+        frame[:self.fft_size - pos] = self._ring[pos:]
+        frame[self.fft_size - pos:] = self._ring[:pos]
+        peak = float(np.max(np.abs(frame)))
+        np.multiply(frame, self._window, out=frame)
+
+        spectrum = np.fft.rfft(frame)
+        power = spectrum.real ** 2 + spectrum.imag ** 2
+        power *= self._power_scale
+        band_power = np.add.reduceat(power[plan.index], plan.offsets)
+        # Full-scale sine -> 0 dB -> 1.0; floor_db -> 0.0
+        level_db = 10.0 * np.log10(band_power * 2.0 + _EPSILON) + 20.0 * np.log10(max(self.sensitivity, _EPSILON))
+        raw = np.clip(1.0 - level_db / self.floor_db, 0.0, 1.0)
+
+        smoothed = plan.smoothed
+        coefficient = np.where(raw > smoothed, self.attack, self.release)
+        smoothed += coefficient * (raw - smoothed)
+
+        self._sequence += 1
+        snapshot = BandLevels(self._sequence, time.monotonic(), self.samples_processed / self.sample_rate,
+                              plan.names, tuple(smoothed.tolist()), min(1.0, peak))
+        self._latest = snapshot
+        for listener in self._spectrum_listeners:
+            listener(power, snapshot)
+        return snapshot
+
+    def process(self, samples: np.ndarray) -> BandLevels:
+        """
+        Analyse one captured block
+
+        Args:
+            samples: 1-D block of samples in [-1.0, 1.0]
+
+        Returns:
+            BandLevels: The published snapshot
+        """
+        self.push(samples)
+        self.blocks_processed += 1
+        self.samples_processed += len(samples)
+        return self.analyze()
+
+    def reset(self):
+        """Clear the sample window and decay all levels to zero"""
+        self._ring[:] = 0.0
+        self._ring_pos = 0
+        self._plan.smoothed[:] = 0.0
+        self.samples_processed = 0
+        self._latest = BandLevels(self._sequence, time.monotonic(), 0.0, self._plan.names,
+                                  (0.0,) * len(self._plan.names), 0.0)
+
+
+def render_band_frame(levels: BandLevels, band_keys: Dict[str, Sequence[int]],
+                      band_colors: Dict[str, RGBColor],
+                      base: Optional[List[RGBColor]] = None) -> List[RGBColor]:
+    """
+    Colour the keys of each band by its level
+
+    Args:
+        levels: Snapshot from AudioAnalyzer.levels
+        band_keys: Band name -> 0-based key indices
+        band_colors: Band name -> full-level colour
+        base: Optional frame to draw over, defaults to all keys off
+
+    Returns:
+        List[RGBColor]: New frame of OSIRIS_KEY_COUNT colours
+    """
+    frame = list(base) if base is not None else [Colors.BLACK] * OSIRIS_KEY_COUNT
+    for band, level in zip(levels.bands, levels.levels):
+        keys = band_keys.get(band)
+        color = band_colors.get(band)
+        if not keys or color is None:
+            continue
+        scaled = color * level
+        for index in keys:
+            frame[index] = scaled
+    return frame
@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Realtime onset and beat tracking from the streaming FFT
+
+BeatTracker listens to an AudioAnalyzer's power spectra. Each hop it
+computes the spectral flux: the summed rise of log-compressed magnitude
+over the analysed bands, gathered through the analyzer's band bins.
+An onset is a rising crossing of an adaptive threshold (the median flux
+over the last second times a ratio, above an absolute floor) outside a
+short refractory period.
+
+The tempo is estimated every half second from the autocorrelation of the
+last few seconds of flux, weighted towards 120 BPM to avoid octave
+errors. With a tempo, onsets close to the predicted beat become beats
+and re-anchor the beat grid; through quiet passages the grid keeps
+emitting beats for a few periods before it lets go.
+
+Events are pushed to subscribers as they are detected, so effects react
+to transients without polling levels every frame.
+"""
+
+import random
+import logging
+import threading
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..core.constants import (
+    OSIRIS_KEY_COUNT, BEAT_MIN_INTERVAL, BEAT_THRESHOLD_WINDOW, BEAT_THRESHOLD_RATIO, BEAT_FLUX_FLOOR,
+    BEAT_TEMPO_WINDOW, BEAT_TEMPO_MIN_BPM, BEAT_TEMPO_MAX_BPM, BEAT_TEMPO_UPDATE_INTERVAL,
+    BEAT_TOLERANCE, BEAT_FLYWHEEL_BEATS
+)
+from .analysis import AudioAnalyzer, BandLevels
+
+# Scales magnitudes (1.0 = full-scale sine) before log compression
+_COMPRESSION = 1000.0
+# Minimum autocorrelation peak (relative to lag 0) to trust a tempo
+_TEMPO_MIN_CONFIDENCE = 0.25
+
+ONSET = 'onset'
+BEAT = 'beat'
+
+
+class AudioEvent(NamedTuple):
+    """An onset or beat detected in the audio stream"""
+    kind: str
+    timestamp: float
+    stream_time: float
+    strength: float
+    band: str
+    tempo: float
+
+
+class BeatTracker:
+    """
+    Spectral-flux onset detector and tempo tracker
+
+    Runs on the analyzer's thread; subscribers are called from there and
+    must return quickly. tempo and last_event may be read from any thread.
+    """
+
+    def __init__(self, analyzer: AudioAnalyzer, parent_logger: Optional[logging.Logger] = None):
+        """
+        Initialize tracker and attach it to the analyzer
+
+        Args:
+            analyzer: Analyzer whose spectra are tracked
+            parent_logger: Parent logger instance
+        """
+        self.logger = (parent_logger.getChild('BeatTracker')
+                       if parent_logger else logging.getLogger('BeatTracker'))
+        self.analyzer = analyzer
+        self.threshold_ratio = BEAT_THRESHOLD_RATIO
+        self.flux_floor = BEAT_FLUX_FLOOR
+        self._lock = threading.Lock()
+        self._subscribers: List[Tuple[Callable[[AudioEvent], None], Tuple[str, ...]]] = []
+        self.reset()
+        analyzer.add_spectrum_listener(self._on_spectrum)
+
+    def reset(self):
+        """Forget the flux history, tempo and beat grid"""
+        self._previous: Optional[np.ndarray] = None
+        self._previous_time: Optional[float] = None
+        self._hop = 0.0
+        self._flux: Optional[np.ndarray] = None
+        self._flux_count = 0
+        self._above = False
+        self._last_onset = -1.0
+        self._next_tempo_update = 0.0
+        self._next_beat: Optional[float] = None
+        self._missed_beats = 0
+        self.tempo = 0.0
+        self.tempo_confidence = 0.0
+        self.last_event: Optional[AudioEvent] = None
+        self.onsets = 0
+        self.beats = 0
+
+    def close(self):
+        """Detach from the analyzer"""
+        self.analyzer.remove_spectrum_listener(self._on_spectrum)
+
+    def subscribe(self, callback: Callable[[AudioEvent], None], kinds: Sequence[str] = (ONSET, BEAT)):
+        """
+        Register a callback for detected events
+
+        Args:
+            callback: Called with each AudioEvent on the analysis thread
+            kinds: Event kinds to receive ('onset', 'beat')
+        """
+        with self._lock:
+            self._subscribers = self._subscribers + [(callback, tuple(kinds))]
+
+    def unsubscribe(self, callback: Callable[[AudioEvent], None]):
+        """Unregister an event callback"""
+        with self._lock:
+            self._subscribers = [(registered, kinds) for registered, kinds in self._subscribers
+                                 if registered != callback]
+
+    def _emit(self, event: AudioEvent):
+        self.last_event = event
+        for callback, kinds in self._subscribers:
+            if event.kind in kinds:
+                try:
+                    callback(event)
+                except Exception as e:
+                    self.logger.debug(f"Beat subscriber failed: {e}")
+
+    def _on_spectrum(self, power: np.ndarray, levels: BandLevels):
+        magnitude = np.log1p(_COMPRESSION * np.sqrt(2.0 * power))
+        previous, self._previous = self._previous, magnitude
+        if previous is None or len(previous) != len(magnitude):
+            return
+        rise = np.maximum(magnitude - previous, 0.0)
+        band_flux = self.analyzer.band_sums(rise)
+        self.process_flux(float(np.sum(band_flux)), levels, band_flux / self.analyzer.band_bin_counts)
+
+    def process_flux(self, flux: float, levels: BandLevels, band_flux: Optional[np.ndarray] = None):
+        """
+        Track one hop's spectral flux
+
+        Args:
+            flux: Total spectral flux of the hop
+            levels: Snapshot of the hop, for its timing and band names
+            band_flux: Optional per-band flux per bin, used to name the dominant band
+        """
+        now = levels.stream_time
+        previous_time = self._previous_time
+        if previous_time is not None and now < previous_time:
+            # The analyzer was reset and its stream restarted
+            self.reset()
+            previous_time = None
+        self._previous_time = now
+        if previous_time is not None and now > previous_time:
+            hop = now - previous_time
+            if abs(hop - self._hop) > 1e-6:
+                self._resize_history(hop)
+        if self._flux is None:
+            return
+
+        size = len(self._flux)
+        self._flux[self._flux_count % size] = flux
+        self._flux_count += 1
+        if now >= self._next_tempo_update:
+            self._next_tempo_update = now + BEAT_TEMPO_UPDATE_INTERVAL
+            self._update_tempo()
+
+        window = min(self._flux_count, self._threshold_hops)
+        recent = self._flux[(self._flux_count - window + np.arange(window)) % size]
+        threshold = max(self.flux_floor, float(np.median(recent)) * self.threshold_ratio)
+        above = flux > threshold
+        rising = above and not self._above
+        self._above = above
+
+        period = 60.0 / self.tempo if self.tempo else 0.0
+        if rising and now - self._last_onset >= BEAT_MIN_INTERVAL:
+            self._last_onset = now
+            band = ''
+            if band_flux is not None and len(band_flux) == len(levels.bands):
+                band = levels.bands[int(np.argmax(band_flux))]
+            strength = flux / threshold
+            self.onsets += 1
+            self._emit(AudioEvent(ONSET, levels.timestamp, now, strength, band, self.tempo))
+            if period and (self._next_beat is None or abs(now - self._next_beat) <= BEAT_TOLERANCE * period
+                           or now > self._next_beat + BEAT_TOLERANCE * period):
+                self._beat(levels.timestamp, now, strength, band, period)
+                return
+        if period and self._next_beat is not None and now > self._next_beat + BEAT_TOLERANCE * period:
+            # No onset near the predicted beat: keep the grid going for a while
+            if self._missed_beats < BEAT_FLYWHEEL_BEATS:
+                self._missed_beats += 1
+                self.beats += 1
+                self._next_beat += period
+                self._emit(AudioEvent(BEAT, levels.timestamp, now, 0.0, '', self.tempo))
+            else:
+                self._next_beat = None
+
+    def _beat(self, timestamp: float, now: float, strength: float, band: str, period: float):
+        self._next_beat = now + period
+        self._missed_beats = 0
+        self.beats += 1
+        self._emit(AudioEvent(BEAT, timestamp, now, strength, band, self.tempo))
+
+    def _resize_history(self, hop: float):
+        """Size the flux history for a new hop length"""
+        self._hop = hop
+        self._threshold_hops = max(3, int(round(BEAT_THRESHOLD_WINDOW / hop)))
+        size = max(self._threshold_hops, int(round(BEAT_TEMPO_WINDOW / hop)))
+        self._flux = np.zeros(size, dtype=np.float64)
+        self._flux_count = 0
+        lags = np.arange(size, dtype=np.float64)
+        with np.errstate(divide='ignore'):
+            bpm = 60.0 / (lags * hop)
+        valid = (bpm >= BEAT_TEMPO_MIN_BPM) & (bpm <= BEAT_TEMPO_MAX_BPM)
+        # Log-Gaussian prior centred on 120 BPM, one octave wide
+        self._tempo_lags = lags[valid].astype(np.intp)
+        self._tempo_weights = np.exp(-0.5 * np.log2(bpm[valid] / 120.0) ** 2)
+
+    def _update_tempo(self):
+        """Re-estimate the tempo from the flux autocorrelation"""
+        size = len(self._flux)
+        if self._flux_count < size // 2 or not len(self._tempo_lags):
+            return
+        count = min(self._flux_count, size)
+        envelope = self._flux[(self._flux_count - count + np.arange(count)) % size]
+        # Widen the flux peaks slightly so a period falling between two
+        # lags is not outscored by its better-aligned multiples
+        envelope = np.convolve(envelope - envelope.mean(), (0.25, 0.5, 0.25), mode='same')
+        spectrum = np.fft.rfft(envelope, 2 * count)
+        autocorrelation = np.fft.irfft(spectrum.real ** 2 + spectrum.imag ** 2)[:count]
+        if autocorrelation[0] <= 0:
+            self.tempo = 0.0
+            return
+        lags = self._tempo_lags[self._tempo_lags < count - 1]
+        if not len(lags):
+            return
+        scores = autocorrelation[lags] / autocorrelation[0]
+        best = int(np.argmax(scores * self._tempo_weights[:len(lags)]))
+        self.tempo_confidence = float(scores[best])
+        if scores[best] < _TEMPO_MIN_CONFIDENCE:
+            self.tempo = 0.0
+            return
+        lag = float(lags[best])
+        # Parabolic interpolation around the peak
+        left, centre, right = autocorrelation[int(lag) - 1:int(lag) + 2]
+        denominator = left - 2 * centre + right
+        if denominator < 0:
+            lag += 0.5 * (left - right) / denominator
+        self.tempo = round(60.0 / (lag * self._hop), 1)
+
+
+def make_effect_trigger(effect, band_keys: Optional[Dict[str, Sequence[int]]] = None
+                        ) -> Optional[Callable[[AudioEvent], None]]:
+    """
+    Build an event callback that fires an effect's trigger
+
+    RippleEffect ripples from one of, and ReactiveKeypressEffect lights,
+    the keys mapped to the event's dominant band (all mapped keys if the
+    band has none, a random key if nothing is mapped); LightningEffect
+    strikes.
+
+    Args:
+        effect: Effect instance
+        band_keys: Band name -> 0-based key indices
+
+    Returns:
+        Optional[Callable[[AudioEvent], None]]: Callback, or None if the
+        effect has no trigger
+    """
+    band_keys = band_keys or {}
+    all_keys = sorted({key for keys in band_keys.values() for key in keys})
+
+    def keys_for(event: AudioEvent) -> Sequence[int]:
+        return band_keys.get(event.band) or all_keys or (random.randrange(OSIRIS_KEY_COUNT),)
+
+    if hasattr(effect, 'trigger_ripple'):
+        return lambda event: effect.trigger_ripple(random.choice(keys_for(event)))
+    if hasattr(effect, 'trigger_lightning'):
+        return lambda event: effect.trigger_lightning()
+    if hasattr(effect, 'trigger_key'):
+        def trigger(event: AudioEvent):
+            for key in keys_for(event):
+                effect.trigger_key(key)
+        return trigger
+    return None
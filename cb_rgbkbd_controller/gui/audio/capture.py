@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""Live audio capture feeding an AudioAnalyzer"""
+
+import logging
+import threading
+from typing import Any, Dict, Optional, Union
+
+import numpy as np
+
+from ..core.constants import AUDIO_SAMPLE_RATE, AUDIO_BUFFER_SIZE, AUDIO_RING_BLOCKS
+from .analysis import AudioAnalyzer
+from .ring import BlockRingBuffer
+
+
+def _resolve_device(device: Union[str, int, None]) -> Union[str, int, None]:
+    """Map the GUI's capture source text to a sounddevice device argument"""
+    if device is None:
+        return None
+    if isinstance(device, int):
+        return device
+    device = device.strip()
+    if not device or device.lower() == 'default':
+        return None
+    return int(device) if device.isdigit() else device
+
+
+class AudioCapture:
+    """
+    Mono input stream with analysis on its own thread
+
+    The stream callback only copies each block into a BlockRingBuffer; it
+    never blocks, allocates, logs, draws or sends anything, so a busy GUI
+    or a slow analysis step cannot make the stream miss its deadline. An
+    analysis thread drains the ring and drives the analyzer; readers poll
+    AudioAnalyzer.levels.
+    """
+
+    def __init__(self, analyzer: AudioAnalyzer, device: Union[str, int, None] = None,
+                 block_size: int = AUDIO_BUFFER_SIZE, ring_blocks: int = AUDIO_RING_BLOCKS,
+                 parent_logger: Optional[logging.Logger] = None):
+        """
+        Initialize capture
+
+        Args:
+            analyzer: Analyzer driven by the analysis thread
+            device: sounddevice device name or index; None or 'default' for the default input
+            block_size: Samples per callback block
+            ring_blocks: Blocks buffered between the callback and the analysis thread
+            parent_logger: Parent logger instance
+        """
+        self.logger = (parent_logger.getChild('AudioCapture')
+                       if parent_logger else logging.getLogger('AudioCapture'))
+        self.analyzer = analyzer
+        self.device = _resolve_device(device)
+        self.block_size = int(block_size)
+        self.ring = BlockRingBuffer(ring_blocks, self.block_size)
+        self._block = np.empty(self.block_size, dtype=np.float32)
+        self._stream = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self.stream_errors = 0
+
+    @property
+    def is_running(self) -> bool:
+        """Check if the input stream is active"""
+        return self._stream is not None and self._stream.active
+
+    def _callback(self, indata, frames, time_info, status):
+        # Producer side of the ring: copy and return
+        if status:
+            self.stream_errors += 1
+        self.ring.write(indata[:, 0])
+
+    def _run(self):
+        """Analysis thread: drain the ring, then wait about half a block"""
+        poll = self.block_size / self.analyzer.sample_rate / 2
+        while not self._stop_event.is_set():
+            block = self.ring.read(self._block)
+            if block is None:
+                self._stop_event.wait(poll)
+                continue
+            try:
+                self.analyzer.process(block)
+            except Exception as e:
+                self.logger.error(f"Audio analysis failed: {e}")
+                self._stop_event.wait(poll)
+
+    def start(self) -> bool:
+        """
+        Open and start the input stream and the analysis thread
+
+        Returns:
+            bool: True if capture is running
+        """
+        if self.is_running:
+            return True
+        try:
+            import sounddevice as sd
+        except ImportError:
+            self.logger.error("Audio capture requires the sounddevice package (pip install sounddevice)")
+            return False
+        self.ring.clear()
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='AudioAnalysis', daemon=True)
+        self._thread.start()
+        try:
+            self._stream = sd.InputStream(callback=self._callback, channels=1, dtype='float32',
+                                          samplerate=self.analyzer.sample_rate or AUDIO_SAMPLE_RATE,
+                                          blocksize=self.block_size, device=self.device)
+            self._stream.start()
+        except Exception as e:
+            self.logger.error(f"Could not open audio input {self.device or 'default'}: {e}")
+            self._stream = None
+            self._stop_thread()
+            return False
+        self.logger.info(f"Capturing audio from {self.device or 'default input'}")
+        return True
+
+    def _stop_thread(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def stop(self):
+        """Stop and close the input stream, then the analysis thread"""
+        stream, self._stream = self._stream, None
+        if stream is not None:
+            try:
+                stream.stop()
+                stream.close()
+            except Exception as e:
+                self.logger.debug(f"Error closing audio input: {e}")
+        self._stop_thread()
+        self.analyzer.reset()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get capture and analysis counters"""
+        return {
+            'running': self.is_running,
+            'blocks_captured': self.ring.written,
+            'blocks_analysed': self.analyzer.blocks_processed,
+            'blocks_dropped': self.ring.dropped,
+            'stream_errors': self.stream_errors
+        }
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""Single-producer/single-consumer ring of audio sample blocks"""
+
+from typing import Optional
+
+import numpy as np
+
+
+class BlockRingBuffer:
+    """
+    Preallocated ring of float32 sample blocks between one writer and one reader
+
+    The audio callback is the only writer and the analysis thread the only
+    reader. Each side advances its own counter and only reads the other's,
+    so neither ever takes a lock or waits: write() copies into a slot that
+    already exists and publishes it by bumping the write counter. When the
+    reader falls a full ring behind, the oldest blocks are overwritten; the
+    reader notices from the counters, skips ahead and counts the blocks as
+    dropped, and discards any block the writer lapped mid-copy.
+    """
+
+    def __init__(self, capacity: int, block_size: int):
+        """
+        Initialize ring buffer
+
+        Args:
+            capacity: Number of blocks held
+            block_size: Maximum samples per block
+        """
+        if capacity < 2:
+            raise ValueError("Ring buffer needs at least 2 blocks")
+        self.capacity = int(capacity)
+        self.block_size = int(block_size)
+        self._blocks = np.zeros((self.capacity, self.block_size), dtype=np.float32)
+        self._lengths = np.zeros(self.capacity, dtype=np.intp)
+        # Written only by the producer / only by the consumer
+        self._write_count = 0
+        self._read_count = 0
+        self.dropped = 0
+
+    # Producer side
+
+    def write(self, block: np.ndarray):
+        """
+        Append a block, overwriting the oldest one if the ring is full
+
+        Never blocks and allocates no buffers, so it is safe to call from
+        an audio callback. Blocks longer than block_size keep their newest
+        samples.
+
+        Args:
+            block: 1-D block of samples
+        """
+        count = self._write_count
+        slot = count % self.capacity
+        length = min(len(block), self.block_size)
+        self._blocks[slot, :length] = block[len(block) - length:]
+        self._lengths[slot] = length
+        # Publish only after the slot is complete
+        self._write_count = count + 1
+
+    @property
+    def written(self) -> int:
+        """Total blocks written"""
+        return self._write_count
+
+    # Consumer side
+
+    def available(self) -> int:
+        """Number of blocks waiting to be read"""
+        return min(self._write_count - self._read_count, self.capacity - 1)
+
+    def read(self, out: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
+        """
+        Take the oldest unread block
+
+        Args:
+            out: Optional float32 buffer of at least block_size samples to
+                copy into, so the reader does not allocate either
+
+        Returns:
+            Optional[np.ndarray]: The block (a view of out), or None if no
+            block is waiting
+        """
+        if out is None:
+            out = np.empty(self.block_size, dtype=np.float32)
+        while True:
+            written = self._write_count
+            index = self._read_count
+            if index >= written:
+                return None
+            if written - index >= self.capacity:
+                # Lapped: the slot at index is being rewritten; keep one slot of margin
+                skipped = written - index - self.capacity + 1
+                self.dropped += skipped
+                index += skipped
+            slot = index % self.capacity
+            length = int(self._lengths[slot])
+            out[:length] = self._blocks[slot, :length]
+            if self._write_count - index >= self.capacity:
+                # The writer reached this slot while it was copied; try the next one
+                self.dropped += 1
+                self._read_count = index + 1
+                continue
+            self._read_count = index + 1
+            return out[:length]
+
+    def read_latest(self, out: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
+        """
+        Take the newest block, discarding older unread ones
+
+        Args:
+            out: Optional buffer to copy into, as for read()
+
+        Returns:
+            Optional[np.ndarray]: The newest block, or None if no block is waiting
+        """
+        if self.available() > 1:
+            self._read_count = self._write_count - 1
+        return self.read(out)
+
+    def clear(self):
+        """Discard all unread blocks"""
+        self._read_count = self._write_count
+
+    def __len__(self) -> int:
+        return self.available()
@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+Multi-resolution waveform summaries of .wav files
+
+A WaveformPyramid holds min, max and RMS per bucket of samples at
+power-of-two resolutions: level 0 summarises WAVEFORM_BASE_BLOCK samples
+per bucket and each level above halves the bucket count. Level 0 is built
+in a single pass over the memory-mapped sample data, a chunk at a time,
+and the levels above are reduced from it, so the file is never read into
+memory. The pyramid is cached next to the file and reused while the file
+is unchanged, which makes reopening even an hour-long file instant.
+
+render() picks the coarsest level that still has a bucket per pixel, so
+any zoom level draws in O(width); only views zoomed in below a bucket
+per pixel read raw samples, and then only the visible ones.
+"""
+
+import os
+import struct
+import logging
+from pathlib import Path
+from typing import Optional, Tuple, Union
+
+import numpy as np
+
+from ..core.constants import WAVEFORM_BASE_BLOCK, WAVEFORM_CHUNK_FRAMES, WAVEFORM_CACHE_SUFFIX
+
+WAVEFORM_CACHE_VERSION = 1
+
+_WAVE_FORMAT_PCM = 0x0001
+_WAVE_FORMAT_IEEE_FLOAT = 0x0003
+_WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+class WavInfo:
+    """Format and data location of a .wav file"""
+
+    def __init__(self, path: Path):
+        """
+        Read the RIFF header
+
+        Args:
+            path: Path of the .wav file
+
+        Raises:
+            ValueError: If the file is not a supported .wav file
+        """
+        self.path = Path(path)
+        fmt = None
+        data = None
+        with open(self.path, 'rb') as f:
+            header = f.read(12)
+            if len(header) < 12:
+                raise ValueError(f"{self.path.name} is not a .wav file")
+            riff, _, wave_id = struct.unpack('<4sI4s', header)
+            if riff not in (b'RIFF', b'RF64') or wave_id != b'WAVE':
+                raise ValueError(f"{self.path.name} is not a .wav file")
+            file_size = os.fstat(f.fileno()).st_size
+            while data is None:
+                header = f.read(8)
+                if len(header) < 8:
+                    break
+                chunk_id, chunk_size = struct.unpack('<4sI', header)
+                if chunk_id == b'fmt ':
+                    fmt = f.read(chunk_size)
+                    f.seek(chunk_size & 1, os.SEEK_CUR)
+                elif chunk_id == b'data':
+                    # Streamed/RF64 files may leave the size unset; use the rest of the file
+                    data = (f.tell(), min(chunk_size, file_size - f.tell()))
+                else:
+                    f.seek(chunk_size + (chunk_size & 1), os.SEEK_CUR)
+        if fmt is None or data is None:
+            raise ValueError(f"{self.path.name}: missing {'fmt' if fmt is None else 'data'} chunk")
+
+        format_tag, self.channels, self.sample_rate, _, self.block_align, self.bits = struct.unpack('<HHIIHH', fmt[:16])
+        if format_tag == _WAVE_FORMAT_EXTENSIBLE and len(fmt) >= 26:
+            format_tag = struct.unpack('<H', fmt[24:26])[0]
+        self.is_float = format_tag == _WAVE_FORMAT_IEEE_FLOAT
+        if format_tag not in (_WAVE_FORMAT_PCM, _WAVE_FORMAT_IEEE_FLOAT):
+            raise ValueError(f"{self.path.name}: unsupported format 0x{format_tag:04x}")
+        if (self.is_float and self.bits not in (32, 64)) or (not self.is_float and self.bits not in (8, 16, 24, 32)):
+            raise ValueError(f"{self.path.name}: unsupported {self.bits}-bit samples")
+        if self.channels < 1 or self.block_align != self.channels * self.bits // 8:
+            raise ValueError(f"{self.path.name}: inconsistent format header")
+        self.data_offset, data_size = data
+        self.frames = data_size // self.block_align
+
+    @property
+    def duration(self) -> float:
+        """Length in seconds"""
+        return self.frames / self.sample_rate if self.sample_rate else 0.0
+
+    def open_samples(self) -> np.ndarray:
+        """
+        Memory-map the sample data
+
+        Returns:
+            np.ndarray: Read-only (frames, channels) array; 24-bit files map
+            as (frames, channels, 3) bytes
+        """
+        if self.bits == 24:
+            dtype, shape = np.uint8, (self.frames, self.channels, 3)
+        elif self.is_float:
+            dtype, shape = np.dtype(f'<f{self.bits // 8}'), (self.frames, self.channels)
+        else:
+            dtype, shape = np.dtype('u1' if self.bits == 8 else f'<i{self.bits // 8}'), (self.frames, self.channels)
+        if not self.frames:
+            return np.zeros(shape, dtype=dtype)
+        return np.memmap(self.path, dtype=dtype, mode='r', offset=self.data_offset, shape=shape)
+
+    def to_mono(self, samples: np.ndarray) -> np.ndarray:
+        """
+        Convert mapped samples to mono float32 in [-1.0, 1.0]
+
+        Args:
+            samples: Slice of open_samples()
+
+        Returns:
+            np.ndarray: 1-D float32 samples
+        """
+        if self.bits == 24:
+            raw = samples.astype(np.int32)
+            values = (raw[..., 0] | (raw[..., 1] << 8) | (raw[..., 2] << 16)) << 8 >> 8
+            scale = 1.0 / (1 << 23)
+        elif self.is_float:
+            values, scale = samples, 1.0
+        elif self.bits == 8:
+            values, scale = samples.astype(np.int16) - 128, 1.0 / 128
+        else:
+            values, scale = samples, 1.0 / (1 << (self.bits - 1))
+        mono = values.mean(axis=1, dtype=np.float64) if self.channels > 1 else values[:, 0]
+        return (mono * scale).astype(np.float32)
+
+
+class WaveformPyramid:
+    """
+    Min/max/RMS summaries of a .wav file at power-of-two resolutions
+
+    Use WaveformPyramid.open() to load from the cache or build it.
+    """
+
+    def __init__(self, info: WavInfo, base_block: int, mins: list, maxs: list, powers: list):
+        """
+        Initialize pyramid from its levels
+
+        Args:
+            info: Source file format
+            base_block: Samples per level-0 bucket
+            mins: Per-level bucket minimums
+            maxs: Per-level bucket maximums
+            powers: Per-level bucket mean-square values
+        """
+        self.info = info
+        self.base_block = base_block
+        self.mins = mins
+        self.maxs = maxs
+        self.powers = powers
+        self._samples: Optional[np.ndarray] = None
+
+    @property
+    def frames(self) -> int:
+        """Length in samples"""
+        return self.info.frames
+
+    @property
+    def levels(self) -> int:
+        """Number of pyramid levels"""
+        return len(self.mins)
+
+    @staticmethod
+    def cache_path(path: Union[str, Path]) -> Path:
+        """Get the cache file kept next to a .wav file"""
+        path = Path(path)
+        return path.with_name(path.name + WAVEFORM_CACHE_SUFFIX)
+
+    @classmethod
+    def open(cls, path: Union[str, Path], use_cache: bool = True,
+             parent_logger: Optional[logging.Logger] = None) -> 'WaveformPyramid':
+        """
+        Load a file's pyramid from its cache, or build and cache it
+
+        Args:
+            path: Path of the .wav file
+            use_cache: Read and write the cache file next to the .wav
+            parent_logger: Parent logger instance
+
+        Returns:
+            WaveformPyramid: The pyramid
+
+        Raises:
+            OSError: If the file cannot be read
+            ValueError: If the file is not a supported .wav file
+        """
+        logger = (parent_logger.getChild('WaveformPyramid')
+                  if parent_logger else logging.getLogger('WaveformPyramid'))
+        info = WavInfo(path)
+        stat = info.path.stat()
+        key = np.array([WAVEFORM_CACHE_VERSION, stat.st_size, stat.st_mtime_ns, WAVEFORM_BASE_BLOCK], dtype=np.int64)
+        cache = cls.cache_path(info.path)
+        if use_cache:
+            pyramid = cls._load_cache(info, cache, key, logger)
+            if pyramid is not None:
+                return pyramid
+        pyramid = cls.build(info)
+        if use_cache:
+            pyramid._save_cache(cache, key, logger)
+        return pyramid
+
+    @classmethod
+    def build(cls, info: WavInfo, base_block: int = WAVEFORM_BASE_BLOCK) -> 'WaveformPyramid':
+        """
+        Build a pyramid in one pass over the memory-mapped samples
+
+        Args:
+            info: Source file format
+            base_block: Samples per level-0 bucket
+
+        Returns:
+            WaveformPyramid: The pyramid
+        """
+        samples = info.open_samples()
+        buckets = -(-info.frames // base_block)
+        mins = np.zeros(buckets, dtype=np.float32)
+        maxs = np.zeros(buckets, dtype=np.float32)
+        powers = np.zeros(buckets, dtype=np.float32)
+        chunk = max(base_block, WAVEFORM_CHUNK_FRAMES // base_block * base_block)
+        for start in range(0, info.frames, chunk):
+            mono = info.to_mono(samples[start:start + chunk])
+            first = start // base_block
+            full = len(mono) // base_block
+            if full:
+                blocks = mono[:full * base_block].reshape(full, base_block)
+                mins[first:first + full] = blocks.min(axis=1)
+                maxs[first:first + full] = blocks.max(axis=1)
+                powers[first:first + full] = np.einsum('ij,ij->i', blocks, blocks) / base_block
+            tail = mono[full * base_block:]
+            if len(tail):
+                # Only the file's last bucket can be partial
+                mins[first + full] = tail.min()
+                maxs[first + full] = tail.max()
+                powers[first + full] = float(np.dot(tail, tail)) / len(tail)
+        del samples
+
+        levels_min, levels_max, levels_power = [mins], [maxs], [powers]
+        while len(mins) > 1:
+            # Pad odd lengths by repeating the last bucket, which leaves min/max unchanged
+            if len(mins) % 2:
+                mins, maxs, powers = (np.append(level, level[-1]) for level in (mins, maxs, powers))
+            mins = np.minimum(mins[0::2], mins[1::2])
+            maxs = np.maximum(maxs[0::2], maxs[1::2])
+            powers = (powers[0::2] + powers[1::2]) * np.float32(0.5)
+            levels_min.append(mins)
+            levels_max.append(maxs)
+            levels_power.append(powers)
+        return cls(info, base_block, levels_min, levels_max, levels_power)
+
+    @classmethod
+    def _load_cache(cls, info: WavInfo, cache: Path, key: np.ndarray,
+                    logger: logging.Logger) -> Optional['WaveformPyramid']:
+        if not cache.exists():
+            return None
+        try:
+            with np.load(cache) as data:
+                if not np.array_equal(data['key'], key):
+                    logger.debug(f"Waveform cache {cache.name} is stale")
+                    return None
+                bounds = data['bounds']
+                mins, maxs, powers = data['mins'], data['maxs'], data['powers']
+        except (OSError, KeyError, ValueError) as e:
+            logger.debug(f"Ignoring unreadable waveform cache {cache.name}: {e}")
+            return None
+        def split(values: np.ndarray) -> list:
+            return [values[a:b] for a, b in zip(bounds[:-1], bounds[1:])]
+        return cls(info, int(key[3]), split(mins), split(maxs), split(powers))
+
+    def _save_cache(self, cache: Path, key: np.ndarray, logger: logging.Logger):
+        bounds = np.cumsum([0] + [len(level) for level in self.mins])
+        temp = cache.with_name(cache.name + '.tmp')
+        try:
+            with open(temp, 'wb') as f:
+                np.savez(f, key=key, bounds=bounds, mins=np.concatenate(self.mins),
+                         maxs=np.concatenate(self.maxs), powers=np.concatenate(self.powers))
+            os.replace(temp, cache)
+        except OSError as e:
+            logger.debug(f"Could not write waveform cache {cache}: {e}")
+            try:
+                temp.unlink()
+            except OSError:
+                pass
+
+    def level_for(self, samples_per_pixel: float) -> int:
+        """
+        Get the coarsest level with at least one bucket per pixel
+
+        Args:
+            samples_per_pixel: Samples covered by one pixel
+
+        Returns:
+            int: Level index, or -1 when raw samples are needed
+        """
+        if samples_per_pixel < self.base_block:
+            return -1
+        return min(self.levels - 1, int(np.log2(samples_per_pixel / self.base_block)))
+
+    def render(self, start: int, end: int, width: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Summarise a sample range into one column per pixel
+
+        Args:
+            start: First sample
+            end: End sample (exclusive)
+            width: Number of columns
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray]: Per-column minimum,
+            maximum and RMS, each of up to width values (fewer when the
+            range has fewer samples than columns)
+        """
+        start = max(0, int(start))
+        end = min(self.frames, int(end))
+        if end <= start or width <= 0:
+            empty = np.zeros(0, dtype=np.float32)
+            return empty, empty, empty
+        span = end - start
+        columns = min(width, span)
+        level = self.level_for(span / columns)
+        if level < 0:
+            values = self._raw(start, end)
+            edges = (np.arange(columns) * span) // columns
+            mins = np.minimum.reduceat(values, edges)
+            maxs = np.maximum.reduceat(values, edges)
+            powers = np.add.reduceat(values * values, edges) / np.diff(np.append(edges, span))
+            return mins, maxs, np.sqrt(powers)
+
+        bucket = self.base_block << level
+        first = start // bucket
+        last = min(len(self.mins[level]), -(-end // bucket))
+        # Column c covers buckets [edges[c], edges[c + 1])
+        edges = (start + (np.arange(columns) * span) // columns) // bucket
+        edges = np.minimum(edges, last - 1) - first
+        mins = np.minimum.reduceat(self.mins[level][first:last], edges)
+        maxs = np.maximum.reduceat(self.maxs[level][first:last], edges)
+        powers = self.powers[level][first:last]
+        counts = np.diff(np.append(edges, last - first))
+        rms = np.sqrt(np.add.reduceat(powers, edges) / counts)
+        return mins, maxs, rms
+
+    def _raw(self, start: int, end: int) -> np.ndarray:
+        if self._samples is None:
+            self._samples = self.info.open_samples()
+        return self.info.to_mono(self._samples[start:end])
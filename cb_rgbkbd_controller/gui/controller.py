@@ -3,6 +3,7 @@
 
 import tkinter as tk
 from tkinter import ttk, colorchooser, messagebox, filedialog
+import queue
 import threading
 import time
 import logging
@@ -14,17 +15,26 @@ from plugins.loader import load_plugins
 from .core.constants import (
     APP_NAME, VERSION, OSIRIS_KEY_COUNT, EFFECT_CATEGORIES,
     COLOR_PRESETS, GAMING_COLOR_PROFILES, OSIRIS_KEY_LAYOUT,
-    PREVIEW_WIDTH, PREVIEW_HEIGHT, UI_THEMES
+    PREVIEW_WIDTH, PREVIEW_HEIGHT, UI_THEMES, MQTT_BROKER, MQTT_LISTEN_TOPIC,
+    MQTT_DISCOVERY_FILTER, MQTT_DEFAULT_TOPIC_ZONES, AUDIO_BANDS, AUDIO_BAND_ZONES,
+    AUDIO_BAND_COLORS, AUDIO_RENDER_INTERVAL
 )
 from .core.rgb_color import RGBColor, Colors
 from .core.settings import SettingsManager
 from .core.exceptions import RGBControllerError, HardwareError, ConfigurationError
 from .hardware.controller import HardwareController
+from .hardware.fanout import OutputFanout, KeyboardOutputDevice, VirtualOutputDevice
 from .effects.library import EFFECT_REGISTRY, effect_manager
 from .effects.manager import EffectManager
 from .utils.decorators import safe_execute, ui_safe
 from .utils.input_validation import SafeInputValidation
 from .utils.system_info import system_info
+from .utils.frame_timing import frame_latency_tracker, FRAME_STAGES
+from .utils.metrics import metrics_registry
+from .utils.power import power_monitor
+from .api.client import api_client
+from .api.mqtt import MQTTBridge, resolve_zones
+from .api.mqtt_registry import mqtt_registry
 # Register custom firmware-level effects
 EFFECT_REGISTRY.update({
     "Wave": {"category": "Custom"},
@@ -3270,9 +3280,7 @@ class PerformanceMonitor:
     def __init__(self, controller: RGBController):
         """Initialize performance monitor"""
         self.controller = controller
-        self.frame_times = []
-        self.max_samples = 100
-        self.last_update = time.time()
+        self.interval = 1.0
         self.performance_data = {
             'fps': 0.0,
             'avg_frame_time': 0.0,
@@ -3298,35 +3306,42 @@ class PerformanceMonitor:
         """Stop performance monitoring"""
         self._stop_monitoring.set()
 
+    @staticmethod
+    def _read_counters() -> Dict[str, float]:
+        snapshot = metrics_registry.snapshot()
+        return {
+            'time': time.monotonic(),
+            'frames': snapshot.get('rgbkbd_frames_rendered_total', 0.0),
+            'frame_seconds': snapshot.get('rgbkbd_frame_loop_seconds_sum', 0.0),
+            'cpu_seconds': snapshot.get('process_cpu_seconds_total', 0.0),
+            'rss_bytes': snapshot.get('process_resident_memory_bytes', 0.0)
+        }
+
     def _monitor_loop(self):
-        """Performance monitoring loop"""
-        while not self._stop_monitoring.is_set():
+        """Derive rates from the metrics registry once per interval"""
+        previous = self._read_counters()
+        while not self._stop_monitoring.wait(self.interval):
             try:
-                now = time.time()
-                frame_time = now - self.last_update
-                self.last_update = now
+                current = self._read_counters()
+                elapsed = current['time'] - previous['time']
+                frames = current['frames'] - previous['frames']
+                if elapsed <= 0:
+                    continue
 
-                self.frame_times.append(frame_time)
-                if len(self.frame_times) > self.max_samples:
-                    self.frame_times.pop(0)
-
-                avg_frame_time = sum(self.frame_times) / len(self.frame_times)
-                fps = 1.0 / avg_frame_time if avg_frame_time > 0 else 0.0
+                fps = frames / elapsed
+                avg_frame_time = (current['frame_seconds'] - previous['frame_seconds']) / frames if frames else 0.0
 
                 self.performance_data['fps'] = fps
                 self.performance_data['avg_frame_time'] = avg_frame_time
+                self.performance_data['cpu_usage'] = (current['cpu_seconds'] - previous['cpu_seconds']) / elapsed * 100.0
+                self.performance_data['memory_usage'] = current['rss_bytes'] / (1024 * 1024)  # MiB resident
+                previous = current
 
-                # Optional: add CPU/memory usage tracking here
-                # self.performance_data['cpu_usage'] = psutil.cpu_percent()
-                # self.performance_data['memory_usage'] = psutil.virtual_memory().percent
-
-                if fps < self.fps_threshold or avg_frame_time > self.frame_time_threshold:
+                # Only judge frame rate while an effect is actually rendering
+                if frames and (fps < self.fps_threshold or avg_frame_time > self.frame_time_threshold):
                     self.controller.logger.warning(f"Performance drop: FPS={fps:.2f}, FrameTime={avg_frame_time:.3f}s")
-
-                time.sleep(0.1)
             except Exception as e:
                 self.controller.logger.error(f"Error in performance monitor: {e}")
-                time.sleep(1.0)
 
 class KeyboardShortcuts:
     """Global keyboard shortcuts handler"""
@@ -4204,108 +4219,27 @@ if __name__ == "__main__":
     
 
     def _send_plugin_api(self):
-        import requests
         plugin = self.api_plugin_var.get()
-        try:
-            # Create main window
-            import tkinter as tk
-            from tkinter import ttk
-            self.root = tk.Tk()
-            self.root.title(f"{APP_NAME} v{VERSION}")
-            self.root.geometry("900x700")
-            self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
-
-            # Apply theme
-            self._apply_theme()
-
-            # Create main layout
-            self._create_main_layout()
-
-            # Initialize hardware
-            self._initialize_hardware()
-
-            # Initialize effects manager
-            self._initialize_effects_manager()
-
-            # Create GUI sections
-            self._create_header()
-            self._create_effect_controls()
-            self._create_color_controls()
-            self._create_per_key_editor()
-            self._create_preview_panel()
-            self._create_status_bar()
-            self._create_audio_layering_tab()
-            self._create_rgbpreset_export_tab()
-            self._create_band_mapping_tab()
-            self._create_waveform_render_tab()
-            self._create_changelog_diff_tab()
-            self._create_gif_export_tab()
-            self._create_mqtt_listener_tab()
-            self._create_freq_band_tab()
-            self._create_visualizer_presets_tab()
-
-            self.gui_initialized = True
-            self.logger.info("GUI initialization completed successfully")
-            return True
 
-        except Exception as e:
-            print(f"[ERROR] GUI initialization failed: {e}")
-            return False
+        def on_response(result):
+            if isinstance(result, Exception):
+                text = f"Error: {result}"
+            else:
+                text = f"Response: {result.status_code} {result.text.strip()}"
+            self.root.after(0, lambda: self.api_response_label.config(text=text))
 
-#         except Exception as e:
-#             self.api_response_label.config(text=f"Error: {e}")
+        api_client.post_async('/run_plugin', json={'plugin': plugin}, callback=on_response)
     
 
     def _update_flask_status(self):
-        import requests
-        try:
-            # Create main window
-            import tkinter as tk
-            from tkinter import ttk
-            self.root = tk.Tk()
-            self.root.title(f"{APP_NAME} v{VERSION}")
-            self.root.geometry("900x700")
-            self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
-
-            # Apply theme
-            self._apply_theme()
-
-            # Create main layout
-            self._create_main_layout()
-
-            # Initialize hardware
-            self._initialize_hardware()
-
-            # Initialize effects manager
-            self._initialize_effects_manager()
-
-            # Create GUI sections
-            self._create_header()
-            self._create_effect_controls()
-            self._create_color_controls()
-            self._create_per_key_editor()
-            self._create_preview_panel()
-            self._create_status_bar()
-            self._create_audio_layering_tab()
-            self._create_rgbpreset_export_tab()
-            self._create_band_mapping_tab()
-            self._create_waveform_render_tab()
-            self._create_changelog_diff_tab()
-            self._create_gif_export_tab()
-            self._create_mqtt_listener_tab()
-            self._create_freq_band_tab()
-            self._create_visualizer_presets_tab()
-
-            self.gui_initialized = True
-            self.logger.info("GUI initialization completed successfully")
-            return True
-
-        except Exception as e:
-            print(f"[ERROR] GUI initialization failed: {e}")
-            return False
-
-#         except:
-#             self.flask_status_label.config(text="API: ✗ Offline")
+        def on_response(result):
+            online = not isinstance(result, Exception)
+            self.root.after(0, lambda: self.flask_status_label.config(
+                text="API: ✓ Online" if online else "API: ✗ Offline"))
+
+        # Revalidates with If-None-Match, so an idle server only answers 304
+        api_client.get_json_async('/status', callback=on_response)
+        self.root.after(5000, self._update_flask_status)
     
 
     def _create_log_tab(self):
@@ -4417,114 +4351,36 @@ if __name__ == "__main__":
         self.api_test_result = tk.Text(frame, height=10)
         self.api_test_result.pack(fill=tk.BOTH, expand=True)
 
-    def _send_api_test(self):
-        import requests
+    def _send_api_test(self, revalidate: bool = False):
         endpoint = self.api_endpoint_var.get()
         payload = self.api_payload_var.get()
         try:
-            # Create main window
-            import tkinter as tk
-            from tkinter import ttk
-            self.root = tk.Tk()
-            self.root.title(f"{APP_NAME} v{VERSION}")
-            self.root.geometry("900x700")
-            self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
-
-            # Apply theme
-            self._apply_theme()
-
-            # Create main layout
-            self._create_main_layout()
-
-            # Initialize hardware
-            self._initialize_hardware()
-
-            # Initialize effects manager
-            self._initialize_effects_manager()
-
-            # Create GUI sections
-            self._create_header()
-            self._create_effect_controls()
-            self._create_color_controls()
-            self._create_per_key_editor()
-            self._create_preview_panel()
-            self._create_status_bar()
-            self._create_audio_layering_tab()
-            self._create_rgbpreset_export_tab()
-            self._create_band_mapping_tab()
-            self._create_waveform_render_tab()
-            self._create_changelog_diff_tab()
-            self._create_gif_export_tab()
-            self._create_mqtt_listener_tab()
-            self._create_freq_band_tab()
-            self._create_visualizer_presets_tab()
-
-            self.gui_initialized = True
-            self.logger.info("GUI initialization completed successfully")
-            return True
-
+            if payload.strip():
+                response = api_client.post(endpoint, json=json.loads(payload))
+            else:
+                # On auto-refresh, ask only for changes to what is already shown
+                shown = getattr(self, '_api_test_etag', None)
+                headers = {'If-None-Match': shown[1]} if revalidate and shown and shown[0] == endpoint else {}
+                response = api_client.get(endpoint, headers=headers)
+                if response.status_code == 304:
+                    return
+                etag = response.headers.get('ETag')
+                self._api_test_etag = (endpoint, etag) if etag else None
+            self.api_test_result.delete(1.0, tk.END)
+            self.api_test_result.insert(tk.END, f"{response.status_code}\n{response.text}")
         except Exception as e:
-            print(f"[ERROR] GUI initialization failed: {e}")
-            return False
-
-#         except Exception as e:
-#             self.api_test_result.delete(1.0, tk.END)
-#             self.api_test_result.insert(tk.END, f"Error: {e}")
+            self.api_test_result.delete(1.0, tk.END)
+            self.api_test_result.insert(tk.END, f"Error: {e}")
     
 
     def _update_flask_tray_status(self):
-        import requests
-        try:
-            # Create main window
-            import tkinter as tk
-            from tkinter import ttk
-            self.root = tk.Tk()
-            self.root.title(f"{APP_NAME} v{VERSION}")
-            self.root.geometry("900x700")
-            self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
-
-            # Apply theme
-            self._apply_theme()
-
-            # Create main layout
-            self._create_main_layout()
-
-            # Initialize hardware
-            self._initialize_hardware()
-
-            # Initialize effects manager
-            self._initialize_effects_manager()
-
-            # Create GUI sections
-            self._create_header()
-            self._create_effect_controls()
-            self._create_color_controls()
-            self._create_per_key_editor()
-            self._create_preview_panel()
-            self._create_status_bar()
-            self._create_audio_layering_tab()
-            self._create_rgbpreset_export_tab()
-            self._create_band_mapping_tab()
-            self._create_waveform_render_tab()
-            self._create_changelog_diff_tab()
-            self._create_gif_export_tab()
-            self._create_mqtt_listener_tab()
-            self._create_freq_band_tab()
-            self._create_visualizer_presets_tab()
-
-            self.gui_initialized = True
-            self.logger.info("GUI initialization completed successfully")
-            return True
-
-        except Exception as e:
-            print(f"[ERROR] GUI initialization failed: {e}")
-            return False
+        def on_response(result):
+            online = not isinstance(result, Exception)
+            self.root.after(0, self.tray_flask_status.set, "API: ✓ Online" if online else "API: ✗ Offline")
 
-#         except:
-#             self.tray_flask_status.set("API: ✗ Offline")
-#         self.root.after(5000, self._update_flask_tray_status)
+        api_client.get_json_async('/status', callback=on_response)
+        self.root.after(5000, self._update_flask_tray_status)
     
-
     def _search_logs(self):
         query = self.log_search_var.get().lower()
         content = self.log_text.get(1.0, tk.END)
@@ -4536,7 +4392,7 @@ if __name__ == "__main__":
 
     def _auto_refresh_api_test(self):
         if self.api_auto_refresh_var.get():
-            self._send_api_test()
+            self._send_api_test(revalidate=True)
         self.root.after(5000, self._auto_refresh_api_test)
     
 
@@ -4903,7 +4759,6 @@ if __name__ == "__main__":
 
     def _apply_zone_colors(self):
         """Apply zone colors to hardware"""
-        import requests
         try:
             for i, color in enumerate(self.zone_colors):
                 # Example: send color to hardware zone i
@@ -4932,15 +4787,16 @@ if __name__ == "__main__":
                 self.preset_listbox.insert(tk.END, fname)
 
     def _load_selected_preset(self):
-        import json, requests
+        import json
         selection = self.preset_listbox.curselection()
         if not selection:
             return
         fname = self.preset_listbox.get(selection[0])
         with open(os.path.join("presets", fname)) as f:
             preset = json.load(f)
-        for zone, color in preset.get("zones", {}).items():
-            requests.post("http://127.0.0.1:5000/set_zone_color", json={"zone": int(zone), "color": color})
+        zones = {str(int(zone)): color for zone, color in preset.get("zones", {}).items()}
+        if zones:
+            api_client.set_zones(zones)
     
 
     def _create_layout_tab(self):
@@ -4976,7 +4832,7 @@ if __name__ == "__main__":
         ttk.Button(frame, text="Import Timeline", command=self._import_timeline).pack(pady=2)
 
     def _run_timeline_effect(self):
-        import json, time, requests
+        import json, time
         try:
             # Create main window
             import tkinter as tk
@@ -5050,7 +4906,6 @@ if __name__ == "__main__":
 
     def _apply_group_colors(self):
         """Apply group colors to specified zones"""
-        import requests
         try:
             color = self.group_color_var.get()
             for name, var in self.group_entries.items():
@@ -5075,7 +4930,6 @@ if __name__ == "__main__":
         self.root.after(3000, self._update_diagnostics)
 
     def _update_diagnostics(self):
-        import requests
         try:
             # Create main window
             import tkinter as tk
@@ -5179,17 +5033,31 @@ if __name__ == "__main__":
 
         self.fps_var = tk.StringVar(value="FPS: --")
         self.latency_var = tk.StringVar(value="Latency: -- ms")
+        self.stage_latency_var = tk.StringVar(value="Stages (p50/p95 ms): --")
         self.sync_var = tk.StringVar(value="Zone Sync: --")
 
         ttk.Label(self.diagnostics_metrics, textvariable=self.fps_var).pack(anchor=tk.W)
         ttk.Label(self.diagnostics_metrics, textvariable=self.latency_var).pack(anchor=tk.W)
+        ttk.Label(self.diagnostics_metrics, textvariable=self.stage_latency_var).pack(anchor=tk.W)
         ttk.Label(self.diagnostics_metrics, textvariable=self.sync_var).pack(anchor=tk.W)
 
+    def _read_frame_latency_metrics(self):
+        """Publish measured frame rate and per-stage latency to the metric labels"""
+        stats = frame_latency_tracker.get_stats()
+        fps = stats['delivered_fps']
+        latency_ms = stats['stages']['total']['p95'] * 1000
+
+        self.fps_var.set(f"FPS: {fps:.1f}")
+        self.latency_var.set(f"Latency: {latency_ms:.1f} ms (p95, render to write)")
+        self.stage_latency_var.set("Stages (p50/p95 ms): " + ", ".join(
+            f"{stage} {stats['stages'][stage]['p50'] * 1000:.1f}/{stats['stages'][stage]['p95'] * 1000:.1f}"
+            for stage in FRAME_STAGES if stage != 'total'))
+        self.sync_var.set(f"Zone Sync: {stats['frames_completed']} writes, "
+                          f"last frame #{stats['last_sequence']} of {stats['frames_started']}")
+        return fps, latency_ms
+
     def _update_diagnostics_metrics(self):
-        import random
-        self.fps_var.set(f"FPS: {random.randint(28, 32)}")
-        self.latency_var.set(f"Latency: {random.randint(5, 15)} ms")
-        self.sync_var.set("Zone Sync: OK")
+        self._read_frame_latency_metrics()
         self.root.after(3000, self._update_diagnostics_metrics)
     
 
@@ -5418,7 +5286,7 @@ if __name__ == "__main__":
         return interpolated
 
     def _run_timeline_effect(self):
-        import json, time, requests
+        import json, time
         try:
             # Create main window
             import tkinter as tk
@@ -5483,12 +5351,7 @@ if __name__ == "__main__":
         self.diagnostics_ax = ax
 
     def _update_diagnostics_metrics(self):
-        import random
-        fps = random.randint(28, 32)
-        latency = random.randint(5, 15)
-        self.fps_var.set(f"FPS: {fps}")
-        self.latency_var.set(f"Latency: {latency} ms")
-        self.sync_var.set("Zone Sync: OK")
+        fps, latency = self._read_frame_latency_metrics()
 
         self.diagnostics_data["fps"].append(fps)
         self.diagnostics_data["latency"].append(latency)
@@ -5635,7 +5498,7 @@ if __name__ == "__main__":
         return interpolated
 
     def _run_timeline_effect(self):
-        import json, time, requests
+        import json, time
         try:
             # Create main window
             import tkinter as tk
@@ -5736,55 +5599,25 @@ if __name__ == "__main__":
 #         except Exception as e:
 #             print(f"Export failed: {e}")
 
+    def _write_diagnostics_csv(self, path: str):
+        """Write every metrics registry sample to a CSV file"""
+        import csv, datetime
+        timestamp = datetime.datetime.now().isoformat(timespec='seconds')
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['timestamp', 'metric', 'value'])
+            for metric, value in sorted(metrics_registry.snapshot().items()):
+                writer.writerow([timestamp, metric, value])
+
     def _export_diagnostics_csv(self):
+        path = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV files", "*.csv")])
+        if not path:
+            return
         try:
-            # Create main window
-            import tkinter as tk
-            from tkinter import ttk
-            self.root = tk.Tk()
-            self.root.title(f"{APP_NAME} v{VERSION}")
-            self.root.geometry("900x700")
-            self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
-
-            # Apply theme
-            self._apply_theme()
-
-            # Create main layout
-            self._create_main_layout()
-
-            # Initialize hardware
-            self._initialize_hardware()
-
-            # Initialize effects manager
-            self._initialize_effects_manager()
-
-            # Create GUI sections
-            self._create_header()
-            self._create_effect_controls()
-            self._create_color_controls()
-            self._create_per_key_editor()
-            self._create_preview_panel()
-            self._create_status_bar()
-            self._create_audio_layering_tab()
-            self._create_rgbpreset_export_tab()
-            self._create_band_mapping_tab()
-            self._create_waveform_render_tab()
-            self._create_changelog_diff_tab()
-            self._create_gif_export_tab()
-            self._create_mqtt_listener_tab()
-            self._create_freq_band_tab()
-            self._create_visualizer_presets_tab()
-
-            self.gui_initialized = True
-            self.logger.info("GUI initialization completed successfully")
-            return True
-
+            self._write_diagnostics_csv(path)
+            self.logger.info(f"Diagnostics exported to {path}")
         except Exception as e:
-            print(f"[ERROR] GUI initialization failed: {e}")
-            return False
-
-#         except Exception as e:
-#             print(f"Export failed: {e}")
+            self.logger.error(f"Export failed: {e}")
     
 
     def _create_config_browser_tagging(self):
@@ -5879,7 +5712,7 @@ if __name__ == "__main__":
         return interpolated
 
     def _run_timeline_effect(self):
-        import json, time, requests
+        import json, time
         try:
             # Create main window
             import tkinter as tk
@@ -6182,58 +6015,16 @@ if __name__ == "__main__":
             self.logger.error(f"Diagnostics rotation failed: {e}")
 
     def _auto_export_diagnostics(self):
-        import csv, datetime
+        import datetime
+        path = f"diagnostics_{datetime.datetime.now():%Y%m%d_%H%M%S}.csv"
         try:
-            # Create main window
-            import tkinter as tk
-            from tkinter import ttk
-            self.root = tk.Tk()
-            self.root.title(f"{APP_NAME} v{VERSION}")
-            self.root.geometry("900x700")
-            self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
-
-            # Apply theme
-            self._apply_theme()
-
-            # Create main layout
-            self._create_main_layout()
-
-            # Initialize hardware
-            self._initialize_hardware()
-
-            # Initialize effects manager
-            self._initialize_effects_manager()
-
-            # Create GUI sections
-            self._create_header()
-            self._create_effect_controls()
-            self._create_color_controls()
-            self._create_per_key_editor()
-            self._create_preview_panel()
-            self._create_status_bar()
-            self._create_audio_layering_tab()
-            self._create_rgbpreset_export_tab()
-            self._create_band_mapping_tab()
-            self._create_waveform_render_tab()
-            self._create_changelog_diff_tab()
-            self._create_gif_export_tab()
-            self._create_mqtt_listener_tab()
-            self._create_freq_band_tab()
-            self._create_visualizer_presets_tab()
-
-            self.gui_initialized = True
-            self.logger.info("GUI initialization completed successfully")
-            return True
-
-        except Exception as e:
-            print(f"[ERROR] GUI initialization failed: {e}")
-            return False
-
-#         except Exception as e:
-#             print(f"Auto-export failed: {e}")
-    
-# === ULTRA SUITE INTEGRATION ===
-self.ultra_suite_loaded = True
+            self._write_diagnostics_csv(path)
+            self._rotate_diagnostics_files()
+        except Exception as e:
+            self.logger.error(f"Auto-export failed: {e}")
+    
+# === ULTRA SUITE INTEGRATION ===
+self.ultra_suite_loaded = True
 
 def _create_adaptive_toggle(self):
     self.adaptive_var = tk.BooleanVar(value=False)
@@ -6369,15 +6160,27 @@ def _create_trigger_tab(self):
     ttk.Label(self.trigger_tab, text="Battery Trigger").pack()
     self.trigger_var = tk.BooleanVar(value=False)
     ttk.Checkbutton(self.trigger_tab, text="Pulse Red if Battery < 20%", variable=self.trigger_var).pack()
-    self.root.after(10000, self._check_triggers)
+    # Power changes arrive on the monitor thread, which must not call into
+    # Tk at all; they are queued and drained by the Tk loop
+    self._power_events = queue.Queue()
+    power_monitor.add_listener(self._power_events.put)
+    self.root.after(500, self._poll_power_events)
+
+def _poll_power_events(self):
+    state = None
+    try:
+        while True:
+            state = self._power_events.get_nowait()
+    except queue.Empty:
+        pass
+    if state is not None:
+        self._check_triggers(state)
+    self.root.after(500, self._poll_power_events)
 
-def _check_triggers(self):
-    import random, requests
-    battery = random.randint(0, 100)
-    if self.trigger_var.get() and battery < 20:
-        for i in range(24):
-            requests.post("http://127.0.0.1:5000/set_zone_color", json={"zone": i+1, "color": "#FF0000"})
-    self.root.after(10000, self._check_triggers)
+def _check_triggers(self, state=None):
+    state = state or power_monitor.state
+    if self.trigger_var.get() and state.low_battery:
+        api_client.set_zones({i + 1: "#FF0000" for i in range(24)})
 
 
 def _create_script_editor_tab(self):
@@ -6732,6 +6535,35 @@ def _start_mqtt_sync(self):
 #     except Exception as e:
 #         print(f"❌ MQTT sync failed: {e}")
 
+def _get_mqtt_bridge(self):
+    """Create the MQTT bridge shared by all MQTT tabs on first use"""
+    if getattr(self, 'mqtt_bridge', None) is None:
+        self.mqtt_bridge = MQTTBridge(self._get_output_fanout(), registry=mqtt_registry,
+                                      parent_logger=getattr(self, 'logger', None))
+    return self.mqtt_bridge
+
+def _start_mqtt_bridge(self, broker: str) -> bool:
+    """Connect the shared MQTT bridge; its frames go out through the output fan-out"""
+    self._get_output_fanout().start()
+    bridge = self._get_mqtt_bridge()
+    if not bridge.start(broker.strip() or MQTT_BROKER):
+        print(f"❌ MQTT connection to {broker} failed")
+        return False
+    if not getattr(self, '_mqtt_stats_scheduled', False):
+        self._mqtt_stats_scheduled = True
+        self._update_mqtt_stats()
+    return True
+
+def _update_mqtt_stats(self):
+    """Show the shared MQTT bridge's message counters, refreshed every second"""
+    stats = self.mqtt_bridge.get_stats()
+    text = (f"{'Connected to ' + stats['broker'] if stats['connected'] else 'Not connected'} | "
+            f"{stats['messages_received']} messages, {stats['frames_submitted']} frames, "
+            f"{stats['messages_coalesced']} coalesced, {stats['messages_dropped']} dropped")
+    if getattr(self, 'mqtt_stats_label', None) is not None:
+        self.mqtt_stats_label.config(text=text)
+    self.root.after(1000, self._update_mqtt_stats)
+
 def _create_mqtt_listener_tab(self):
     """Create MQTT listener tab in the GUI"""
     self.mqtt_tab = ttk.Frame(self.notebook)
@@ -6747,115 +6579,23 @@ def _create_mqtt_listener_tab(self):
     ttk.Entry(self.mqtt_tab, textvariable=self.mqtt_broker_var).pack()
 
     ttk.Label(self.mqtt_tab, text="Topic").pack()
-    self.mqtt_topic_var = tk.StringVar(value="rgb/effects")
+    self.mqtt_topic_var = tk.StringVar(value=MQTT_LISTEN_TOPIC)
     ttk.Entry(self.mqtt_tab, textvariable=self.mqtt_topic_var).pack()
 
     ttk.Button(self.mqtt_tab, text="Start Listener", command=self._start_mqtt_listener).pack(pady=5)
+    self.mqtt_stats_label = ttk.Label(self.mqtt_tab, text="MQTT bridge not running")
+    self.mqtt_stats_label.pack(pady=5)
 
 def _start_mqtt_listener(self):
-        try:
-            # Create main window
-            import tkinter as tk
-            from tkinter import ttk
-            self.root = tk.Tk()
-            self.root.title(f"{APP_NAME} v{VERSION}")
-            self.root.geometry("900x700")
-            self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
-
-            # Apply theme
-            self._apply_theme()
-
-            # Create main layout
-            self._create_main_layout()
-
-            # Initialize hardware
-            self._initialize_hardware()
-
-            # Initialize effects manager
-            self._initialize_effects_manager()
-
-            # Create GUI sections
-            self._create_header()
-            self._create_effect_controls()
-            self._create_color_controls()
-            self._create_per_key_editor()
-            self._create_preview_panel()
-            self._create_status_bar()
-            self._create_audio_layering_tab()
-            self._create_rgbpreset_export_tab()
-            self._create_band_mapping_tab()
-            self._create_waveform_render_tab()
-            self._create_changelog_diff_tab()
-            self._create_gif_export_tab()
-            self._create_mqtt_listener_tab()
-            self._create_freq_band_tab()
-            self._create_visualizer_presets_tab()
-
-            self.gui_initialized = True
-            self.logger.info("GUI initialization completed successfully")
-            return True
-
-        except Exception as e:
-            print(f"[ERROR] GUI initialization failed: {e}")
-            return False
-
-        try:
-            # Create main window
-            import tkinter as tk
-            from tkinter import ttk
-            self.root = tk.Tk()
-            self.root.title(f"{APP_NAME} v{VERSION}")
-            self.root.geometry("900x700")
-            self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
-
-            # Apply theme
-            self._apply_theme()
-
-            # Create main layout
-            self._create_main_layout()
-
-            # Initialize hardware
-            self._initialize_hardware()
-
-            # Initialize effects manager
-            self._initialize_effects_manager()
-
-            # Create GUI sections
-            self._create_header()
-            self._create_effect_controls()
-            self._create_color_controls()
-            self._create_per_key_editor()
-            self._create_preview_panel()
-            self._create_status_bar()
-            self._create_audio_layering_tab()
-            self._create_rgbpreset_export_tab()
-            self._create_band_mapping_tab()
-            self._create_waveform_render_tab()
-            self._create_changelog_diff_tab()
-            self._create_gif_export_tab()
-            self._create_mqtt_listener_tab()
-            self._create_freq_band_tab()
-            self._create_visualizer_presets_tab()
-
-            self.gui_initialized = True
-            self.logger.info("GUI initialization completed successfully")
-            return True
-
-        except Exception as e:
-            print(f"[ERROR] GUI initialization failed: {e}")
-            return False
-
-#             except Exception as e:
-#                 print(f"❌ MQTT message error: {e}")
-
-        client = mqtt.Client()
-        client.on_message = on_message
-        client.connect(self.mqtt_broker_var.get(), 1883, 60)
-        client.subscribe(self.mqtt_topic_var.get())
-        client.loop_start()
-        print(f"✅ MQTT listener started on topic {self.mqtt_topic_var.get()}")
-#     except Exception as e:
-#         print(f"❌ MQTT listener failed: {e}")
+    """Subscribe the shared MQTT bridge to the listener topic"""
+    topic = self.mqtt_topic_var.get().strip()
+    try:
+        self._get_mqtt_bridge().listen(topic)
+    except ValueError as e:
+        print(f"❌ MQTT listener failed: {e}")
+        return
+    if self._start_mqtt_bridge(self.mqtt_broker_var.get()):
+        print(f"✅ MQTT listener started on topic {topic}")
 
 
 def _create_script_editor_tab(self):
@@ -6982,63 +6722,21 @@ def _create_mqtt_group_tab(self):
     self.mqtt_group_broker_var = tk.StringVar(value="localhost")
     ttk.Entry(self.mqtt_group_tab, textvariable=self.mqtt_group_broker_var).pack()
 
-    self.topic_zone_map = {
-        "rgb/wasd": [1, 2, 3, 4],
-        "rgb/numpad": [17, 18, 19, 20],
-        "rgb/function": [5, 6, 7, 8]
-    }
+    self.topic_zone_map = dict(MQTT_DEFAULT_TOPIC_ZONES)
 
     ttk.Button(self.mqtt_group_tab, text="Start Group Listener", command=self._start_mqtt_group_listener).pack(pady=5)
 
 def _start_mqtt_group_listener(self):
-        try:
-            # Create main window
-            import tkinter as tk
-            from tkinter import ttk
-            self.root = tk.Tk()
-            self.root.title(f"{APP_NAME} v{VERSION}")
-            self.root.geometry("900x700")
-            self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
-
-            # Apply theme
-            self._apply_theme()
-
-            # Create main layout
-            self._create_main_layout()
-
-            # Initialize hardware
-            self._initialize_hardware()
-
-            # Initialize effects manager
-            self._initialize_effects_manager()
-
-            # Create GUI sections
-            self._create_header()
-            self._create_effect_controls()
-            self._create_color_controls()
-            self._create_per_key_editor()
-            self._create_preview_panel()
-            self._create_status_bar()
-            self._create_audio_layering_tab()
-            self._create_rgbpreset_export_tab()
-            self._create_band_mapping_tab()
-            self._create_waveform_render_tab()
-            self._create_changelog_diff_tab()
-            self._create_gif_export_tab()
-            self._create_mqtt_listener_tab()
-            self._create_freq_band_tab()
-            self._create_visualizer_presets_tab()
-
-            self.gui_initialized = True
-            self.logger.info("GUI initialization completed successfully")
-            return True
-
-        except Exception as e:
-            print(f"[ERROR] GUI initialization failed: {e}")
-            return False
-
-#     except Exception as e:
-#         print(f"❌ MQTT group listener failed: {e}")
+    """Map each group topic to its zones on the shared MQTT bridge"""
+    bridge = self._get_mqtt_bridge()
+    try:
+        for topic, zones in self.topic_zone_map.items():
+            bridge.set_mapping(topic, zones)
+    except ValueError as e:
+        print(f"❌ MQTT group listener failed: {e}")
+        return
+    if self._start_mqtt_bridge(self.mqtt_group_broker_var.get()):
+        print("✅ MQTT group listener started.")
 
 
 def _upload_avatar(self):
@@ -7224,7 +6922,7 @@ def _create_mqtt_mapping_tab(self):
     ttk.Entry(self.mqtt_mapping_tab, textvariable=self.mqtt_map_broker_var).pack()
 
     self.mapping_entries = {}
-    for topic in ["rgb/wasd", "rgb/numpad", "rgb/function"]:
+    for topic in MQTT_DEFAULT_TOPIC_ZONES:
         ttk.Label(self.mqtt_mapping_tab, text=f"{topic} Zones:").pack(anchor=tk.W)
         var = tk.StringVar()
         ttk.Entry(self.mqtt_mapping_tab, textvariable=var).pack(anchor=tk.W)
@@ -7233,54 +6931,17 @@ def _create_mqtt_mapping_tab(self):
     ttk.Button(self.mqtt_mapping_tab, text="Start Listener", command=self._start_mqtt_mapping_listener).pack(pady=5)
 
 def _start_mqtt_mapping_listener(self):
-        try:
-            # Create main window
-            import tkinter as tk
-            from tkinter import ttk
-            self.root = tk.Tk()
-            self.root.title(f"{APP_NAME} v{VERSION}")
-            self.root.geometry("900x700")
-            self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
-
-            # Apply theme
-            self._apply_theme()
-
-            # Create main layout
-            self._create_main_layout()
-
-            # Initialize hardware
-            self._initialize_hardware()
-
-            # Initialize effects manager
-            self._initialize_effects_manager()
-
-            # Create GUI sections
-            self._create_header()
-            self._create_effect_controls()
-            self._create_color_controls()
-            self._create_per_key_editor()
-            self._create_preview_panel()
-            self._create_status_bar()
-            self._create_audio_layering_tab()
-            self._create_rgbpreset_export_tab()
-            self._create_band_mapping_tab()
-            self._create_waveform_render_tab()
-            self._create_changelog_diff_tab()
-            self._create_gif_export_tab()
-            self._create_mqtt_listener_tab()
-            self._create_freq_band_tab()
-            self._create_visualizer_presets_tab()
-
-            self.gui_initialized = True
-            self.logger.info("GUI initialization completed successfully")
-            return True
-
-        except Exception as e:
-            print(f"[ERROR] GUI initialization failed: {e}")
-            return False
-
-#     except Exception as e:
-#         print(f"❌ MQTT mapping listener failed: {e}")
+    """Map the topics with zones entered to those zones on the shared MQTT bridge"""
+    bridge = self._get_mqtt_bridge()
+    try:
+        for topic, var in self.mapping_entries.items():
+            if var.get().strip():
+                bridge.set_mapping(topic, var.get())
+    except ValueError as e:
+        print(f"❌ MQTT mapping listener failed: {e}")
+        return
+    if self._start_mqtt_bridge(self.mqtt_map_broker_var.get()):
+        print("✅ MQTT mapping listener started.")
 
 
 def _create_avatar_cropper_tab(self):
@@ -7371,59 +7032,33 @@ def _create_mqtt_autodiscovery_tab(self):
     self.mqtt_discovered_topics = []
     self.mqtt_topic_listbox = tk.Listbox(self.mqtt_auto_tab, height=10)
     self.mqtt_topic_listbox.pack(fill=tk.X, pady=5)
+    # Topics found in earlier sessions are listed without waiting for discovery
+    for topic in sorted(mqtt_registry.get_topics()):
+        self._add_discovered_topic(topic)
 
     ttk.Button(self.mqtt_auto_tab, text="Start Discovery", command=self._start_mqtt_discovery).pack(pady=5)
     ttk.Button(self.mqtt_auto_tab, text="Assign Zones", command=self._assign_zones_to_topic).pack(pady=2)
 
 def _start_mqtt_discovery(self):
-        try:
-            # Create main window
-            import tkinter as tk
-            from tkinter import ttk
-            self.root = tk.Tk()
-            self.root.title(f"{APP_NAME} v{VERSION}")
-            self.root.geometry("900x700")
-            self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
-
-            # Apply theme
-            self._apply_theme()
-
-            # Create main layout
-            self._create_main_layout()
-
-            # Initialize hardware
-            self._initialize_hardware()
-
-            # Initialize effects manager
-            self._initialize_effects_manager()
-
-            # Create GUI sections
-            self._create_header()
-            self._create_effect_controls()
-            self._create_color_controls()
-            self._create_per_key_editor()
-            self._create_preview_panel()
-            self._create_status_bar()
-            self._create_audio_layering_tab()
-            self._create_rgbpreset_export_tab()
-            self._create_band_mapping_tab()
-            self._create_waveform_render_tab()
-            self._create_changelog_diff_tab()
-            self._create_gif_export_tab()
-            self._create_mqtt_listener_tab()
-            self._create_freq_band_tab()
-            self._create_visualizer_presets_tab()
-
-            self.gui_initialized = True
-            self.logger.info("GUI initialization completed successfully")
-            return True
-
-        except Exception as e:
-            print(f"[ERROR] GUI initialization failed: {e}")
-            return False
-
-#     except Exception as e:
-#         print(f"❌ MQTT discovery failed: {e}")
+    """List every topic the broker delivers, via a '#' subscription on the shared MQTT bridge"""
+    bridge = self._get_mqtt_bridge()
+
+    def on_topic(topic):
+        self.root.after(0, lambda: self._add_discovered_topic(topic))
+
+    if not getattr(self, '_mqtt_discovery_started', False):
+        bridge.add_topic_listener(on_topic)
+        self._mqtt_discovery_started = True
+    for topic in sorted(bridge.seen_topics):
+        self._add_discovered_topic(topic)
+    bridge.listen(MQTT_DISCOVERY_FILTER)
+    if self._start_mqtt_bridge(self.mqtt_auto_broker_var.get()):
+        print("🔍 MQTT topic discovery started.")
+
+def _add_discovered_topic(self, topic: str):
+    if topic not in self.mqtt_discovered_topics:
+        self.mqtt_discovered_topics.append(topic)
+        self.mqtt_topic_listbox.insert(tk.END, topic)
 
 def _assign_zones_to_topic(self):
     selection = self.mqtt_topic_listbox.curselection()
@@ -7433,9 +7068,12 @@ def _assign_zones_to_topic(self):
     from tkinter.simpledialog import askstring
     zone_input = askstring("Assign Zones", f"Enter zone numbers for {topic} (comma-separated):")
     if zone_input:
-        zones = [int(z.strip()) for z in zone_input.split(",") if z.strip().isdigit()]
-        print(f"✅ Assigned zones {zones} to topic {topic}")
-        # You can store this mapping in a dictionary or file for later use
+        try:
+            self._get_mqtt_bridge().set_mapping(topic, zone_input)
+        except ValueError as e:
+            print(f"❌ Invalid zones for {topic}: {e}")
+            return
+        print(f"✅ Assigned zones {self.mqtt_bridge.get_mappings()[topic]} to topic {topic}")
 
 
 def _create_trace_timeline_tab(self):
@@ -7587,10 +7225,7 @@ def _optimize_zones(self):
         "Arrows": [21, 22, 23, 24],
         "Numpad": [13, 14, 15, 16]
     }
-    import requests
-    for name, zones in clusters.items():
-        for z in zones:
-            requests.post("http://127.0.0.1:5000/set_zone_color", json={"zone": z, "color": "#00ffcc"})
+    api_client.set_zones({z: "#00ffcc" for zones in clusters.values() for z in zones})
     print("🧠 Smart zone optimization applied.")
 
 
@@ -7658,8 +7293,7 @@ def _create_event_automation_tab(self):
 def _check_event_trigger(self):
     if self.event_enabled_var.get():
         if self.event_trigger_var.get() == "USB":
-            import requests
-            requests.post("http://127.0.0.1:5000/set_zone_color", json={"zone": 1, "color": "#ff00ff"})
+            api_client.set_zones({1: "#ff00ff"})
             print("🧭 USB event triggered effect.")
     self.root.after(5000, self._check_event_trigger)
 
@@ -7960,9 +7594,65 @@ def _create_simulator_tab(self):
 def _create_music_sync_tab(self):
     self.music_tab = ttk.Frame(self.notebook)
     self.notebook.add(self.music_tab, text="Music Sync")
-    ttk.Label(self.music_tab, text="Waveform Preview").pack()
-    ttk.Label(self.music_tab, background="#88f", width=40).pack()
-    ttk.Button(self.music_tab, text="Sync to Beat", command=lambda: print("🎵 Effect synced to music")).pack()
+    ttk.Label(self.music_tab, text="Trigger the current effect on").pack()
+    self.beat_sync_kind_var = tk.StringVar(value="beat")
+    ttk.Combobox(self.music_tab, textvariable=self.beat_sync_kind_var, values=["beat", "onset"],
+                 state="readonly").pack()
+    ttk.Button(self.music_tab, text="Sync to Beat", command=self._start_beat_sync).pack()
+    ttk.Button(self.music_tab, text="Stop Sync", command=self._stop_beat_sync).pack()
+    self.beat_canvas = tk.Canvas(self.music_tab, width=300, height=40, bg="black")
+    self.beat_canvas.pack(pady=5)
+    self.beat_status_label = ttk.Label(self.music_tab, text="Beat sync not running")
+    self.beat_status_label.pack()
+
+def _start_beat_sync(self):
+    """Fire the current effect's trigger from the beat tracker's events"""
+    capture = getattr(self, 'audio_capture', None)
+    if capture is None or not capture.is_running:
+        self._start_audio_visualizer()
+        capture = getattr(self, 'audio_capture', None)
+        if capture is None or not capture.is_running:
+            return
+    from .audio import BeatTracker, make_effect_trigger
+    effect = getattr(self.effect_manager, 'current_effect', None)
+    trigger = make_effect_trigger(effect, self.audio_band_keys)
+    if trigger is None:
+        print("❌ The current effect has no trigger - use Ripple, Lightning or Reactive Keypress")
+        return
+    if getattr(self, 'beat_tracker', None) is None:
+        self.beat_tracker = BeatTracker(self.audio_analyzer, parent_logger=getattr(self, 'logger', None))
+    self._stop_beat_sync()
+    self.beat_sync_trigger = trigger
+    self.beat_tracker.subscribe(trigger, kinds=(self.beat_sync_kind_var.get(),))
+    self.beat_sync_active = True
+    if not getattr(self, '_beat_status_scheduled', False):
+        self._beat_status_scheduled = True
+        self._update_beat_status()
+    print(f"🎵 {effect.name} synced to each {self.beat_sync_kind_var.get()}")
+
+def _stop_beat_sync(self):
+    """Stop triggering the effect from audio events"""
+    trigger = getattr(self, 'beat_sync_trigger', None)
+    if trigger is not None:
+        self.beat_tracker.unsubscribe(trigger)
+        self.beat_sync_trigger = None
+    self.beat_sync_active = False
+
+def _update_beat_status(self):
+    """Show tempo and event counts and flash on each event, ten times a second"""
+    tracker = self.beat_tracker
+    if not getattr(self, 'beat_sync_active', False):
+        self._beat_status_scheduled = False
+        self.beat_status_label.config(text="Beat sync not running")
+        self.beat_canvas.config(bg="black")
+        return
+    event = tracker.last_event
+    flash = event is not None and event is not getattr(self, '_beat_shown_event', None)
+    self._beat_shown_event = event
+    self.beat_canvas.config(bg="white" if flash else "black")
+    tempo = f"{tracker.tempo:.0f} BPM" if tracker.tempo else "tempo unknown"
+    self.beat_status_label.config(text=f"{tempo} | {tracker.onsets} onsets, {tracker.beats} beats")
+    self.root.after(100, self._update_beat_status)
 
 def _create_api_control_tab(self):
     self.api_tab = ttk.Frame(self.notebook)
@@ -8020,14 +7710,34 @@ def _create_device_sync_tab(self):
     ttk.Label(self.sync_tab, text="Connected Devices").pack()
     self.device_listbox = tk.Listbox(self.sync_tab)
     self.device_listbox.pack(fill=tk.X)
-    for dev in ["Keyboard A", "Mouse B", "Display C"]:
+    for dev in self._get_output_fanout().get_device_names():
         self.device_listbox.insert(tk.END, dev)
 
     ttk.Button(self.sync_tab, text="Sync Now", command=self._sync_devices).pack()
 
+def _get_output_fanout(self):
+    """Create the shared output fan-out on first use and attach it to the effect manager"""
+    if getattr(self, 'output_fanout', None) is None:
+        self.output_fanout = OutputFanout(parent_logger=getattr(self, 'logger', None))
+        if self.hardware:
+            self.output_fanout.add_device(KeyboardOutputDevice(self.hardware))
+        self.output_fanout.add_device(VirtualOutputDevice("Preview"))
+        if self.effect_manager:
+            self.effect_manager.set_output_fanout(self.output_fanout)
+    return self.output_fanout
+
+def _set_fanout_running(self, enabled: bool):
+    """Start or stop fan-out of effect frames to all registered devices"""
+    fanout = self._get_output_fanout()
+    if enabled:
+        fanout.start()
+    else:
+        fanout.stop()
+    print(f"🔗 Output fan-out {'running' if fanout.is_running else 'stopped'} "
+          f"for {len(fanout.get_device_names())} device(s)")
+
 def _sync_devices(self):
-    if self.sync_enabled.get():
-        print("🔗 Devices synced in real-time across orchestration grid.")
+    self._set_fanout_running(self.sync_enabled.get())
 
 def _create_plugin_share_tab(self):
     self.plugin_share_tab = ttk.Frame(self.notebook)
@@ -8178,9 +7888,9 @@ def _animate_redo(self):
     print("↪️ Redo animation played.")
 
 def _create_device_grid_tab(self):
-    self._add_help_box(self.device_grid_tab_tab, "Sync effects across multiple devices using WebSocket or MQTT. Assign zones and start grid sync.")
     self.device_grid_tab = ttk.Frame(self.notebook)
     self.notebook.add(self.device_grid_tab, text="Sync Grid")
+    self._add_help_box(self.device_grid_tab, "Sync effects across multiple devices. Each device gets its own rate and colour correction.")
 
     self.grid_enabled = tk.BooleanVar(value=True)
     ttk.Checkbutton(self.device_grid_tab, text="Enable Grid Sync", variable=self.grid_enabled).pack()
@@ -8188,14 +7898,13 @@ def _create_device_grid_tab(self):
     ttk.Label(self.device_grid_tab, text="Devices").pack()
     self.grid_device_listbox = tk.Listbox(self.device_grid_tab)
     self.grid_device_listbox.pack(fill=tk.X)
-    for dev in ["Keyboard A", "Mouse B", "Display C"]:
+    for dev in self._get_output_fanout().get_device_names():
         self.grid_device_listbox.insert(tk.END, dev)
 
     ttk.Button(self.device_grid_tab, text="Start Grid Sync", command=self._start_grid_sync).pack()
 
 def _start_grid_sync(self):
-    if self.grid_enabled.get():
-        print("🔗 WebSocket/MQTT grid sync started across devices.")
+    self._set_fanout_running(self.grid_enabled.get())
 
 # === VOICE + PLUGINS + MQTT + UNDO INTEGRATION ===
 self.voice_plugins_mqtt_undo_loaded = True
@@ -8381,12 +8090,13 @@ def _create_mqtt_editor_tab(self):
     ttk.Button(self.mqtt_editor_tab, text="Assign Zones", command=self._assign_topic_zones).pack()
 
 def _discover_mqtt_topics(self):
-    topics = ["rgb/wasd", "rgb/numpad", "rgb/function"]
-    for t in topics:
-        self.topic_listbox.insert(tk.END, t)
-        with open(f"mqtt/topics/{t.replace('/', '_')}.txt", "w") as f:
-            f.write("Discovered topic")
-    print("🔍 MQTT topics discovered and listed.")
+    """List the topics and zone assignments stored in the MQTT registry"""
+    topics = mqtt_registry.get_topics()
+    mappings = mqtt_registry.get_mappings()
+    self.topic_listbox.delete(0, tk.END)
+    for topic in sorted(set(topics) | set(mappings)):
+        self.topic_listbox.insert(tk.END, topic)
+    print(f"🔍 {len(topics)} known MQTT topic(s), {len(mappings)} zone assignment(s).")
 
 def _assign_topic_zones(self):
     selection = self.topic_listbox.curselection()
@@ -8395,8 +8105,11 @@ def _assign_topic_zones(self):
         from tkinter.simpledialog import askstring
         zones = askstring("Assign Zones", f"Enter zones for {topic}:")
         if zones:
-            with open(f"mqtt/topics/{topic.replace('/', '_')}.txt", "a") as f:
-                f.write(f"\nAssigned Zones: {zones}")
+            try:
+                self._get_mqtt_bridge().set_mapping(topic, zones)
+            except ValueError as e:
+                print(f"❌ Invalid zones for {topic}: {e}")
+                return
             print(f"✅ Zones {zones} assigned to topic {topic}")
 
 # === WAVEFORM + DIFF + GIF + MQTT INTEGRATION ===
@@ -8407,59 +8120,98 @@ def _create_waveform_render_tab(self):
     self.waveform_render_tab = ttk.Frame(self.notebook)
     self.notebook.add(self.waveform_render_tab, text="Waveform Render")
 
-    ttk.Button(self.waveform_render_tab, text="Load .wav File", command=self._render_waveform).pack()
-    self.waveform_canvas = tk.Canvas(self.waveform_render_tab, width=600, height=100, bg="black")
-    self.waveform_canvas.pack()
+    controls = ttk.Frame(self.waveform_render_tab)
+    controls.pack()
+    ttk.Button(controls, text="Load .wav File", command=self._load_waveform_file).pack(side=tk.LEFT)
+    ttk.Button(controls, text="Zoom In", command=lambda: self._zoom_waveform(0.5)).pack(side=tk.LEFT)
+    ttk.Button(controls, text="Zoom Out", command=lambda: self._zoom_waveform(2.0)).pack(side=tk.LEFT)
+    ttk.Button(controls, text="◀", command=lambda: self._pan_waveform(-0.5)).pack(side=tk.LEFT)
+    ttk.Button(controls, text="▶", command=lambda: self._pan_waveform(0.5)).pack(side=tk.LEFT)
+    self.waveform_render_canvas = tk.Canvas(self.waveform_render_tab, width=600, height=100, bg="black")
+    self.waveform_render_canvas.pack()
+    self.waveform_info_label = ttk.Label(self.waveform_render_tab, text="No file loaded")
+    self.waveform_info_label.pack()
+
+def _load_waveform_file(self):
+    """Open a .wav file's waveform pyramid on a worker thread, building it if not cached"""
+    path = filedialog.askopenfilename(title="Open .wav file",
+                                      filetypes=[("WAV audio", "*.wav"), ("All files", "*.*")])
+    if not path:
+        return
+    try:
+        from .audio.waveform import WaveformPyramid
+    except ImportError as e:
+        print(f"❌ Waveform rendering requires numpy: {e}")
+        return
+    result = {}
 
-def _render_waveform(self):
+    def load():
         try:
-            # Create main window
-            import tkinter as tk
-            from tkinter import ttk
-            self.root = tk.Tk()
-            self.root.title(f"{APP_NAME} v{VERSION}")
-            self.root.geometry("900x700")
-            self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
-
-            # Apply theme
-            self._apply_theme()
-
-            # Create main layout
-            self._create_main_layout()
-
-            # Initialize hardware
-            self._initialize_hardware()
-
-            # Initialize effects manager
-            self._initialize_effects_manager()
-
-            # Create GUI sections
-            self._create_header()
-            self._create_effect_controls()
-            self._create_color_controls()
-            self._create_per_key_editor()
-            self._create_preview_panel()
-            self._create_status_bar()
-            self._create_audio_layering_tab()
-            self._create_rgbpreset_export_tab()
-            self._create_band_mapping_tab()
-            self._create_waveform_render_tab()
-            self._create_changelog_diff_tab()
-            self._create_gif_export_tab()
-            self._create_mqtt_listener_tab()
-            self._create_freq_band_tab()
-            self._create_visualizer_presets_tab()
-
-            self.gui_initialized = True
-            self.logger.info("GUI initialization completed successfully")
-            return True
-
-        except Exception as e:
-            print(f"[ERROR] GUI initialization failed: {e}")
-            return False
+            result['pyramid'] = WaveformPyramid.open(path, parent_logger=getattr(self, 'logger', None))
+        except (OSError, ValueError) as e:
+            result['error'] = e
+
+    self.waveform_info_label.config(text=f"Loading {Path(path).name}...")
+    loader = threading.Thread(target=load, name='WaveformLoader', daemon=True)
+    loader.start()
+    self._finish_waveform_load(loader, result, path)
+
+def _finish_waveform_load(self, loader: threading.Thread, result: Dict[str, Any], path: str):
+    """Wait for the loader without blocking Tk, then show the whole file"""
+    if loader.is_alive():
+        self.root.after(50, self._finish_waveform_load, loader, result, path)
+        return
+    if 'error' in result:
+        self.waveform_info_label.config(text="No file loaded")
+        print(f"❌ Error rendering waveform: {result['error']}")
+        return
+    self.waveform_pyramid = result['pyramid']
+    self.waveform_view = (0, self.waveform_pyramid.frames)
+    self._render_waveform()
+    print(f"🎙️ Waveform rendered from {Path(path).name}")
+
+def _zoom_waveform(self, factor: float):
+    """Zoom the waveform view around its centre"""
+    pyramid = getattr(self, 'waveform_pyramid', None)
+    if pyramid is None:
+        return
+    start, end = self.waveform_view
+    span = min(pyramid.frames, max(60, int((end - start) * factor)))
+    centre = (start + end) // 2
+    start = min(max(0, centre - span // 2), pyramid.frames - span)
+    self.waveform_view = (start, start + span)
+    self._render_waveform()
+
+def _pan_waveform(self, fraction: float):
+    """Scroll the waveform view by a fraction of its width"""
+    pyramid = getattr(self, 'waveform_pyramid', None)
+    if pyramid is None:
+        return
+    start, end = self.waveform_view
+    span = end - start
+    start = min(max(0, start + int(span * fraction)), pyramid.frames - span)
+    self.waveform_view = (start, start + span)
+    self._render_waveform()
 
-#     except Exception as e:
-#         print(f"❌ Error rendering waveform: {e}")
+def _render_waveform(self):
+    """Draw the current view from the pyramid, one min/max column per pixel"""
+    pyramid = getattr(self, 'waveform_pyramid', None)
+    if pyramid is None:
+        return
+    canvas = self.waveform_render_canvas
+    width, height = int(canvas['width']), int(canvas['height'])
+    start, end = self.waveform_view
+    mins, maxs, rms = pyramid.render(start, end, width)
+    canvas.delete("all")
+    middle = height / 2
+    step = width / max(1, len(mins))
+    for i, (low, high, level) in enumerate(zip(mins.tolist(), maxs.tolist(), rms.tolist())):
+        x = int(i * step)
+        canvas.create_line(x, middle - high * middle, x, middle - low * middle + 1, fill="lime")
+        canvas.create_line(x, middle - level * middle, x, middle + level * middle + 1, fill="#0a5")
+    rate = pyramid.info.sample_rate or 1
+    self.waveform_info_label.config(
+        text=f"{pyramid.info.path.name}: {start / rate:.2f}s - {end / rate:.2f}s of {pyramid.info.duration:.1f}s")
 
 def _create_changelog_diff_tab(self):
     self._add_help_box(self.changelog_diff_tab_tab, "Compare plugin changelogs between versions. Syntax highlighting shows added and removed lines.")
@@ -8693,88 +8445,104 @@ def _create_audio_visualizer_tab(self):
     ttk.Button(self.audio_tab, text="Start Visualizer", command=self._start_audio_visualizer).pack(pady=5)
     self.audio_canvas = tk.Canvas(self.audio_tab, width=600, height=100, bg="black")
     self.audio_canvas.pack()
+    self.audio_stats_label = ttk.Label(self.audio_tab, text="Audio capture not running")
+    self.audio_stats_label.pack(pady=5)
 
 def _start_audio_visualizer(self):
-    import sounddevice as sd
-    import numpy as np
-    import requests
-
-    def audio_callback(indata, frames, time, status):
-        if status:
-            print(f"⚠️ Audio status: {status}")
-        volume_norm = np.linalg.norm(indata) * 10
-        freqs = np.abs(np.fft.rfft(indata[:, 0]))
-        bands = {
-            "wasd": np.mean(freqs[1:10]),
-            "arrows": np.mean(freqs[10:40]),
-            "function": np.mean(freqs[40:80])
-        }
-        colors = {
-            "wasd": "#%02x00%02x" % (int(bands["wasd"] * 5) % 255, 255),
-            "arrows": "#00%02x%02x" % (int(bands["arrows"] * 5) % 255, 255),
-            "function": "#%02x%02x00" % (int(bands["function"] * 5) % 255, 255)
-        }
-        zone_map = {
-            "wasd": [17, 18, 19, 20],
-            "arrows": [21, 22, 23, 24],
-            "function": [1, 2, 3, 4, 5]
-        }
-        for group, zones in zone_map.items():
-            for z in zones:
-                requests.post("http://127.0.0.1:5000/set_zone_color", json={"zone": z, "color": colors[group]})
-        self.audio_canvas.delete("all")
-        for i in range(100):
-            height = int(freqs[i % len(freqs)] * 0.01)
-            self.audio_canvas.create_line(i * 6, 50, i * 6, 50 - height, fill="lime")
-
-        try:
-            # Create main window
-            import tkinter as tk
-            from tkinter import ttk
-            self.root = tk.Tk()
-            self.root.title(f"{APP_NAME} v{VERSION}")
-            self.root.geometry("900x700")
-            self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
-
-            # Apply theme
-            self._apply_theme()
-
-            # Create main layout
-            self._create_main_layout()
-
-            # Initialize hardware
-            self._initialize_hardware()
-
-            # Initialize effects manager
-            self._initialize_effects_manager()
-
-            # Create GUI sections
-            self._create_header()
-            self._create_effect_controls()
-            self._create_color_controls()
-            self._create_per_key_editor()
-            self._create_preview_panel()
-            self._create_status_bar()
-            self._create_audio_layering_tab()
-            self._create_rgbpreset_export_tab()
-            self._create_band_mapping_tab()
-            self._create_waveform_render_tab()
-            self._create_changelog_diff_tab()
-            self._create_gif_export_tab()
-            self._create_mqtt_listener_tab()
-            self._create_freq_band_tab()
-            self._create_visualizer_presets_tab()
-
-            self.gui_initialized = True
-            self.logger.info("GUI initialization completed successfully")
-            return True
-
-        except Exception as e:
-            print(f"[ERROR] GUI initialization failed: {e}")
-            return False
+    """Start capturing audio; levels are drawn and sent to the keyboard from the Tk thread"""
+    try:
+        from .audio import AudioCapture
+        analyzer = self._get_audio_analyzer()
+        self.audio_band_keys = self._get_audio_band_keys()
+    except ImportError as e:
+        print(f"❌ Audio visualizer requires numpy: {e}")
+        return
+    except ValueError as e:
+        print(f"❌ Audio visualizer error: {e}")
+        return
+    if getattr(self, 'audio_capture', None) is not None:
+        self.audio_capture.stop()
+    source = self.audio_source_var.get() if getattr(self, 'audio_source_var', None) is not None else "default"
+    self.audio_capture = AudioCapture(analyzer, source, parent_logger=getattr(self, 'logger', None))
+    if not self.audio_capture.start():
+        print(f"❌ Audio visualizer error: could not capture from {source}")
+        return
+    self._get_output_fanout().start()
+    if not getattr(self, '_audio_render_scheduled', False):
+        self._audio_render_scheduled = True
+        self._render_audio_levels()
+    print(f"🎵 Audio visualizer started ({', '.join(analyzer.bands)})")
+
+def _get_audio_analyzer(self):
+    """Create the shared audio analyzer on first use, with the Frequency Bands tab's ranges"""
+    if getattr(self, 'audio_analyzer', None) is None:
+        from .audio import AudioAnalyzer
+        self.audio_analyzer = AudioAnalyzer(self._get_audio_bands(), parent_logger=getattr(self, 'logger', None))
+    return self.audio_analyzer
+
+def _get_audio_bands(self) -> Dict[str, tuple]:
+    """Band name -> (low Hz, high Hz) from the Frequency Bands tab, or the defaults"""
+    if getattr(self, 'bass_min', None) is None:
+        return dict(AUDIO_BANDS)
+    return {
+        'bass': (self.bass_min.get(), self.bass_max.get()),
+        'mid': (self.mid_min.get(), self.mid_max.get()),
+        'treble': (self.treble_min.get(), self.treble_max.get())
+    }
 
-#     except Exception as e:
-#         print(f"❌ Audio visualizer error: {e}")
+def _get_audio_band_keys(self) -> Dict[str, tuple]:
+    """Band name -> 0-based key indices from the Band Mapping tab, or the defaults"""
+    zones = dict(AUDIO_BAND_ZONES)
+    if getattr(self, 'bass_zone_var', None) is not None:
+        zones = {'bass': self.bass_zone_var.get(), 'mid': self.mid_zone_var.get(),
+                 'treble': self.treble_zone_var.get()}
+    return {band: resolve_zones(band_zones) for band, band_zones in zones.items()}
+
+def _render_audio_levels(self):
+    """Draw the latest band levels and pass them on, once per render interval on the Tk thread"""
+    capture = getattr(self, 'audio_capture', None)
+    if capture is None or not capture.is_running:
+        self._audio_render_scheduled = False
+        return
+    levels = self.audio_analyzer.levels
+    if levels.sequence != getattr(self, '_audio_rendered_sequence', 0):
+        self._audio_rendered_sequence = levels.sequence
+        self._draw_audio_levels(levels)
+        effect = getattr(self.effect_manager, 'current_effect', None)
+        if hasattr(effect, 'update_band_levels'):
+            # The running effect renders the levels itself
+            effect.update_band_levels(levels.levels)
+        elif not getattr(self, 'beat_sync_active', False):
+            from .audio import render_band_frame
+            colors = {band: RGBColor.from_hex(color) for band, color in AUDIO_BAND_COLORS.items()}
+            stamp = frame_latency_tracker.new_frame()
+            frame = render_band_frame(levels, self.audio_band_keys, colors)
+            stamp.mark_composed()
+            self._get_output_fanout().submit(frame, stamp)
+    now = time.monotonic()
+    if now - getattr(self, '_audio_stats_time', 0.0) >= 1.0:
+        self._audio_stats_time = now
+        stats = capture.get_stats()
+        if getattr(self, 'audio_stats_label', None) is not None:
+            self.audio_stats_label.config(
+                text=f"{stats['blocks_captured']} blocks captured, {stats['blocks_analysed']} analysed, "
+                     f"{stats['blocks_dropped']} dropped, {stats['stream_errors']} stream errors")
+    self.root.after(int(AUDIO_RENDER_INTERVAL * 1000), self._render_audio_levels)
+
+def _draw_audio_levels(self, levels):
+    """Draw one bar per band on the audio visualizer canvas"""
+    canvas = getattr(self, 'audio_canvas', None)
+    if canvas is None:
+        return
+    canvas.delete("all")
+    width, height = int(canvas['width']), int(canvas['height'])
+    bar_width = width // max(1, len(levels.bands))
+    for i, (band, level) in enumerate(zip(levels.bands, levels.levels)):
+        x = i * bar_width
+        top = height - int(level * (height - 15))
+        canvas.create_rectangle(x + 10, top, x + bar_width - 10, height,
+                                fill=AUDIO_BAND_COLORS.get(band, "lime"), outline="")
+        canvas.create_text(x + bar_width // 2, 8, text=band.title(), fill="white")
 
 # === AUDIO PRESETS + COMPOSER INTEGRATION ===
 self.audio_presets_composer_loaded = True
@@ -8805,6 +8573,12 @@ def _create_freq_band_tab(self):
     ttk.Button(self.freq_tab, text="Save Bands", command=self._save_freq_bands).pack()
 
 def _save_freq_bands(self):
+    if getattr(self, 'audio_analyzer', None) is not None:
+        try:
+            self.audio_analyzer.set_bands(self._get_audio_bands())
+        except ValueError as e:
+            print(f"❌ Invalid frequency bands: {e}")
+            return
     with open("audio/presets/bands.txt", "w") as f:
         f.write(f"Bass: {self.bass_min.get()}-{self.bass_max.get()}\n")
         f.write(f"Mid: {self.mid_min.get()}-{self.mid_max.get()}\n")
@@ -8924,6 +8698,12 @@ def _create_band_mapping_tab(self):
     self.mapping_canvas.pack()
 
 def _save_band_mapping(self):
+    try:
+        band_keys = self._get_audio_band_keys()
+    except ValueError as e:
+        print(f"❌ Invalid band mapping: {e}")
+        return
+    self.audio_band_keys = band_keys
     with open("audio/mapping/band_to_zone.txt", "w") as f:
         f.write(f"Bass: {self.bass_zone_var.get()}\n")
         f.write(f"Mid: {self.mid_zone_var.get()}\n")
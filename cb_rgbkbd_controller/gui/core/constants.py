@@ -12,7 +12,43 @@ OSIRIS_ROWS = 7
 OSIRIS_COLS = 14
 OSIRIS_MAX_BRIGHTNESS = 100
 OSIRIS_MIN_BRIGHTNESS = 0
+# Key name -> key index for the 100 individually addressable OSIRIS keys
+OSIRIS_KEY_LAYOUT = {
+    # Row 1 - Function keys
+    'F1': 0, 'F2': 1, 'F3': 2, 'F4': 3, 'F5': 4, 'F6': 5, 'F7': 6, 'F8': 7, 'F9': 8, 'F10': 9,
+
+    # Row 2 - Number row
+    '`': 10, '1': 11, '2': 12, '3': 13, '4': 14, '5': 15, '6': 16, '7': 17, '8': 18, '9': 19, '0': 20,
+    '-': 21, '=': 22, 'Backspace': 23,
+
+    # Row 3 - QWERTY row
+    'Tab': 24, 'Q': 25, 'W': 26, 'E': 27, 'R': 28, 'T': 29, 'Y': 30, 'U': 31, 'I': 32, 'O': 33,
+    'P': 34, '[': 35, ']': 36, '\\': 37,
+
+    # Row 4 - ASDF row
+    'CapsLock': 38, 'A': 39, 'S': 40, 'D': 41, 'F': 42, 'G': 43, 'H': 44, 'J': 45, 'K': 46, 'L': 47,
+    ';': 48, "'": 49, 'Enter': 50,
+
+    # Row 5 - ZXCV row
+    'LShift': 51, 'Z': 52, 'X': 53, 'C': 54, 'V': 55, 'B': 56, 'N': 57, 'M': 58, ',': 59, '.': 60,
+    '/': 61, 'RShift': 62,
+
+    # Row 6 - Bottom row
+    'LCtrl': 63, 'Fn': 64, 'LAlt': 65, 'Space': 66, 'RAlt': 67, 'RCtrl': 68,
+
+    # Arrow cluster and additional keys
+    'Up': 69, 'Down': 70, 'Left': 71, 'Right': 72,
+
+    # Additional keys to reach 100 total
+    'Home': 73, 'End': 74, 'PageUp': 75, 'PageDown': 76, 'Insert': 77, 'Delete': 78,
+    'PrintScreen': 79, 'ScrollLock': 80, 'Pause': 81,
+
+    # Extra zones for full coverage
+    **{f'Extra{i}': 82 + i for i in range(18)}  # Extra0-Extra17 = zones 82-99
+}
 HARDWARE_DETECTION_TIMEOUT = 10.0
+HARDWARE_PROBE_TIMEOUT = 2.0
+HARDWARE_PROBE_WORKERS = 4
 HARDWARE_METHODS = ['ec_direct', 'ectool', 'none']
 DEFAULT_HARDWARE_METHOD = 'ectool'
 FALLBACK_HARDWARE_METHOD = 'none'
@@ -44,6 +80,28 @@ AUDIO_SENSITIVITY_MAX = 5.0
 AUDIO_SENSITIVITY_DEFAULT = 1.0
 AUDIO_SAMPLE_RATE = 44100
 AUDIO_BUFFER_SIZE = 1024
+AUDIO_FFT_SIZE = 2048
+AUDIO_RING_BLOCKS = 32
+AUDIO_BANDS = {'bass': (20, 250), 'mid': (250, 2000), 'treble': (2000, 8000)}
+AUDIO_BAND_ZONES = {'bass': [17, 18, 19, 20], 'mid': [21, 22, 23, 24], 'treble': [1, 2, 3, 4, 5]}
+AUDIO_BAND_COLORS = {'bass': '#0000ff', 'mid': '#00ff00', 'treble': '#ff0000'}
+AUDIO_LEVEL_FLOOR_DB = -60.0
+AUDIO_SMOOTHING_ATTACK = 0.6
+AUDIO_SMOOTHING_RELEASE = 0.15
+AUDIO_RENDER_INTERVAL = 0.033
+BEAT_MIN_INTERVAL = 0.1
+BEAT_THRESHOLD_WINDOW = 1.0
+BEAT_THRESHOLD_RATIO = 1.5
+BEAT_FLUX_FLOOR = 20.0
+BEAT_TEMPO_WINDOW = 6.0
+BEAT_TEMPO_MIN_BPM = 60.0
+BEAT_TEMPO_MAX_BPM = 200.0
+BEAT_TEMPO_UPDATE_INTERVAL = 0.5
+BEAT_TOLERANCE = 0.2
+BEAT_FLYWHEEL_BEATS = 4
+WAVEFORM_BASE_BLOCK = 256
+WAVEFORM_CHUNK_FRAMES = 1 << 20
+WAVEFORM_CACHE_SUFFIX = '.pyramid.npz'
 ECTOOL_INTER_COMMAND_DELAY = 0.02
 ECTOOL_TIMEOUT = 5.0
 EC_DIRECT_TIMEOUT = 2.0
@@ -52,6 +110,46 @@ RETRY_DELAY_BASE = 0.5
 MAX_ERROR_COUNT = 10
 CIRCUIT_BREAKER_THRESHOLD = 5
 CIRCUIT_BREAKER_TIMEOUT = 30
+CIRCUIT_BREAKER_MAX_TIMEOUT = 300
+CIRCUIT_BREAKER_JITTER = 0.2
+ADAPTIVE_RATE_MIN_HZ = 2.0
+ADAPTIVE_RATE_MAX_HZ = 60.0
+ADAPTIVE_RATE_EWMA_ALPHA = 0.2
+ADAPTIVE_RATE_WINDOW_SIZE = 128
+ADAPTIVE_RATE_HEADROOM = 1.25
+ADAPTIVE_RATE_ERROR_THRESHOLD = 0.2
+ADAPTIVE_RATE_SLOW_WRITE_THRESHOLD = 0.25
+ADAPTIVE_RATE_PUBLISH_HYSTERESIS = 0.1
+ADAPTIVE_RATE_MIN_BATCH = 10
+OUTPUT_DEVICE_DEFAULT_RATE_HZ = 30.0
+API_HOST = '127.0.0.1'
+API_PORT = 5000
+API_CLIENT_TIMEOUT = 2.0
+API_CLIENT_RETRIES = 2
+API_CLIENT_BACKOFF = 0.1
+API_CLIENT_POOL_SIZE = 4
+API_SERVER_MODE = 'flask'
+API_ASYNC_MAX_PENDING = 1024
+API_ASYNC_MAX_BODY = 65536
+SSE_DEFAULT_FPS = 30.0
+SSE_MAX_FPS = 60.0
+SSE_KEEPALIVE_INTERVAL = 15.0
+REALTIME_HOST = '127.0.0.1'
+REALTIME_DDP_PORT = 4048
+REALTIME_E131_PORT = 5568
+REALTIME_E131_UNIVERSE = 1
+MQTT_BROKER = 'localhost'
+MQTT_PORT = 1883
+MQTT_KEEPALIVE = 60
+MQTT_LISTEN_TOPIC = 'rgb/effects'
+MQTT_DISCOVERY_FILTER = '#'
+MQTT_FRAME_WINDOW = 0.033
+MQTT_DEFAULT_TOPIC_ZONES = {'rgb/wasd': [1, 2, 3, 4], 'rgb/numpad': [17, 18, 19, 20], 'rgb/function': [5, 6, 7, 8]}
+POWER_SUPPLY_PATH = '/sys/class/power_supply'
+POWER_SAMPLE_INTERVAL = 5.0
+POWER_LOW_BATTERY_THRESHOLD = 20
+POWER_SAVER_MAX_FPS = 15.0
+POWER_SAVER_BRIGHTNESS_SCALE = 0.6
 PREVIEW_WIDTH = 560
 PREVIEW_HEIGHT = 200
 PREVIEW_KEYBOARD_COLOR = '#1a1a1a'
@@ -0,0 +1,289 @@
+"""
+Packed RGB frame encoding shared by the API and streaming endpoints
+
+Frames travel in a versioned wire form:
+
+    header   b'RGBF', u8 version, u8 encoding, u16 key count
+    RAW      key count * 3 bytes of packed RGB
+    RLE      runs of u8 length, r, g, b covering key count keys
+    DELTA    u16 span count, then per span u16 start, u16 length and
+             length * 3 bytes of packed RGB, applied to a base frame
+
+Streams fix their format when the connection opens (see StreamCodec):
+either these versioned frames or bare FRAME_BYTES of packed RGB.
+"""
+import struct
+from typing import Dict, List, Optional, Tuple
+
+from .constants import OSIRIS_KEY_COUNT
+from .rgb_color import RGBColor
+
+FRAME_BYTES = OSIRIS_KEY_COUNT * 3
+
+FRAME_MAGIC = b'RGBF'
+FRAME_FORMAT_VERSION = 1
+FRAME_MIME_TYPE = 'application/x-rgb-frame'
+
+ENCODING_RAW = 0
+ENCODING_RLE = 1
+ENCODING_DELTA = 2
+
+STREAM_FORMAT_VERSIONED = 'rgbf'
+STREAM_FORMAT_RAW = 'raw'
+STREAM_FORMATS = (STREAM_FORMAT_VERSIONED, STREAM_FORMAT_RAW)
+
+_FRAME_HEADER = struct.Struct('<4sBBH')
+_SPAN = struct.Struct('<HH')
+_MAX_RUN = 255
+
+
+def pack_frame(colors: List[RGBColor]) -> bytes:
+    """
+    Pack a frame as three bytes per key
+
+    Frames shorter than OSIRIS_KEY_COUNT are padded with black, longer
+    frames are truncated.
+
+    Args:
+        colors: Per-key colours
+
+    Returns:
+        bytes: FRAME_BYTES of packed RGB
+    """
+    data = bytearray(FRAME_BYTES)
+    for i, color in enumerate(colors[:OSIRIS_KEY_COUNT]):
+        data[i * 3] = color.r
+        data[i * 3 + 1] = color.g
+        data[i * 3 + 2] = color.b
+    return bytes(data)
+
+
+def unpack_frame(data: bytes) -> List[RGBColor]:
+    """
+    Unpack a packed RGB frame
+
+    Args:
+        data: FRAME_BYTES of packed RGB
+
+    Returns:
+        List[RGBColor]: Per-key colours
+    """
+    if len(data) != FRAME_BYTES:
+        raise ValueError(f"Packed frame must be {FRAME_BYTES} bytes, got {len(data)}")
+    return [RGBColor(data[i], data[i + 1], data[i + 2]) for i in range(0, FRAME_BYTES, 3)]
+
+
+def _encode_rle(packed: bytes) -> bytes:
+    out = bytearray()
+    run_color = packed[0:3]
+    run = 0
+    for offset in range(0, len(packed), 3):
+        color = packed[offset:offset + 3]
+        if color == run_color and run < _MAX_RUN:
+            run += 1
+            continue
+        out.append(run)
+        out += run_color
+        run_color, run = color, 1
+    if run:
+        out.append(run)
+        out += run_color
+    return bytes(out)
+
+
+def _decode_rle(body: bytes, key_count: int) -> bytes:
+    if len(body) % 4:
+        raise ValueError("RLE body is not a whole number of runs")
+    out = bytearray()
+    for pos in range(0, len(body), 4):
+        out += body[pos + 1:pos + 4] * body[pos]
+    if len(out) != key_count * 3:
+        raise ValueError(f"RLE frame covers {len(out) // 3} keys, header says {key_count}")
+    return bytes(out)
+
+
+def _encode_spans(previous: bytes, packed: bytes) -> bytes:
+    key_count = len(packed) // 3
+    spans: List[Tuple[int, int]] = []
+    start = None
+    for key in range(key_count):
+        offset = key * 3
+        changed = previous[offset:offset + 3] != packed[offset:offset + 3]
+        if changed and start is None:
+            start = key
+        elif not changed and start is not None:
+            spans.append((start, key - start))
+            start = None
+    if start is not None:
+        spans.append((start, key_count - start))
+
+    out = bytearray(struct.pack('<H', len(spans)))
+    for start, length in spans:
+        out += _SPAN.pack(start, length)
+        out += packed[start * 3:(start + length) * 3]
+    return bytes(out)
+
+
+def _decode_spans(body: bytes, previous: bytes) -> bytes:
+    frame = bytearray(previous)
+    (count,) = struct.unpack_from('<H', body, 0)
+    pos = 2
+    for _ in range(count):
+        start, length = _SPAN.unpack_from(body, pos)
+        pos += _SPAN.size
+        end = pos + length * 3
+        if (start + length) * 3 > len(frame) or end > len(body):
+            raise ValueError(f"Delta span {start}+{length} exceeds frame")
+        frame[start * 3:(start + length) * 3] = body[pos:end]
+        pos = end
+    return bytes(frame)
+
+
+def encode_frame(packed: bytes, previous: Optional[bytes] = None,
+                 encoding: Optional[int] = None) -> bytes:
+    """
+    Encode a packed frame in the versioned wire format
+
+    Args:
+        packed: Packed RGB frame (three bytes per key)
+        previous: Frame the receiver already has; enables DELTA encoding
+        encoding: Force ENCODING_RAW/RLE/DELTA; None picks the smallest
+
+    Returns:
+        bytes: Encoded frame
+    """
+    key_count = len(packed) // 3
+    if encoding is None:
+        candidates = [(ENCODING_RAW, packed), (ENCODING_RLE, _encode_rle(packed))]
+        if previous is not None and len(previous) == len(packed):
+            candidates.append((ENCODING_DELTA, _encode_spans(previous, packed)))
+        encoding, body = min(candidates, key=lambda candidate: len(candidate[1]))
+    elif encoding == ENCODING_RAW:
+        body = packed
+    elif encoding == ENCODING_RLE:
+        body = _encode_rle(packed)
+    elif encoding == ENCODING_DELTA:
+        if previous is None or len(previous) != len(packed):
+            raise ValueError("DELTA encoding needs a previous frame of the same size")
+        body = _encode_spans(previous, packed)
+    else:
+        raise ValueError(f"Unknown frame encoding {encoding}")
+    return _FRAME_HEADER.pack(FRAME_MAGIC, FRAME_FORMAT_VERSION, encoding, key_count) + body
+
+
+def decode_frame(data: bytes, previous: Optional[bytes] = None) -> bytes:
+    """
+    Decode a frame in the versioned wire format
+
+    Args:
+        data: Encoded frame
+        previous: Base frame for DELTA encoded data (black if None)
+
+    Returns:
+        bytes: Packed RGB frame
+    """
+    if len(data) < _FRAME_HEADER.size:
+        raise ValueError("Frame shorter than its header")
+    magic, version, encoding, key_count = _FRAME_HEADER.unpack_from(data, 0)
+    if magic != FRAME_MAGIC:
+        raise ValueError("Not an encoded frame")
+    if version != FRAME_FORMAT_VERSION:
+        raise ValueError(f"Unsupported frame format version {version}")
+    body = data[_FRAME_HEADER.size:]
+
+    try:
+        if encoding == ENCODING_RAW:
+            if len(body) != key_count * 3:
+                raise ValueError(f"Raw frame has {len(body)} bytes, expected {key_count * 3}")
+            return bytes(body)
+        if encoding == ENCODING_RLE:
+            return _decode_rle(body, key_count)
+        if encoding == ENCODING_DELTA:
+            base = previous if previous is not None else bytes(key_count * 3)
+            if len(base) != key_count * 3:
+                raise ValueError(f"Delta base has {len(base) // 3} keys, header says {key_count}")
+            return _decode_spans(body, base)
+    except struct.error as e:
+        raise ValueError(f"Truncated frame: {e}")
+    raise ValueError(f"Unknown frame encoding {encoding}")
+
+
+class StreamCodec:
+    """
+    Per-connection frame encoder and decoder for the streaming endpoints
+
+    The format is agreed once, from the connection's query parameters,
+    so no message is ever guessed at: 'rgbf' streams carry versioned
+    frames, with DELTA encoding only when the connection asked for it,
+    and 'raw' streams carry bare FRAME_BYTES frames. The codec remembers
+    the last frame sent and received, the bases for deltas; the first
+    frame in each direction is always sent whole.
+    """
+
+    def __init__(self, stream_format: str = STREAM_FORMAT_VERSIONED, delta: bool = False):
+        """
+        Initialize codec
+
+        Args:
+            stream_format: STREAM_FORMAT_VERSIONED or STREAM_FORMAT_RAW
+            delta: Send DELTA encoded frames when they are smallest
+        """
+        if stream_format not in STREAM_FORMATS:
+            raise ValueError(f"Unknown stream format {stream_format!r}")
+        self.format = stream_format
+        self.delta = delta and stream_format == STREAM_FORMAT_VERSIONED
+        self.sent: Optional[bytes] = None
+        self.received: Optional[bytes] = None
+
+    @classmethod
+    def from_params(cls, params: Dict[str, str]) -> 'StreamCodec':
+        """
+        Build the codec a client asked for with ?format= and ?delta=
+
+        Args:
+            params: Connection query parameters
+
+        Returns:
+            StreamCodec: Codec for the connection
+        """
+        return cls(params.get('format', STREAM_FORMAT_VERSIONED), params.get('delta') == '1')
+
+    def query(self) -> str:
+        """Query string that requests this codec from a server"""
+        return f"format={self.format}&delta={int(self.delta)}"
+
+    def encode(self, packed: bytes) -> bytes:
+        """
+        Encode an outgoing packed frame
+
+        Args:
+            packed: FRAME_BYTES of packed RGB
+
+        Returns:
+            bytes: Message to send
+        """
+        if self.format == STREAM_FORMAT_RAW:
+            message = packed
+        else:
+            message = encode_frame(packed, self.sent if self.delta else None)
+        self.sent = packed
+        return message
+
+    def decode(self, data: bytes) -> bytes:
+        """
+        Decode an incoming message
+
+        Args:
+            data: Received message
+
+        Returns:
+            bytes: FRAME_BYTES of packed RGB
+        """
+        if self.format == STREAM_FORMAT_RAW:
+            packed = bytes(data)
+        else:
+            packed = decode_frame(data, self.received)
+        if len(packed) != FRAME_BYTES:
+            raise ValueError(f"Stream frames must have {OSIRIS_KEY_COUNT} keys")
+        self.received = packed
+        return packed
@@ -53,6 +53,52 @@ class RGBColor:
     def b(self, value: int):
         self._b = self._validate_component(value, 'blue')
 
+    @classmethod
+    def from_hex(cls, hex_str: str) -> 'RGBColor':
+        match = cls.HEX_PATTERN.match(hex_str.strip())
+        if not match:
+            raise ValueError(f'Invalid hex color: {hex_str}')
+        digits = match.group(1)
+        if len(digits) == 3:
+            digits = ''.join(c * 2 for c in digits)
+        return cls(int(digits[0:2], 16), int(digits[2:4], 16), int(digits[4:6], 16))
+
+    @classmethod
+    def from_hsv(cls, hue: float, saturation: float=1.0, value: float=1.0) -> 'RGBColor':
+        r, g, b = colorsys.hsv_to_rgb(hue % 360 / 360.0, max(0.0, min(1.0, saturation)), max(0.0, min(1.0, value)))
+        return cls(round(r * 255), round(g * 255), round(b * 255))
+
+    def to_hex(self) -> str:
+        return f'#{self._r:02x}{self._g:02x}{self._b:02x}'
+
+    def to_tuple(self) -> Tuple[int, int, int]:
+        return (self._r, self._g, self._b)
+
+    def blend_with(self, other: 'RGBColor', ratio: float) -> 'RGBColor':
+        ratio = max(0.0, min(1.0, ratio))
+        return RGBColor(round(self._r + (other.r - self._r) * ratio), round(self._g + (other.g - self._g) * ratio), round(self._b + (other.b - self._b) * ratio))
+
+    def to_osiris_brightness(self) -> int:
+        """Map perceived luminance to the 0-100 OSIRIS backlight scale"""
+        luminance = self.LUMINANCE_RED * self._r + self.LUMINANCE_GREEN * self._g + self.LUMINANCE_BLUE * self._b
+        return int(round(luminance / self.MAX_VALUE * 100))
+
+    def __mul__(self, factor: float) -> 'RGBColor':
+        factor = max(0.0, factor)
+        return RGBColor(min(self.MAX_VALUE, int(self._r * factor)), min(self.MAX_VALUE, int(self._g * factor)), min(self.MAX_VALUE, int(self._b * factor)))
+
+    def __add__(self, other: 'RGBColor') -> 'RGBColor':
+        return RGBColor(min(self.MAX_VALUE, self._r + other.r), min(self.MAX_VALUE, self._g + other.g), min(self.MAX_VALUE, self._b + other.b))
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, RGBColor) and self.to_tuple() == other.to_tuple()
+
+    def __hash__(self) -> int:
+        return hash(self.to_tuple())
+
+    def __repr__(self) -> str:
+        return f'RGBColor({self._r}, {self._g}, {self._b})'
+
 class Colors:
     """Colors class"""
     BLACK = RGBColor(0, 0, 0)
@@ -5,50 +5,16 @@ import math
 import time
 import random
 import threading
-from typing import List, Dict, Any, Optional, Callable, Tuple
+from typing import List, Dict, Any, Optional, Callable, Tuple, Sequence
 import colorsys
 
 from ..core.rgb_color import RGBColor, Colors, create_rainbow_gradient
 from ..core.exceptions import EffectError
-from ..core.constants import TOTAL_LEDS, NUM_ZONES, ANIMATION_FRAME_DELAY
+from ..core.constants import (
+    TOTAL_LEDS, NUM_ZONES, ANIMATION_FRAME_DELAY, OSIRIS_KEY_COUNT, OSIRIS_KEY_LAYOUT
+)
 from ..utils.decorators import safe_execute, performance_monitor
 
-# Hardware mapping for OSIRIS - 100 individual keys
-OSIRIS_KEY_COUNT = 100
-OSIRIS_KEY_LAYOUT = {
-    # Row 1 - Function keys
-    'F1': 0, 'F2': 1, 'F3': 2, 'F4': 3, 'F5': 4, 'F6': 5, 'F7': 6, 'F8': 7, 'F9': 8, 'F10': 9,
-
-    # Row 2 - Number row
-    '`': 10, '1': 11, '2': 12, '3': 13, '4': 14, '5': 15, '6': 16, '7': 17, '8': 18, '9': 19, '0': 20,
-    '-': 21, '=': 22, 'Backspace': 23,
-
-    # Row 3 - QWERTY row
-    'Tab': 24, 'Q': 25, 'W': 26, 'E': 27, 'R': 28, 'T': 29, 'Y': 30, 'U': 31, 'I': 32, 'O': 33,
-    'P': 34, '[': 35, ']': 36, '\\': 37,
-
-    # Row 4 - ASDF row
-    'CapsLock': 38, 'A': 39, 'S': 40, 'D': 41, 'F': 42, 'G': 43, 'H': 44, 'J': 45, 'K': 46, 'L': 47,
-    ';': 48, "'": 49, 'Enter': 50,
-
-    # Row 5 - ZXCV row
-    'LShift': 51, 'Z': 52, 'X': 53, 'C': 54, 'V': 55, 'B': 56, 'N': 57, 'M': 58, ',': 59, '.': 60,
-    '/': 61, 'RShift': 62,
-
-    # Row 6 - Bottom row
-    'LCtrl': 63, 'Fn': 64, 'LAlt': 65, 'Space': 66, 'RAlt': 67, 'RCtrl': 68,
-
-    # Arrow cluster and additional keys
-    'Up': 69, 'Down': 70, 'Left': 71, 'Right': 72,
-
-    # Additional keys to reach 100 total
-    'Home': 73, 'End': 74, 'PageUp': 75, 'PageDown': 76, 'Insert': 77, 'Delete': 78,
-    'PrintScreen': 79, 'ScrollLock': 80, 'Pause': 81,
-
-    # Extra zones for full coverage
-    **{f'Extra{i}': 82 + i for i in range(18)}  # Extra0-Extra17 = zones 82-99
-}
-
 # Reverse mapping for position-based effects
 KEY_POSITIONS = {v: k for k, v in OSIRIS_KEY_LAYOUT.items()}
 
@@ -102,6 +68,30 @@ class BaseEffect:
         """
         raise NotImplementedError("Subclasses must implement get_colors()")
 
+    # Effects whose frames are a single uniform colour set this and
+    # implement get_brightness() so single-zone hardware can skip per-key work
+    supports_scalar = False
+
+    def get_brightness(self) -> int:
+        """
+        Get current frame as a single backlight level
+
+        Only meaningful when supports_scalar is True.
+
+        Returns:
+            int: Brightness level (0-100)
+        """
+        raise NotImplementedError("Scalar effects must implement get_brightness()")
+
+    def get_cycle_period(self) -> Optional[float]:
+        """
+        Get the animation period for effects that repeat exactly
+
+        Returns:
+            Optional[float]: Period in seconds, None if the effect is not cyclic
+        """
+        return None
+
     def advance_frame(self):
         """Advance to next animation frame"""
         with self._lock:
@@ -123,17 +113,18 @@ class StaticColorEffect(BaseEffect):
 class ColorShiftEffect(BaseEffect):
     """Smooth transition between colors over time"""
 
+    supports_scalar = True
+
     def __init__(self, start_color: RGBColor = Colors.RED, end_color: RGBColor = Colors.BLUE,
         speed: int = 5, **params):
         super().__init__("Color Shift", speed=speed, **params)
         self.start_color = start_color
         self.end_color = end_color
 
-    def get_colors(self) -> List[RGBColor]:
-        if not self.is_running:
-            return [Colors.BLACK] * OSIRIS_KEY_COUNT
-    pass
+    def get_cycle_period(self) -> Optional[float]:
+        return 5.0 / self.speed
 
+    def _current_color(self) -> RGBColor:
         # Calculate blend ratio based on time and speed
         elapsed = time.time() - self.start_time
         cycle_duration = 5.0 / self.speed  # Faster speed = shorter cycles
@@ -142,8 +133,18 @@ class ColorShiftEffect(BaseEffect):
         # Smooth transition using sine wave
         blend_ratio = (math.sin(progress * 2 * math.pi) + 1) / 2
 
-        current_color = self.start_color.blend_with(self.end_color, blend_ratio)
-        return [current_color] * OSIRIS_KEY_COUNT
+        return self.start_color.blend_with(self.end_color, blend_ratio)
+
+    def get_colors(self) -> List[RGBColor]:
+        if not self.is_running:
+            return [Colors.BLACK] * OSIRIS_KEY_COUNT
+
+        return [self._current_color()] * OSIRIS_KEY_COUNT
+
+    def get_brightness(self) -> int:
+        if not self.is_running:
+            return 0
+        return self._current_color().to_osiris_brightness()
 
 
 class RainbowWaveEffect(BaseEffect):
@@ -153,6 +154,10 @@ class RainbowWaveEffect(BaseEffect):
         super().__init__("Rainbow Wave", speed=speed, **params)
         self.direction = direction  # horizontal, vertical, diagonal
 
+    def get_cycle_period(self) -> Optional[float]:
+        # Hue advances speed * 120 degrees per second
+        return 360.0 / (self.speed * 120)
+
     def get_colors(self) -> List[RGBColor]:
         if not self.is_running:
             return [Colors.BLACK] * OSIRIS_KEY_COUNT
@@ -185,23 +190,33 @@ class RainbowWaveEffect(BaseEffect):
 class BreathingEffect(BaseEffect):
     """Keys fade in and out like breathing"""
 
+    supports_scalar = True
+
     def __init__(self, color: RGBColor = Colors.WHITE, speed: int = 5, **params):
         super().__init__("Breathing", speed=speed, color=color, **params)
 
-    def get_colors(self) -> List[RGBColor]:
-        if not self.is_running:
-            return [Colors.BLACK] * OSIRIS_KEY_COUNT
-    pass
+    def get_cycle_period(self) -> Optional[float]:
+        return 2.0 / (self.speed / 5.0)
 
+    def _intensity(self) -> float:
         elapsed = time.time() - self.start_time
         breath_rate = self.speed / 5.0  # Normalize speed
 
         # Sine wave for smooth breathing
-        intensity = (math.sin(elapsed * breath_rate * math.pi) + 1) / 2
-        breathing_color = self.color * intensity
+        return (math.sin(elapsed * breath_rate * math.pi) + 1) / 2
 
+    def get_colors(self) -> List[RGBColor]:
+        if not self.is_running:
+            return [Colors.BLACK] * OSIRIS_KEY_COUNT
+
+        breathing_color = self.color * self._intensity()
         return [breathing_color] * OSIRIS_KEY_COUNT
 
+    def get_brightness(self) -> int:
+        if not self.is_running:
+            return 0
+        return int(self.color.to_osiris_brightness() * self._intensity())
+
 
 class ReactiveKeypressEffect(BaseEffect):
     """Keys light up when pressed"""
@@ -296,10 +311,25 @@ class RippleEffect(BaseEffect):
 class PulseWaveEffect(BaseEffect):
     """Expanding rings of light from center"""
 
+    supports_scalar = True
+
     def __init__(self, color: RGBColor = Colors.PURPLE, speed: int = 5, **params):
         super().__init__("Pulse Wave", speed=speed, color=color, **params)
         self.center_key = OSIRIS_KEY_COUNT // 2  # Center of keyboard
 
+    def get_cycle_period(self) -> Optional[float]:
+        # Ring radius grows speed * 5 keys per second and wraps at 20
+        return 20.0 / (self.speed * 5)
+
+    def get_brightness(self) -> int:
+        if not self.is_running:
+            return 0
+
+        # Single-zone form: sharp attack each time a ring is emitted, then decay
+        elapsed = time.time() - self.start_time
+        phase = ((elapsed * self.speed * 5) % 20) / 20
+        return int(self.color.to_osiris_brightness() * (1 - phase))
+
     def get_colors(self) -> List[RGBColor]:
         if not self.is_running:
             return [Colors.BLACK] * OSIRIS_KEY_COUNT
@@ -334,6 +364,34 @@ class PulseWaveEffect(BaseEffect):
         return (col, row)
 
 
+class StrobeEffect(BaseEffect):
+    """All keys flash on and off"""
+
+    supports_scalar = True
+
+    def __init__(self, color: RGBColor = Colors.WHITE, speed: int = 5, duty_cycle: float = 0.5, **params):
+        super().__init__("Strobe", speed=speed, color=color, **params)
+        self.duty_cycle = max(0.05, min(0.95, duty_cycle))
+
+    def get_cycle_period(self) -> Optional[float]:
+        return 1.0 / (self.speed * 1.5)
+
+    def _is_lit(self) -> bool:
+        elapsed = time.time() - self.start_time
+        flashes_per_second = self.speed * 1.5
+        return (elapsed * flashes_per_second) % 1.0 < self.duty_cycle
+
+    def get_colors(self) -> List[RGBColor]:
+        if not self.is_running or not self._is_lit():
+            return [Colors.BLACK] * OSIRIS_KEY_COUNT
+        return [self.color] * OSIRIS_KEY_COUNT
+
+    def get_brightness(self) -> int:
+        if not self.is_running or not self._is_lit():
+            return 0
+        return self.color.to_osiris_brightness()
+
+
 class ScanningBeamEffect(BaseEffect):
     """Light bar sweeps across keyboard"""
 
@@ -663,11 +721,17 @@ class AudioVisualizerEffect(BaseEffect):
         super().__init__("Audio Visualizer", color=color, **params)
         self.sensitivity = sensitivity
         self.audio_level = 0.0  # Will be updated by audio input
+        self.band_levels: Tuple[float, ...] = ()
 
     def update_audio_level(self, level: float):
         """Update current audio level (0.0 to 1.0)"""
         self.audio_level = max(0.0, min(1.0, level * self.sensitivity))
 
+    def update_band_levels(self, levels: Sequence[float]):
+        """Update per-band levels (0.0 to 1.0, lowest band first); bars spread them across the columns"""
+        self.band_levels = tuple(max(0.0, min(1.0, level * self.sensitivity)) for level in levels)
+        self.audio_level = max(self.band_levels, default=0.0)
+
     def get_colors(self) -> List[RGBColor]:
         if not self.is_running:
             return [Colors.BLACK] * OSIRIS_KEY_COUNT
@@ -683,7 +747,11 @@ class AudioVisualizerEffect(BaseEffect):
             row = key_id // 14
 
             # Each column represents a frequency band
-            band_intensity = self.audio_level * (1 + random.uniform(-0.2, 0.2))  # Add variation
+            band_levels = self.band_levels
+            if band_levels:
+                band_intensity = band_levels[col * len(band_levels) // bars]
+            else:
+                band_intensity = self.audio_level * (1 + random.uniform(-0.2, 0.2))  # Add variation
             bar_height = int(band_intensity * 7)  # Scale to keyboard rows
 
             # Light up keys from bottom to current audio level
@@ -983,6 +1051,7 @@ EFFECT_REGISTRY = {
     'reactive_keypress': ReactiveKeypressEffect,
     'ripple': RippleEffect,
     'pulse_wave': PulseWaveEffect,
+    'strobe': StrobeEffect,
     'scanning_beam': ScanningBeamEffect,
     'snake': SnakeEffect,
     'meteor': MeteorEffect,
@@ -1005,7 +1074,7 @@ EFFECT_CATEGORIES = {
     'Static Effects': ['static_color', 'per_key_custom'],
     'Color Transitions': ['color_shift', 'breathing', 'rainbow_wave'],
     'Interactive Effects': ['reactive_keypress', 'ripple', 'type_lighting'],
-    'Wave Effects': ['pulse_wave', 'scanning_beam', 'ocean'],
+    'Wave Effects': ['pulse_wave', 'strobe', 'scanning_beam', 'ocean'],
     'Particle Effects': ['snake', 'meteor', 'starlight', 'rain', 'lightning'],
     'Ambient Effects': ['fire', 'matrix_code', 'tornado'],
     'System Effects': ['audio_visualizer', 'system_load', 'countdown'],
@@ -1023,6 +1092,7 @@ EFFECT_PERFORMANCE_RATINGS = {
     'reactive_keypress': 2,
     'per_key_custom': 1,
     'pulse_wave': 3,
+    'strobe': 1,
     'scanning_beam': 2,
     'ripple': 3,
     'snake': 2,
@@ -1,18 +1,70 @@
 #!/usr/bin/env python3
 """Enhanced Effects Manager with OSIRIS optimization and comprehensive effect management"""
 
+import math
 import threading
 import time
 import logging
 from typing import Dict, Any, Optional, List, Callable
 import queue
 
-from ..core.rgb_color import RGBColor, Colors
-from ..core.constants import NUM_ZONES, ANIMATION_FRAME_DELAY
+from ..core.rgb_color import RGBColor, Colors, get_optimal_osiris_brightness
+from ..core.constants import (
+    NUM_ZONES, ANIMATION_FRAME_DELAY, POWER_SAVER_MAX_FPS, POWER_SAVER_BRIGHTNESS_SCALE
+)
 from ..core.exceptions import EffectError, HardwareError
 from ..utils.decorators import safe_execute, thread_safe, performance_monitor
 from ..utils.input_validation import SafeInputValidation
-from .library import BaseEffect, EffectLibrary, effect_library
+from ..utils.frame_timing import frame_latency_tracker
+from ..utils.metrics import metrics_registry, cache_requests
+from ..utils.power import PowerState, power_monitor
+from ..hardware.fanout import ColorLUT
+from .library import (
+    BaseEffect, get_effect_by_name, get_available_effects, is_effect_osiris_compatible
+)
+
+_frames_rendered = metrics_registry.counter(
+    'rgbkbd_frames_rendered_total', 'Frames produced by the effect loop')
+_frame_overruns = metrics_registry.counter(
+    'rgbkbd_frame_overruns_total', 'Frames that took longer than the frame interval')
+_frame_loop_seconds = metrics_registry.histogram(
+    'rgbkbd_frame_loop_seconds', 'Time to render and output one frame in the effect loop')
+_frame_cache_hits = cache_requests.labels('frame_cycle', 'hit')
+_frame_cache_misses = cache_requests.labels('frame_cycle', 'miss')
+
+
+class _CyclicFrameCache:
+    """
+    Frames of one animation period, replayed instead of re-rendered
+
+    Slots are filled on the first pass through the cycle; afterwards every
+    frame is a lookup keyed by the phase within the period. Brightness
+    levels and colour frames are cached in separate slots, so switching
+    between the scalar and colour output paths never returns the wrong kind.
+    """
+
+    def __init__(self, effect: BaseEffect, period: float, frame_delay: float):
+        self.effect = effect
+        self.period = period
+        self.frame_delay = frame_delay
+        slot_count = max(1, math.ceil(period / frame_delay))
+        self.slots: Dict[bool, List[Any]] = {False: [None] * slot_count, True: [None] * slot_count}
+
+    def _index(self) -> int:
+        phase = (time.time() - self.effect.start_time) % self.period
+        return min(len(self.slots[False]) - 1, int(phase / self.frame_delay))
+
+    def render(self, scalar: bool) -> Any:
+        index = self._index()
+        slots = self.slots[scalar]
+        frame = slots[index]
+        if frame is None:
+            _frame_cache_misses.inc()
+            frame = self.effect.get_brightness() if scalar else self.effect.get_colors()
+            slots[index] = frame
+        else:
+            _frame_cache_hits.inc()
+        return frame
 
 
 class EffectManager:
@@ -56,27 +108,202 @@ class EffectManager:
         self.osiris_mode = False
         self.single_zone_hardware = False
 
+        # Frame pacing, retuned from measured hardware write latency
+        self.frame_delay = ANIMATION_FRAME_DELAY
+        self._hardware_frame_delay = ANIMATION_FRAME_DELAY
+
+        # Power policy: FPS cap, dimming and cached playback while on battery
+        self.power_saving = False
+        self.fps_cap: Optional[float] = None
+        self.brightness_scale = 1.0
+        self._power_lut = ColorLUT()
+        self._frame_cache: Optional[_CyclicFrameCache] = None
+
+        # Optional multi-device output; when running it receives every frame
+        self.output_fanout = None
+
         # State management
         self.is_running = False
         self.last_colors = [Colors.BLACK] * NUM_ZONES
 
+        if hardware_controller is not None:
+            self.set_hardware_controller(hardware_controller)
+        power_monitor.add_listener(self._on_power_state_changed)
+
         self.logger.info("Effect Manager initialized")
 
     def set_hardware_controller(self, hardware_controller):
         """Set or update hardware controller"""
         with self._lock:
             self.hardware = hardware_controller
-    pass
+            if hasattr(self.hardware, 'add_rate_listener'):
+                self.hardware.add_rate_listener(self._on_hardware_rate_changed)
 
             # Detect OSIRIS hardware
-            if hasattr(self.hardware, 'is_osiris_hardware'):
-        self.osiris_mode = getattr(self.hardware, 'is_osiris_hardware', False)
-    pass
-        self.single_zone_hardware = self.osiris_mode
+            self.osiris_mode = getattr(self.hardware, 'is_osiris_hardware', False)
+            self.single_zone_hardware = getattr(self.hardware, 'keys_per_frame', 0) == 1
+
+            if self.osiris_mode:
+                self.logger.info("OSIRIS hardware detected - enabling optimizations")
+
+    def _on_hardware_rate_changed(self, rate: float, batch_size: int):
+        """
+        Adopt the update rate published by the hardware controller
+
+        Args:
+            rate: Sustainable update rate in Hz
+            batch_size: Keys the hardware controller sends per write cycle
+        """
+        with self._lock:
+            self._hardware_frame_delay = max(ANIMATION_FRAME_DELAY, 1.0 / rate) if rate > 0 else ANIMATION_FRAME_DELAY
+            # Revalidation may have switched the backend
+            self.single_zone_hardware = getattr(self.hardware, 'keys_per_frame', 0) == 1
+            self._update_frame_delay()
+        self.logger.debug(f"Frame delay set to {self.frame_delay * 1000:.1f} ms (batch {batch_size})")
+
+    def _update_frame_delay(self):
+        """Combine the hardware-derived delay with the power FPS cap (lock held)"""
+        frame_delay = self._hardware_frame_delay
+        if self.fps_cap:
+            frame_delay = max(frame_delay, 1.0 / self.fps_cap)
+        if frame_delay != self.frame_delay:
+            self.frame_delay = frame_delay
+            # Cached frames are indexed by frame slot, so they depend on the delay
+            self._frame_cache = None
+
+    def _on_power_state_changed(self, state: PowerState):
+        """Apply or lift the power policy on a power source transition"""
+        self.set_power_saving(state.power_saving)
+
+    def set_power_saving(self, enabled: bool, max_fps: float = POWER_SAVER_MAX_FPS,
+                         brightness_scale: float = POWER_SAVER_BRIGHTNESS_SCALE):
+        """
+        Throttle output while running on battery
+
+        Caps the frame rate, dims output through the brightness LUT and
+        replays cyclic effects from a cache of one rendered period.
+
+        Args:
+            enabled: True to throttle, False to restore full output
+            max_fps: Frame rate cap while throttled
+            brightness_scale: Output brightness multiplier while throttled (0-1)
+        """
+        with self._lock:
+            if enabled == self.power_saving and (not enabled or self.fps_cap == max_fps):
+                return
+            self.power_saving = enabled
+            self.fps_cap = max_fps if enabled else None
+            self.brightness_scale = max(0.0, min(1.0, brightness_scale)) if enabled else 1.0
+            self._power_lut = ColorLUT(brightness=self.brightness_scale)
+            self._frame_cache = None
+            self._update_frame_delay()
+
+        if enabled:
+            self.logger.info(f"Power saving on: {max_fps:.0f} FPS cap, "
+                             f"{self.brightness_scale:.0%} brightness, cached playback")
+        else:
+            self.logger.info("Power saving off: full frame rate restored")
+
+    def set_output_fanout(self, fanout):
+        """
+        Route rendered frames through a multi-device fan-out
+
+        Args:
+            fanout: OutputFanout instance, or None to write to the hardware directly
+        """
+        with self._lock:
+            self.output_fanout = fanout
+
+    def _output_frame(self, effect: BaseEffect) -> bool:
+        """
+        Render one frame of an effect and send it to the hardware
+
+        When a fan-out is running the full frame is handed to it and every
+        device is written independently. Otherwise, on single-zone hardware,
+        effects with a scalar form only compute a brightness level which goes
+        out as one backlight write; everything else renders a full frame.
+
+        Args:
+            effect: Running effect
 
-        if self.osiris_mode:
-        self.logger.info("OSIRIS hardware detected - enabling optimizations")
-    pass
+        Returns:
+            bool: True if the frame reached the hardware
+        """
+        stamp = frame_latency_tracker.new_frame()
+
+        fanout = self.output_fanout
+        if fanout is not None and fanout.is_running:
+            colors = self._power_lut.apply(self._render(effect, scalar=False))
+            stamp.mark_composed()
+            self.last_colors = colors
+            fanout.submit(colors, stamp)
+            return True
+
+        if not self.hardware:
+            return False
+
+        if self.single_zone_hardware:
+            if effect.supports_scalar:
+                brightness = self._render(effect, scalar=True)
+            else:
+                brightness = get_optimal_osiris_brightness(self._render(effect, scalar=False))
+            brightness = int(brightness * self.brightness_scale)
+            stamp.mark_composed()
+            # The controller marks the write start once it admits the write
+            stamp.mark_queued()
+            success = self.hardware.set_brightness_fast(brightness, stamp=stamp)
+        else:
+            colors = self._power_lut.apply(self._render(effect, scalar=False))
+            stamp.mark_composed()
+            self.last_colors = colors
+            stamp.mark_queued()
+            success = self.hardware.set_zone_colors(colors, stamp=stamp)
+
+        if success:
+            stamp.mark_written()
+            frame_latency_tracker.complete(stamp)
+        return success
+
+    def _render(self, effect: BaseEffect, scalar: bool) -> Any:
+        """Render a frame, from the cyclic cache when power saving"""
+        if self.power_saving:
+            cache = self._frame_cache
+            if cache is None or cache.effect is not effect:
+                period = effect.get_cycle_period()
+                cache = self._frame_cache = (_CyclicFrameCache(effect, period, self.frame_delay)
+                                             if period else None)
+            if cache is not None:
+                return cache.render(scalar)
+        return effect.get_brightness() if scalar else effect.get_colors()
+
+    def _effect_loop(self, effect: BaseEffect):
+        """Drive an effect at the rate published by the hardware controller"""
+        effect.start()
+        try:
+            while not self._stop_event.is_set():
+                if self._pause_event.is_set():
+                    self._stop_event.wait(self.frame_delay)
+                    continue
+
+                frame_start = time.monotonic()
+                self._output_frame(effect)
+                effect.advance_frame()
+                self._frame_counter += 1
+
+                frame_time = time.monotonic() - frame_start
+                _frames_rendered.inc()
+                _frame_loop_seconds.observe(frame_time)
+                if frame_time > self.frame_delay:
+                    _frame_overruns.inc()
+                self._frame_times.append(frame_time)
+                if len(self._frame_times) > self._max_frame_time_samples:
+                    self._frame_times.pop(0)
+
+                self._stop_event.wait(max(0.0, self.frame_delay - frame_time))
+        except Exception as e:
+            self.logger.error(f"Effect loop for '{effect.name}' failed: {e}")
+        finally:
+            effect.stop()
 
     @safe_execute(max_attempts=2, severity="error")
     def start_effect(self, effect_name: str, **kwargs) -> bool:
@@ -90,77 +317,64 @@ class EffectManager:
         Returns:
             bool: True if effect started successfully
         """
+        registry_name = effect_name.lower().replace(' ', '_')
+        effect = get_effect_by_name(registry_name, **validate_effect_parameters(registry_name, **kwargs))
+        if effect is None:
+            raise EffectError(f"Unknown effect: {effect_name}", error_code="UNKNOWN_EFFECT")
+
+        self.stop_effect()
+
         with self._lock:
-            try:
-    pass
-    pass
-    pass
-    pass
-except:
-    pass
-            try:
-    pass
-    pass
-    pass
-    pass
-except:
-    pass
-        try:
-    pass
-    pass
-    pass
-    pass
-except:
-    pass
-        try:
-    pass
-    pass
-    pass
-    pass
-except:
-    pass
-        try:
-    pass
-    pass
-    pass
-    pass
-except:
-    pass
-        try:
-    pass
-    pass
-    pass
-    pass
-except:
-    pass
-        try:
-    pass
-    pass
-    pass
-    pass
-except:
-    pass
-        try:
-    pass
-    pass
-    pass
-    pass
-except:
-    pass
-        try:
-    pass
-    pass
-    pass
-    pass
-except:
-    pass
-        try:
-    pass
-    pass
-    pass
-    pass
-except:
-    pass
+            self.current_effect = effect
+            self._stop_event.clear()
+            self._pause_event.clear()
+            self._frame_counter = 0
+            self._effect_start_time = time.time()
+            self.effect_thread = threading.Thread(target=self._effect_loop, args=(effect,),
+                                                  name=f"Effect-{effect_name}", daemon=True)
+            self.effect_thread.start()
+            self.is_running = True
+
+        self.logger.info(f"Started effect '{effect_name}'")
+        return True
+
+    def stop_effect(self, timeout: float = 2.0):
+        """
+        Stop the running effect and wait for its thread to exit
+
+        Args:
+            timeout: Seconds to wait for the effect thread
+        """
+        with self._lock:
+            thread = self.effect_thread
+            self._stop_event.set()
+
+        if thread and thread.is_alive() and thread is not threading.current_thread():
+            thread.join(timeout)
+
+        with self._lock:
+            self.effect_thread = None
+            self.current_effect = None
+            self.is_running = False
+
+    def get_frame_latency_stats(self) -> Dict[str, Any]:
+        """
+        Get end-to-end frame latency broken down by pipeline stage
+
+        Returns:
+            Dict[str, Any]: Per-stage and per-device latency histograms
+        """
+        return frame_latency_tracker.get_stats()
+
+    def pause_effect(self):
+        """Pause frame output without stopping the effect"""
+        self._pause_event.set()
+
+    def resume_effect(self):
+        """Resume frame output after pause_effect"""
+        self._pause_event.clear()
+
+
 # Convenience functions for common operations
 def create_effect_manager(hardware_controller=None, logger=None) -> EffectManager:
     """Create effect manager instance"""
@@ -170,14 +384,8 @@ def create_effect_manager(hardware_controller=None, logger=None) -> EffectManage
 def get_recommended_effects_for_hardware(is_osiris: bool = False) -> List[str]:
     """Get recommended effects for specific hardware"""
     if is_osiris:
-        from .library import get_osiris_recommended_effects
-    pass
-        return get_osiris_recommended_effects()
-    else:
-    pass
-    pass
-    pass
-        return effect_library.get_available_effects()
+        return [name for name in get_available_effects() if is_effect_osiris_compatible(name)]
+    return get_available_effects()
 
 
 def validate_effect_parameters(effect_name: str, **kwargs) -> Dict[str, Any]:
@@ -187,24 +395,19 @@ def validate_effect_parameters(effect_name: str, **kwargs) -> Dict[str, Any]:
     # Common parameter validation
     if 'speed' in kwargs:
         validated['speed'] = SafeInputValidation.validate_speed(kwargs['speed'], default=5)
-    pass
 
     if 'brightness' in kwargs:
         validated['brightness'] = SafeInputValidation.validate_brightness(kwargs['brightness'], default=100)
-    pass
 
     if 'color' in kwargs:
         validated['color'] = SafeInputValidation.validate_color(kwargs['color'], default=Colors.WHITE)
-    pass
 
     if 'colors' in kwargs:
         validated['colors'] = SafeInputValidation.validate_color_list(kwargs['colors'])
-    pass
 
     # Add other parameters as-is
     for key, value in kwargs.items():
         if key not in validated:
-    pass
             validated[key] = value
 
     return validated
@@ -3,4 +3,11 @@ Hardware control module for the RGB Controller.
 This file makes 'hardware' a Python package.
 """
 from .controller import HardwareController
-__all__ = ['HardwareController']
\ No newline at end of file
+from .fanout import (
+    OutputFanout, OutputDevice, KeyboardOutputDevice, VirtualOutputDevice,
+    RemoteOutputDevice, ColorLUT
+)
+from .journal import CommandJournalWriter, CommandJournalReader, replay_journal
+__all__ = ['HardwareController', 'OutputFanout', 'OutputDevice', 'KeyboardOutputDevice',
+           'VirtualOutputDevice', 'RemoteOutputDevice', 'ColorLUT',
+           'CommandJournalWriter', 'CommandJournalReader', 'replay_journal']
\ No newline at end of file
@@ -8,7 +8,7 @@ import logging
 import threading
 import json
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Tuple, Union
+from typing import Callable, List, Dict, Any, Optional, Tuple, Union
 from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 
 from ..core.rgb_color import RGBColor, Colors, get_optimal_osiris_brightness
@@ -23,11 +23,26 @@ from ..core.exceptions import (
 )
 from ..utils.decorators import (
     safe_execute, thread_safe, performance_monitor,
-    validate_hardware_state, osiris_hardware_optimized
+    validate_hardware_state, osiris_hardware_optimized, CircuitBreaker
 )
 from ..utils.input_validation import SafeInputValidation, validate_brightness_safe
 from ..utils.safe_subprocess import run_command
 from ..utils.system_info import system_info
+from ..utils.detection_cache import detection_cache
+from ..utils.metrics import MetricFamily, Sample, metrics_registry
+from ..utils.frame_timing import FrameStamp
+from .rate_tuner import AdaptiveRateController
+from .probing import ParallelHardwareProber
+from .journal import CommandJournalWriter
+
+_hardware_writes = metrics_registry.counter(
+    'rgbkbd_hardware_writes_total', 'Backend writes by method and result (ok, error, rejected)',
+    ('method', 'result'))
+_hardware_write_seconds = metrics_registry.histogram(
+    'rgbkbd_hardware_write_seconds', 'Wall time of backend writes', ('method',))
+
+# Numeric encoding of breaker states for the state gauge
+_BREAKER_STATE_VALUES = {CircuitBreaker.CLOSED: 0, CircuitBreaker.HALF_OPEN: 1, CircuitBreaker.OPEN: 2}
 
 
 class HardwareController:
@@ -56,29 +71,557 @@ class HardwareController:
         self.supports_per_key = False
         self.current_brightness = 100
         self.last_colors = [Colors.BLACK] * OSIRIS_KEY_COUNT
+        # What each key currently shows on per-key hardware (None: unknown)
+        self._written_colors: List[Optional[RGBColor]] = [None] * OSIRIS_KEY_COUNT
+        self._batch_cursor = 0
 
         # Hardware paths and tools
         self.ectool_path = None
         self.sysfs_backlight_path = None
+        self._sysfs_max_brightness: Optional[int] = None
+        self.journal: Optional[CommandJournalWriter] = None
         self.supported_methods = []
+        self.last_probe_report: Dict[str, Any] = {}
 
         # Performance and safety
         self.max_update_rate = 30  # Hz
         self.last_update_time = 0.0
         self.error_count = 0
-        self.circuit_breaker_active = False
-        self.circuit_breaker_reset_time = 0.0
+        self.circuit_breakers: Dict[str, CircuitBreaker] = {
+            method: CircuitBreaker(name=method) for method in HARDWARE_METHODS if method != "none"
+        }
 
         # Command execution
         self.executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="HardwareExec")
 
-        # Initialize hardware detection
-        self._detect_hardware()
+        # Initialize hardware detection, reusing cached results when the
+        # system fingerprint still matches and revalidating in the background
+        detected_from_cache = self._restore_cached_detection()
+        if not detected_from_cache:
+            self._detect_hardware()
+            self._store_detection_cache()
+
+        # Adaptive rate tuning, seeded with the method's nominal rate
+        self.rate_tuner = AdaptiveRateController(self.max_update_rate, key_count=self.keys_per_frame,
+                                                 parent_logger=self.logger)
+
+        if detected_from_cache:
+            self.executor.submit(self._revalidate_detection)
+
+        metrics_registry.register_collector('hardware', self.collect_metrics)
 
         self.logger.info(f"Hardware Controller initialized - Method: {self.active_control_method}, "
         f"OSIRIS: {self.is_osiris_hardware}, Per-key: {self.supports_per_key}")
 
+    _DETECTION_STATE_FIELDS = (
+        'active_control_method', 'is_osiris_hardware', 'supports_per_key',
+        'ectool_path', 'sysfs_backlight_path', 'supported_methods', 'max_update_rate'
+    )
+
+    def _detection_snapshot(self) -> Dict[str, Any]:
+        """Get the detection-derived state as a plain dictionary"""
+        return {field: getattr(self, field) for field in self._DETECTION_STATE_FIELDS}
+
+    def _restore_cached_detection(self) -> bool:
+        """
+        Apply detection results from the persistent cache
+
+        Returns:
+            bool: True if a valid cache entry was applied
+        """
+        cached = detection_cache.get_section('hardware')
+        if not cached or any(field not in cached for field in self._DETECTION_STATE_FIELDS):
+            return False
+
+        if cached['active_control_method'] not in HARDWARE_METHODS:
+            return False
+
+        # Cheap sanity checks: the paths we are about to use must still exist
+        for path_field in ('ectool_path', 'sysfs_backlight_path'):
+            path = cached[path_field]
+            if path and not Path(path).exists():
+                self.logger.info(f"Cached {path_field} {path} is gone - re-detecting hardware")
+                return False
+
+        for field in self._DETECTION_STATE_FIELDS:
+            setattr(self, field, cached[field])
+        self.supported_methods = list(self.supported_methods)
+
+        self.logger.info(f"Hardware detection restored from cache: {self.active_control_method}")
+        return True
+
+    def _store_detection_cache(self):
+        """Persist current detection results for the next launch"""
+        detection_cache.update(
+            hardware=self._detection_snapshot(),
+            system_info=system_info.get_system_info()
+        )
+
+    def _revalidate_detection(self):
+        """Re-run full detection in the background after a cache hit"""
+        try:
+            system_info.get_system_info(force_refresh=True)
+
+            # Probing can take seconds; writes keep going on the cached
+            # state until the result is swapped in
+            detected_state, report = self._probe_detection_state()
+            with self._lock:
+                cached_state = self._detection_snapshot()
+                self._apply_detection(detected_state, report)
+                if detected_state != cached_state:
+                    self._written_colors = [None] * OSIRIS_KEY_COUNT
+
+            if detected_state != cached_state:
+                self.logger.info(f"Hardware changed since detection was cached: "
+                                 f"{cached_state['active_control_method']} -> "
+                                 f"{detected_state['active_control_method']}")
+                self.rate_tuner.reset(self.max_update_rate, key_count=self.keys_per_frame)
+
+            self._store_detection_cache()
+
+        except Exception as e:
+            self.logger.warning(f"Background hardware revalidation failed: {e}")
+
+    @property
+    def keys_per_frame(self) -> int:
+        """Keys written separately per frame: all of them with ectool, one backlight write otherwise"""
+        return OSIRIS_KEY_COUNT if self.active_control_method == "ectool" else 1
+
+    @property
+    def circuit_breaker_active(self) -> bool:
+        """True while the active backend's breaker is rejecting writes"""
+        breaker = self.circuit_breakers.get(self.active_control_method)
+        return breaker is not None and breaker.state != CircuitBreaker.CLOSED
+
+    @property
+    def circuit_breaker_reset_time(self) -> float:
+        """Monotonic time of the next probe write on the active backend"""
+        breaker = self.circuit_breakers.get(self.active_control_method)
+        return breaker.next_attempt_time if breaker else 0.0
+
+    def _execute_guarded(self, operation: str, write_func: Callable[[], bool],
+                         keys_written: int = 1, args: Tuple[Any, ...] = (),
+                         stamp: Optional[FrameStamp] = None) -> bool:
+        """
+        Run a backend write through the active method's circuit breaker
+
+        While the breaker is open the write is skipped without spawning any
+        subprocess or touching sysfs, so a wedged EC costs the render thread
+        nothing. In half-open state only a single probe write goes through.
+
+        Args:
+            operation: Public method performing the write; used for logging and journal replay
+            write_func: Callable performing the write, returns success
+            keys_written: Number of keys covered by the write
+            args: Arguments of the public call, recorded in the journal
+            stamp: Latency stamp of the frame; its write stage starts once
+                the write is admitted, so lock and breaker waits count as queueing
+
+        Returns:
+            bool: True if the write was attempted and succeeded
+        """
+        method = self.active_control_method
+        breaker = self.circuit_breakers.get(method)
+        if breaker is None or not breaker.allow_request():
+            if breaker is not None:
+                _hardware_writes.labels(method, 'rejected').inc()
+            return False
+
+        start_time = time.monotonic()
+        if stamp is not None:
+            stamp.write_start = start_time
+        try:
+            success = bool(write_func())
+        except Exception as e:
+            self.logger.error(f"Hardware error in {operation}: {e}")
+            success = False
+        latency = time.monotonic() - start_time
+
+        if success:
+            breaker.record_success()
+        else:
+            self.error_count += 1
+            breaker.record_failure()
+        _hardware_writes.labels(method, 'ok' if success else 'error').inc()
+        _hardware_write_seconds.labels(method).observe(latency)
+
+        self.record_write(latency, success, keys_written)
+
+        journal = self.journal
+        if journal is not None:
+            try:
+                journal.record(operation, args, latency, success, timestamp=start_time)
+            except Exception as e:
+                self.logger.warning(f"Stopping command journal after error: {e}")
+                self.stop_journal()
+        return success
+
+    def start_journal(self, path: Union[str, Path]) -> bool:
+        """
+        Record every backend command to a binary journal
+
+        Args:
+            path: Journal file to create
+
+        Returns:
+            bool: True if recording started
+        """
+        self.stop_journal()
+        try:
+            self.journal = CommandJournalWriter(Path(path))
+        except OSError as e:
+            self.logger.error(f"Could not open command journal {path}: {e}")
+            return False
+        self.logger.info(f"Recording hardware commands to {path}")
+        return True
+
+    def stop_journal(self):
+        """Stop recording and close the journal"""
+        journal, self.journal = self.journal, None
+        if journal is not None:
+            journal.close()
+            self.logger.info(f"Command journal closed ({journal.records} commands)")
+
+    def set_brightness_fast(self, brightness: int, stamp: Optional[FrameStamp] = None) -> bool:
+        """
+        Single backlight write for scalar effects on single-zone hardware
+
+        Skips colour validation and per-key processing entirely and drops
+        writes that would not change the level.
+
+        Args:
+            brightness: Brightness level (0-100)
+            stamp: Optional latency stamp of the frame being written
+
+        Returns:
+            bool: True if the backlight is at the requested level
+        """
+        brightness = max(0, min(100, int(brightness)))
+        if brightness == self.current_brightness:
+            return True
+
+        if self.active_control_method != "ec_direct" or not self.sysfs_backlight_path:
+            return self.set_brightness(brightness, stamp=stamp)
+
+        success = self._execute_guarded("set_brightness_fast",
+                                        lambda: self._write_sysfs_brightness(brightness),
+                                        args=(brightness,), stamp=stamp)
+        if success:
+            self.current_brightness = brightness
+        return success
+
+    def _write_sysfs_brightness(self, brightness: int) -> bool:
+        """Write a 0-100 level to the sysfs backlight, caching max_brightness"""
+        backlight = Path(self.sysfs_backlight_path)
+        if self._sysfs_max_brightness is None:
+            try:
+                self._sysfs_max_brightness = int((backlight / 'max_brightness').read_text().strip())
+            except (OSError, ValueError):
+                self._sysfs_max_brightness = 100
+
+        with open(backlight / 'brightness', 'w') as f:
+            f.write(str(int(brightness / 100.0 * self._sysfs_max_brightness)))
+        return True
+
+    def set_brightness(self, brightness: int, stamp: Optional[FrameStamp] = None) -> bool:
+        """
+        Set keyboard brightness
+
+        Args:
+            brightness: Brightness level (0-100)
+            stamp: Optional latency stamp of the frame being written
+
+        Returns:
+            bool: True if successful
+        """
+        brightness = validate_brightness_safe(brightness)
+
+        if self.active_control_method == "ec_direct":
+            if not self.sysfs_backlight_path:
+                return False
+            write_func = lambda: self._write_sysfs_brightness(brightness)
+        elif self.active_control_method == "ectool":
+            if not self.ectool_path:
+                return False
+            write_func = lambda: self._set_brightness_ectool(brightness)
+        else:
+            return False
+
+        success = self._execute_guarded("set_brightness", write_func, args=(brightness,), stamp=stamp)
+        if self.active_control_method == "ectool":
+            # The whole-keyboard command overwrote the per-key colours
+            self._written_colors = [None] * OSIRIS_KEY_COUNT
+        if success:
+            self.current_brightness = brightness
+            self.logger.debug(f"Brightness set to {brightness}%")
+        return success
+
+    def _set_brightness_ectool(self, brightness: int) -> bool:
+        """Set brightness using ectool method"""
+        # Without a dedicated brightness command the whole keyboard is set to
+        # white at the requested level
+        brightness_color = hex(int((brightness / 100.0) * 255) * 0x010101)
+        cmd = ['sudo', self.ectool_path, 'rgbkbd', '0', brightness_color]
+        result = run_command(cmd, timeout=ECTOOL_TIMEOUT)
+        if result.returncode != 0:
+            self.logger.debug(f"ectool brightness command failed: {result.stderr}")
+        return result.returncode == 0
+
+    def set_zone_colors(self, colors: List[RGBColor], stamp: Optional[FrameStamp] = None) -> bool:
+        """
+        Set colors for all zones/keys
+
+        Per-key hardware gets one command per changed key, at most the rate
+        tuner's batch size per call; keys left over are sent on the next
+        calls. Single-zone hardware gets the frame's weighted brightness as
+        one backlight write.
+
+        Args:
+            colors: List of colors for each zone/key, padded with the last
+                colour or truncated to OSIRIS_KEY_COUNT
+            stamp: Optional latency stamp of the frame being written
+
+        Returns:
+            bool: True if successful
+        """
+        colors = SafeInputValidation.validate_color_list(
+            colors, min_count=1, max_count=OSIRIS_KEY_COUNT,
+            default=[Colors.WHITE]
+        )
+        if len(colors) < OSIRIS_KEY_COUNT:
+            colors = colors + [colors[-1]] * (OSIRIS_KEY_COUNT - len(colors))
+        elif len(colors) > OSIRIS_KEY_COUNT:
+            colors = colors[:OSIRIS_KEY_COUNT]
+
+        with self._lock:
+            batch = None
+            if self.active_control_method == "ectool" and self.ectool_path:
+                batch = self._next_key_batch(colors)
+                if not batch:
+                    self.last_colors = list(colors)
+                    return True
+                write_func = lambda: self._set_key_colors_ectool(batch)
+                keys_written = len(batch)
+            elif self.active_control_method == "ec_direct" and self.sysfs_backlight_path:
+                brightness = get_optimal_osiris_brightness(colors, method="weighted_average")
+                write_func = lambda: self._write_sysfs_brightness(brightness)
+                keys_written = 1
+            else:
+                return False
+
+            success = self._execute_guarded("set_zone_colors", write_func,
+                                            keys_written=keys_written, args=(colors,), stamp=stamp)
+            if success:
+                self.last_colors = list(colors)
+                self.last_update_time = time.time()
+                if batch is None:
+                    self.current_brightness = brightness
+                else:
+                    for index, color in batch:
+                        self._written_colors[index] = color
+        return success
+
+    def _next_key_batch(self, colors: List[RGBColor]) -> List[Tuple[int, RGBColor]]:
+        """
+        Pick the keys to send in this write cycle (lock held)
+
+        Only keys that differ from what the keyboard shows are sent. The scan
+        starts after the last key sent, so keys left over from a partial
+        cycle go out before keys earlier in the frame change again.
+
+        Args:
+            colors: Full frame of OSIRIS_KEY_COUNT colours
+
+        Returns:
+            List[Tuple[int, RGBColor]]: Up to batch_size (key index, colour) pairs
+        """
+        count = len(colors)
+        batch = []
+        for offset in range(count):
+            index = (self._batch_cursor + offset) % count
+            if colors[index] != self._written_colors[index]:
+                batch.append((index, colors[index]))
+                if len(batch) >= self.rate_tuner.batch_size:
+                    break
+        if batch:
+            self._batch_cursor = (batch[-1][0] + 1) % count
+        return batch
+
+    def set_zone_color(self, zone_index: int, color: Union[RGBColor, str]) -> bool:
+        """
+        Set the colour of a single zone/key, keeping the others
+
+        Args:
+            zone_index: 0-based zone/key index
+            color: Colour to set
+
+        Returns:
+            bool: True if successful
+
+        Raises:
+            ValidationError: If zone_index is outside the keyboard
+        """
+        if not 0 <= zone_index < OSIRIS_KEY_COUNT:
+            raise ValidationError(f"Zone index {zone_index} out of range (0-{OSIRIS_KEY_COUNT - 1})")
+        color = SafeInputValidation.validate_color(color, default=Colors.WHITE)
+
+        if self.active_control_method == "ectool" and self.ectool_path:
+            write_func = lambda: self._set_key_colors_ectool([(zone_index, color)])
+        elif self.active_control_method == "ec_direct" and self.sysfs_backlight_path:
+            colors = list(self.last_colors)
+            colors[zone_index] = color
+            brightness = get_optimal_osiris_brightness(colors, method="weighted_average")
+            write_func = lambda: self._write_sysfs_brightness(brightness)
+        else:
+            return False
+
+        with self._lock:
+            success = self._execute_guarded("set_zone_color", write_func, args=(zone_index, color))
+            if success:
+                self.last_colors[zone_index] = color
+                self._written_colors[zone_index] = color
+                self.last_update_time = time.time()
+                if self.active_control_method == "ec_direct":
+                    self.current_brightness = brightness
+        return success
+
+    def _set_key_colors_ectool(self, key_colors: List[Tuple[int, RGBColor]]) -> bool:
+        """
+        Set key colours with one ectool command per key
+
+        Args:
+            key_colors: (0-based key index, colour) pairs
+
+        Returns:
+            bool: True if at least 80% of the keys were set
+        """
+        success_count = 0
+        for position, (key_id, color) in enumerate(key_colors):
+            cmd = ['sudo', self.ectool_path, 'rgbkbd', str(key_id), color.to_hex().replace('#', '0x')]
+            try:
+                result = run_command(cmd, timeout=ECTOOL_TIMEOUT)
+                if result.returncode == 0:
+                    success_count += 1
+                else:
+                    self.logger.debug(f"Key {key_id} color set failed: {result.stderr}")
+            except Exception as e:
+                self.logger.debug(f"Key {key_id} command failed: {e}")
+
+            # Small delay between commands to prevent overwhelming the hardware
+            if position < len(key_colors) - 1:
+                time.sleep(ECTOOL_INTER_COMMAND_DELAY)
+
+        if success_count < 0.8 * len(key_colors):
+            self.logger.warning(f"Key colors partially failed: {success_count}/{len(key_colors)} successful")
+            return False
+        return True
+
+    def get_circuit_breaker_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get circuit breaker state and counters for every backend
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Breaker statistics keyed by method
+        """
+        return {method: breaker.get_stats() for method, breaker in self.circuit_breakers.items()}
+
+    def collect_metrics(self) -> List[MetricFamily]:
+        """
+        Export circuit breaker and rate tuner state for the metrics registry
+
+        Returns:
+            List[MetricFamily]: Breaker state (0 closed, 1 half-open, 2 open),
+            breaker trips and the effective update rate
+        """
+        stats = self.get_circuit_breaker_stats()
+        return [
+            MetricFamily('rgbkbd_circuit_breaker_state', 'gauge',
+                         'Circuit breaker state per backend: 0 closed, 1 half-open, 2 open',
+                         [Sample('rgbkbd_circuit_breaker_state', {'method': method},
+                                 float(_BREAKER_STATE_VALUES.get(breaker['state'], 0)))
+                          for method, breaker in stats.items()]),
+            MetricFamily('rgbkbd_circuit_breaker_trips_total', 'counter',
+                         'Times each backend breaker opened',
+                         [Sample('rgbkbd_circuit_breaker_trips_total', {'method': method}, float(breaker['trips']))
+                          for method, breaker in stats.items()]),
+            MetricFamily('rgbkbd_hardware_update_rate_hz', 'gauge',
+                         'Update rate currently sustained by the active backend',
+                         [Sample('rgbkbd_hardware_update_rate_hz', {'method': self.active_control_method},
+                                 self.get_effective_update_rate())]),
+        ]
+
+    def record_write(self, latency: float, success: bool, keys_written: int = 1):
+        """
+        Report a completed backend write to the adaptive rate tuner
+
+        Args:
+            latency: Wall time of the write in seconds
+            success: Whether the write succeeded
+            keys_written: Number of keys covered by the write
+        """
+        self.rate_tuner.record_write(latency, success, keys_written)
+
+    def get_effective_update_rate(self) -> float:
+        """
+        Get the update rate currently sustained by the hardware
+
+        Returns:
+            float: Updates per second, 0.0 when no control method is active
+        """
+        if self.active_control_method == "none":
+            return 0.0
+        return self.rate_tuner.effective_rate
+
+    def get_write_batch_size(self) -> int:
+        """Get the number of keys to send per write cycle"""
+        return self.rate_tuner.batch_size
+
+    def add_rate_listener(self, listener):
+        """
+        Subscribe to update rate changes
+
+        Args:
+            listener: Callback invoked as listener(rate_hz, batch_size)
+        """
+        self.rate_tuner.add_listener(listener)
+
+    def remove_rate_listener(self, listener):
+        """Unsubscribe from update rate changes"""
+        self.rate_tuner.remove_listener(listener)
+
     @safe_execute(max_attempts=1, severity="warning", fallback_return=False)
+    def _probe_detection_state(self) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Probe the hardware without touching controller state
+
+        Returns:
+            Tuple[Dict[str, Any], Dict[str, Any]]: Detection fields and the raw probe report
+        """
+        # Probes run concurrently, each with its own timeout
+        report = ParallelHardwareProber(parent_logger=self.logger).run()
+
+        is_osiris = report['osiris'].get('is_osiris', False)
+        method = report['preferred_method']
+        state = {
+            'active_control_method': method,
+            'is_osiris_hardware': is_osiris,
+            'supports_per_key': is_osiris,
+            'ectool_path': report['ectool_path'],
+            'sysfs_backlight_path': report['sysfs_backlight_path'],
+            'supported_methods': list(report['usable_methods']),
+            'max_update_rate': (HARDWARE_COMPATIBILITY[method]['max_update_rate']
+                                if method != "none" else self.max_update_rate),
+        }
+        return state, report
+
+    def _apply_detection(self, state: Dict[str, Any], report: Dict[str, Any]):
+        """Adopt probed detection state (lock held once the controller is running)"""
+        if state['sysfs_backlight_path'] != self.sysfs_backlight_path:
+            self._sysfs_max_brightness = None
+        for field, value in state.items():
+            setattr(self, field, value)
+        self.last_probe_report = report
+
     def _detect_hardware(self) -> bool:
         """
         Detect available hardware and control methods
@@ -87,12 +630,18 @@ class HardwareController:
             bool: True if hardware detected successfully
         """
         try:
-    pass
-    pass
-    pass
-    pass
-except:
-    pass
+            state, report = self._probe_detection_state()
+            self._apply_detection(state, report)
+
+            self.logger.info(f"Hardware detection complete in {report['total_latency'] * 1000:.0f} ms: "
+                             f"{self.active_control_method} (supported: {', '.join(self.supported_methods)})")
+
+            return True
+
+        except Exception as e:
+            self.logger.error(f"Hardware detection failed: {e}")
+            self.active_control_method = "none"
+            return False
         try:
     pass
     pass
@@ -269,12 +818,39 @@ def detect_hardware_capabilities() -> Dict[str, Any]:
         Dict[str, Any]: Hardware capabilities
     """
     try:
-    pass
-    pass
-    pass
-    pass
-except:
-    pass
+        cached = detection_cache.get_section('hardware')
+        if cached:
+            sys_info = detection_cache.get_section('system_info') or {}
+            return {
+                'is_osiris': cached.get('is_osiris_hardware', False),
+                'supported_methods': cached.get('supported_methods', []),
+                'per_key_support': cached.get('supports_per_key', False),
+                'platform': sys_info.get('platform', {}).get('system', 'Unknown'),
+                'chromeos': sys_info.get('chromeos', {}).get('is_chromeos', False)
+            }
+
+        # Quick detection without full initialization
+        sys_info = system_info.get_system_info()
+        osiris_info = sys_info.get('osiris', {})
+
+        return {
+            'is_osiris': osiris_info.get('is_osiris', False),
+            'supported_methods': osiris_info.get('supported_methods', []),
+            'per_key_support': osiris_info.get('is_osiris', False),
+            'platform': sys_info.get('platform', {}).get('system', 'Unknown'),
+            'chromeos': sys_info.get('chromeos', {}).get('is_chromeos', False)
+        }
+
+    except Exception:
+        return {
+            'is_osiris': False,
+            'supported_methods': [],
+            'per_key_support': False,
+            'platform': 'Unknown',
+            'chromeos': False
+        }
+
+
 def test_hardware_quickly() -> bool:
     """
     Quick hardware test without full controller initialization
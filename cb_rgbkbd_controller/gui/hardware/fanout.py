@@ -0,0 +1,454 @@
+#!/usr/bin/env python3
+"""Multi-device output fan-out with per-device latest-wins queues"""
+
+import time
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+from ..core.rgb_color import RGBColor
+from ..core.constants import ANIMATION_FRAME_DELAY, OUTPUT_DEVICE_DEFAULT_RATE_HZ
+from ..core.frame_codec import pack_frame
+from ..utils.frame_timing import FrameStamp, frame_latency_tracker
+from ..utils.metrics import metrics_registry
+
+_frames_dropped = metrics_registry.counter(
+    'rgbkbd_frames_dropped_total', 'Frames replaced in a device slot before being written', ('device',))
+_device_writes = metrics_registry.counter(
+    'rgbkbd_device_writes_total', 'Frame writes per output device and result', ('device', 'result'))
+
+
+class ColorLUT:
+    """
+    Per-device colour and brightness lookup table
+
+    Gamma, per-channel gain and a global brightness scale are folded into
+    three precomputed 256-entry tables, so correcting a frame costs three
+    list lookups per key.
+    """
+
+    def __init__(self, brightness: float = 1.0, gamma: float = 1.0,
+                 channel_gain: tuple = (1.0, 1.0, 1.0)):
+        """
+        Initialize lookup table
+
+        Args:
+            brightness: Global brightness scale (0-1)
+            gamma: Output gamma (1.0 leaves values unchanged)
+            channel_gain: Red, green and blue gain (0-1)
+        """
+        self.brightness = max(0.0, min(1.0, brightness))
+        self.gamma = gamma if gamma > 0 else 1.0
+        self.channel_gain = tuple(max(0.0, min(1.0, g)) for g in channel_gain)
+        self._tables = [self._build_table(gain) for gain in self.channel_gain]
+
+    def _build_table(self, gain: float) -> List[int]:
+        scale = self.brightness * gain
+        return [int(round(((value / 255.0) ** self.gamma) * 255 * scale)) for value in range(256)]
+
+    @property
+    def is_identity(self) -> bool:
+        """True if the table leaves colours unchanged"""
+        return self.brightness == 1.0 and self.gamma == 1.0 and self.channel_gain == (1.0, 1.0, 1.0)
+
+    def apply(self, colors: List[RGBColor]) -> List[RGBColor]:
+        """
+        Correct a frame of colours
+
+        Args:
+            colors: Frame colours
+
+        Returns:
+            List[RGBColor]: Corrected colours
+        """
+        if self.is_identity:
+            return colors
+        red, green, blue = self._tables
+        return [RGBColor(red[c.r], green[c.g], blue[c.b]) for c in colors]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Get LUT parameters as a dictionary"""
+        return {'brightness': self.brightness, 'gamma': self.gamma,
+                'channel_gain': list(self.channel_gain)}
+
+
+class LatestFrameSlot:
+    """
+    Single-entry queue that keeps only the newest frame
+
+    Producers never block: a frame that has not been taken yet is simply
+    replaced and counted as dropped.
+    """
+
+    def __init__(self, dropped_metric=None):
+        """
+        Initialize frame slot
+
+        Args:
+            dropped_metric: Optional registry counter incremented per dropped frame
+        """
+        self._condition = threading.Condition(threading.Lock())
+        self._frame: Optional[tuple] = None
+        self._dropped_metric = dropped_metric
+        self.dropped = 0
+
+    def put(self, frame: List[RGBColor], stamp: Optional[FrameStamp] = None):
+        """Store a frame, replacing any frame not yet consumed"""
+        with self._condition:
+            if self._frame is not None:
+                self._count_dropped()
+            self._frame = (frame, stamp)
+            self._condition.notify()
+
+    def discard(self):
+        """Count a frame already taken by the consumer as dropped"""
+        with self._condition:
+            self._count_dropped()
+
+    def _count_dropped(self):
+        self.dropped += 1
+        if self._dropped_metric is not None:
+            self._dropped_metric.inc()
+
+    def take(self, timeout: Optional[float] = None) -> Optional[tuple]:
+        """
+        Wait for and remove the newest frame
+
+        Args:
+            timeout: Seconds to wait, None to wait forever
+
+        Returns:
+            Optional[tuple]: (frame, stamp), or None on timeout
+        """
+        with self._condition:
+            if self._frame is None:
+                self._condition.wait(timeout)
+            frame, self._frame = self._frame, None
+            return frame
+
+    def wake(self):
+        """Wake a waiting consumer without delivering a frame"""
+        with self._condition:
+            self._condition.notify_all()
+
+
+class OutputDevice:
+    """
+    Base class for frame output targets
+
+    Subclasses implement write_frame(); pacing, colour correction and
+    statistics are handled by the fan-out worker that owns the device.
+    """
+
+    def __init__(self, name: str, rate_hz: float = OUTPUT_DEVICE_DEFAULT_RATE_HZ,
+                 lut: Optional[ColorLUT] = None):
+        """
+        Initialize output device
+
+        Args:
+            name: Unique device name
+            rate_hz: Maximum frames per second sent to this device
+            lut: Colour/brightness correction applied before writing
+        """
+        self.name = name
+        self.rate_hz = rate_hz
+        self.lut = lut or ColorLUT()
+        # Delivery statistics live here so they survive worker restarts
+        self.frames_written = 0
+        self.write_errors = 0
+        self.last_latency = 0.0
+
+    def get_min_interval(self) -> float:
+        """Get the minimum time between writes in seconds"""
+        return 1.0 / self.rate_hz if self.rate_hz > 0 else ANIMATION_FRAME_DELAY
+
+    def write_frame(self, colors: List[RGBColor]) -> bool:
+        """
+        Send one corrected frame to the device
+
+        Args:
+            colors: Frame colours after LUT correction
+
+        Returns:
+            bool: True if the write succeeded
+        """
+        raise NotImplementedError("Subclasses must implement write_frame()")
+
+    def close(self):
+        """Release device resources"""
+
+
+class KeyboardOutputDevice(OutputDevice):
+    """The local keyboard, driven through a HardwareController"""
+
+    def __init__(self, hardware_controller, name: str = "Keyboard", lut: Optional[ColorLUT] = None):
+        self.hardware = hardware_controller
+        rate = hardware_controller.get_effective_update_rate() or OUTPUT_DEVICE_DEFAULT_RATE_HZ
+        super().__init__(name, rate_hz=rate, lut=lut)
+        hardware_controller.add_rate_listener(self._on_rate_changed)
+
+    def _on_rate_changed(self, rate: float, batch_size: int):
+        if rate > 0:
+            self.rate_hz = rate
+
+    def write_frame(self, colors: List[RGBColor]) -> bool:
+        return bool(self.hardware.set_zone_colors(colors))
+
+    def close(self):
+        self.hardware.remove_rate_listener(self._on_rate_changed)
+
+
+class VirtualOutputDevice(OutputDevice):
+    """In-memory device that keeps the last frame, e.g. for previews"""
+
+    def __init__(self, name: str, rate_hz: float = OUTPUT_DEVICE_DEFAULT_RATE_HZ,
+                 lut: Optional[ColorLUT] = None):
+        super().__init__(name, rate_hz=rate_hz, lut=lut)
+        self.last_frame: List[RGBColor] = []
+
+    def write_frame(self, colors: List[RGBColor]) -> bool:
+        self.last_frame = colors
+        return True
+
+
+class RemoteOutputDevice(OutputDevice):
+    """Remote controller instance reached over its HTTP API"""
+
+    def __init__(self, name: str, url: str, rate_hz: float = OUTPUT_DEVICE_DEFAULT_RATE_HZ,
+                 lut: Optional[ColorLUT] = None, timeout: float = 1.0, client=None):
+        """
+        Initialize remote device
+
+        Args:
+            name: Unique device name
+            url: Root URL of the remote controller's API
+            rate_hz: Maximum frames per second
+            lut: Colour correction table
+            timeout: HTTP timeout in seconds
+            client: APIClient to send through, defaults to a pooled client for url
+        """
+        super().__init__(name, rate_hz=rate_hz, lut=lut)
+        if client is None:
+            from ..api.client import APIClient
+            client = APIClient(base_url=url, timeout=timeout)
+        self.url = client.base_url
+        self.client = client
+
+    def write_frame(self, colors: List[RGBColor]) -> bool:
+        # Packed binary frames over the client's keep-alive pool and retry policy
+        return self.client.set_frame_packed(pack_frame(colors)).ok
+
+    def close(self):
+        self.client.close()
+
+
+class _DeviceWorker:
+    """Thread that drains one device's frame slot at the device's own rate"""
+
+    def __init__(self, device: OutputDevice, logger: logging.Logger,
+                 slot: Optional[LatestFrameSlot] = None):
+        self.device = device
+        self.logger = logger
+        # A replacement worker takes over its predecessor's slot and drop count
+        self.slot = slot or LatestFrameSlot(_frames_dropped.labels(device.name))
+        self._written_metric = _device_writes.labels(device.name, 'ok')
+        self._error_metric = _device_writes.labels(device.name, 'error')
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"Output-{device.name}", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0):
+        self._stop_event.set()
+        self.slot.wake()
+        if self._thread.ident is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        next_write = 0.0
+        while not self._stop_event.is_set():
+            item = self.slot.take(timeout=0.5)
+            if item is None:
+                continue
+
+            # Pace to the device rate; frames arriving meanwhile replace this one
+            delay = next_write - time.monotonic()
+            if delay > 0 and self._stop_event.wait(delay):
+                break
+            newer = self.slot.take(timeout=0)
+            if newer is not None:
+                # The frame held while pacing is superseded and never written
+                self.slot.discard()
+                item = newer
+            frame, stamp = item
+            stamp = stamp.fork() if stamp else None
+
+            frame = self.device.lut.apply(frame)
+            start_time = time.monotonic()
+            if stamp:
+                stamp.write_start = start_time
+            try:
+                success = self.device.write_frame(frame)
+            except Exception as e:
+                self.logger.debug(f"Write to {self.device.name} failed: {e}")
+                success = False
+            latency = time.monotonic() - start_time
+            self.device.last_latency = latency
+
+            if success:
+                self.device.frames_written += 1
+                self._written_metric.inc()
+                if stamp:
+                    stamp.written = start_time + latency
+                    frame_latency_tracker.complete(stamp, device=self.device.name)
+            else:
+                self.device.write_errors += 1
+                self._error_metric.inc()
+            next_write = start_time + self.device.get_min_interval()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'rate_hz': self.device.rate_hz,
+            'frames_written': self.device.frames_written,
+            'frames_dropped': self.slot.dropped,
+            'write_errors': self.device.write_errors,
+            'last_latency': self.device.last_latency,
+            'lut': self.device.lut.to_dict()
+        }
+
+
+class OutputFanout:
+    """
+    Distributes each rendered frame to several output devices
+
+    Every device has its own worker thread and latest-wins slot, so a slow
+    or unreachable device only drops its own frames and never delays the
+    keyboard or the other devices.
+    """
+
+    def __init__(self, parent_logger: Optional[logging.Logger] = None):
+        """
+        Initialize fan-out
+
+        Args:
+            parent_logger: Parent logger instance
+        """
+        self.logger = (parent_logger.getChild('OutputFanout')
+                       if parent_logger else logging.getLogger('OutputFanout'))
+        self._lock = threading.RLock()
+        self._workers: Dict[str, _DeviceWorker] = {}
+        self.is_running = False
+        self.frames_submitted = 0
+
+    def add_device(self, device: OutputDevice):
+        """
+        Register an output device, starting its worker if running
+
+        Args:
+            device: Device to add; replaces a device with the same name
+        """
+        with self._lock:
+            previous = self._workers.pop(device.name, None)
+            worker = _DeviceWorker(device, self.logger)
+            self._workers[device.name] = worker
+            if self.is_running:
+                worker.start()
+        # Joining the old worker can take a full write; never do it under the lock
+        if previous is not None:
+            previous.stop()
+            previous.device.close()
+        self.logger.info(f"Output device added: {device.name} ({device.rate_hz:.1f} Hz)")
+
+    def remove_device(self, name: str) -> bool:
+        """
+        Unregister and close an output device
+
+        Args:
+            name: Device name
+
+        Returns:
+            bool: True if the device existed
+        """
+        with self._lock:
+            worker = self._workers.pop(name, None)
+        if worker is None:
+            return False
+        worker.stop()
+        worker.device.close()
+        return True
+
+    def get_device(self, name: str) -> Optional[OutputDevice]:
+        """Get a registered device by name"""
+        with self._lock:
+            worker = self._workers.get(name)
+            return worker.device if worker else None
+
+    def get_device_names(self) -> List[str]:
+        """Get names of all registered devices"""
+        with self._lock:
+            return list(self._workers)
+
+    def set_device_lut(self, name: str, lut: ColorLUT) -> bool:
+        """Replace the colour/brightness LUT of a device"""
+        device = self.get_device(name)
+        if device is None:
+            return False
+        device.lut = lut
+        return True
+
+    def start(self):
+        """Start all device workers"""
+        with self._lock:
+            if self.is_running:
+                return
+            self.is_running = True
+            for worker in self._workers.values():
+                worker.start()
+        self.logger.info(f"Output fan-out started for {len(self._workers)} device(s)")
+
+    def stop(self):
+        """Stop all device workers; devices stay registered"""
+        with self._lock:
+            if not self.is_running:
+                return
+            self.is_running = False
+            workers = list(self._workers.values())
+            # Workers cannot be restarted, so replace them with fresh ones
+            for name, worker in self._workers.items():
+                self._workers[name] = _DeviceWorker(worker.device, self.logger, slot=worker.slot)
+        for worker in workers:
+            worker.stop()
+        self.logger.info("Output fan-out stopped")
+
+    def submit(self, colors: List[RGBColor], stamp: Optional[FrameStamp] = None):
+        """
+        Hand one rendered frame to every device
+
+        Never blocks; each device picks up the newest frame when ready.
+
+        Args:
+            colors: Frame colours
+            stamp: Latency stamp carried with the frame
+        """
+        with self._lock:
+            workers = list(self._workers.values())
+            self.frames_submitted += 1
+        if stamp:
+            stamp.mark_queued()
+        for worker in workers:
+            worker.slot.put(colors, stamp)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get per-device delivery statistics
+
+        Returns:
+            Dict[str, Any]: Submitted frame count and per-device stats
+        """
+        with self._lock:
+            return {
+                'running': self.is_running,
+                'frames_submitted': self.frames_submitted,
+                'devices': {name: worker.get_stats() for name, worker in self._workers.items()}
+            }
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Binary journal of hardware commands with record and replay
+
+File layout (little endian):
+    header   b'RGBJ', u8 version, f64 wall-clock start time
+    record   f64 offset, f32 latency, u8 flags, u8 kind, u16 payload length, payload
+
+Kinds are OPNAME (registers an operation id -> name) and COMMAND. Command
+payloads are a u8 operation id followed by typed arguments; colour frames
+are stored as packed RGB, three bytes per key.
+"""
+
+import io
+import sys
+import time
+import struct
+import logging
+import argparse
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from ..core.rgb_color import RGBColor
+
+JOURNAL_MAGIC = b'RGBJ'
+JOURNAL_VERSION = 1
+
+_HEADER = struct.Struct('<4sBd')
+_RECORD = struct.Struct('<dfBBH')
+
+KIND_OPNAME = 1
+KIND_COMMAND = 2
+FLAG_SUCCESS = 0x01
+
+# Argument type tags
+_TAG_NONE = b'n'
+_TAG_INT = b'i'
+_TAG_FLOAT = b'f'
+_TAG_STR = b's'
+_TAG_COLOR = b'c'
+_TAG_FRAME = b'F'
+
+
+class JournalEntry(NamedTuple):
+    """One recorded hardware command"""
+    offset: float
+    operation: str
+    args: Tuple[Any, ...]
+    latency: float
+    success: bool
+
+
+def _encode_args(args: Tuple[Any, ...]) -> bytes:
+    out = io.BytesIO()
+    for arg in args:
+        if arg is None:
+            out.write(_TAG_NONE)
+        elif isinstance(arg, bool) or isinstance(arg, int):
+            out.write(_TAG_INT + struct.pack('<i', int(arg)))
+        elif isinstance(arg, float):
+            out.write(_TAG_FLOAT + struct.pack('<d', arg))
+        elif isinstance(arg, str):
+            data = arg.encode('utf-8')
+            out.write(_TAG_STR + struct.pack('<H', len(data)) + data)
+        elif isinstance(arg, RGBColor):
+            out.write(_TAG_COLOR + bytes((arg.r, arg.g, arg.b)))
+        elif isinstance(arg, (list, tuple)) and all(isinstance(c, RGBColor) for c in arg):
+            out.write(_TAG_FRAME + struct.pack('<H', len(arg)))
+            out.write(bytes(component for c in arg for component in (c.r, c.g, c.b)))
+        else:
+            raise TypeError(f"Cannot journal argument of type {type(arg).__name__}")
+    return out.getvalue()
+
+
+def _decode_args(data: bytes) -> Tuple[Any, ...]:
+    args: List[Any] = []
+    pos = 0
+    while pos < len(data):
+        tag = data[pos:pos + 1]
+        pos += 1
+        if tag == _TAG_NONE:
+            args.append(None)
+        elif tag == _TAG_INT:
+            args.append(struct.unpack_from('<i', data, pos)[0])
+            pos += 4
+        elif tag == _TAG_FLOAT:
+            args.append(struct.unpack_from('<d', data, pos)[0])
+            pos += 8
+        elif tag == _TAG_STR:
+            length = struct.unpack_from('<H', data, pos)[0]
+            pos += 2
+            args.append(data[pos:pos + length].decode('utf-8'))
+            pos += length
+        elif tag == _TAG_COLOR:
+            args.append(RGBColor(data[pos], data[pos + 1], data[pos + 2]))
+            pos += 3
+        elif tag == _TAG_FRAME:
+            count = struct.unpack_from('<H', data, pos)[0]
+            pos += 2
+            raw = data[pos:pos + count * 3]
+            args.append([RGBColor(raw[i], raw[i + 1], raw[i + 2]) for i in range(0, len(raw), 3)])
+            pos += count * 3
+        else:
+            raise ValueError(f"Corrupt journal argument tag {tag!r}")
+    return tuple(args)
+
+
+class CommandJournalWriter:
+    """
+    Appends hardware commands to a binary journal file
+
+    Recording is thread safe and buffered; the file is flushed every
+    flush_interval seconds so an abnormal exit loses little data.
+    """
+
+    def __init__(self, path: Path, flush_interval: float = 1.0):
+        """
+        Open a new journal
+
+        Args:
+            path: Journal file to create (overwritten if it exists)
+            flush_interval: Seconds between buffer flushes
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, 'wb')
+        self._lock = threading.Lock()
+        self._op_ids: Dict[str, int] = {}
+        self._start = time.monotonic()
+        self._last_flush = self._start
+        self.flush_interval = flush_interval
+        self.records = 0
+        self._file.write(_HEADER.pack(JOURNAL_MAGIC, JOURNAL_VERSION, time.time()))
+
+    def _write_record(self, offset: float, latency: float, flags: int, kind: int, payload: bytes):
+        self._file.write(_RECORD.pack(offset, latency, flags, kind, len(payload)))
+        self._file.write(payload)
+
+    def record(self, operation: str, args: Tuple[Any, ...] = (), latency: float = 0.0,
+               success: bool = True, timestamp: Optional[float] = None):
+        """
+        Append one command
+
+        Args:
+            operation: HardwareController method name
+            args: Positional arguments of the call
+            latency: Measured write latency in seconds
+            success: Whether the write succeeded
+            timestamp: time.monotonic() of the command, defaults to now
+        """
+        payload = _encode_args(args)
+        offset = (timestamp if timestamp is not None else time.monotonic()) - self._start
+        with self._lock:
+            if self._file.closed:
+                return
+            op_id = self._op_ids.get(operation)
+            if op_id is None:
+                op_id = len(self._op_ids) + 1
+                if op_id > 255:
+                    raise ValueError("Too many distinct operations for one journal")
+                self._op_ids[operation] = op_id
+                self._write_record(offset, 0.0, 0, KIND_OPNAME,
+                                   bytes((op_id,)) + operation.encode('utf-8'))
+            flags = FLAG_SUCCESS if success else 0
+            self._write_record(offset, latency, flags, KIND_COMMAND, bytes((op_id,)) + payload)
+            self.records += 1
+
+            now = time.monotonic()
+            if now - self._last_flush >= self.flush_interval:
+                self._file.flush()
+                self._last_flush = now
+
+    def close(self):
+        """Flush and close the journal"""
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class CommandJournalReader:
+    """Iterates the commands stored in a binary journal"""
+
+    def __init__(self, path: Path):
+        """
+        Open a journal for reading
+
+        Args:
+            path: Journal file
+        """
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            magic, version, self.start_time = _HEADER.unpack(f.read(_HEADER.size))
+        if magic != JOURNAL_MAGIC:
+            raise ValueError(f"{self.path} is not a command journal")
+        if version != JOURNAL_VERSION:
+            raise ValueError(f"Unsupported journal version {version}")
+
+    def __iter__(self) -> Iterator[JournalEntry]:
+        operations: Dict[int, str] = {}
+        with open(self.path, 'rb') as f:
+            f.seek(_HEADER.size)
+            while True:
+                header = f.read(_RECORD.size)
+                if len(header) < _RECORD.size:
+                    return
+                offset, latency, flags, kind, length = _RECORD.unpack(header)
+                payload = f.read(length)
+                if len(payload) < length:
+                    # Truncated tail from an interrupted recording
+                    return
+                if kind == KIND_OPNAME:
+                    operations[payload[0]] = payload[1:].decode('utf-8')
+                elif kind == KIND_COMMAND:
+                    yield JournalEntry(offset, operations.get(payload[0], f"op{payload[0]}"),
+                                       _decode_args(payload[1:]), latency, bool(flags & FLAG_SUCCESS))
+
+
+def replay_journal(path: Path, target, speed: Optional[float] = 1.0,
+                   stop_event: Optional[threading.Event] = None) -> Dict[str, Any]:
+    """
+    Feed a recorded journal into a backend
+
+    Args:
+        path: Journal file
+        target: Object exposing the recorded methods (e.g. a HardwareController)
+        speed: Playback speed multiplier; None replays as fast as possible
+        stop_event: Optional event that aborts the replay
+
+    Returns:
+        Dict[str, Any]: Commands replayed, failures, elapsed time and rate
+    """
+    replayed = failures = skipped = 0
+    start = time.monotonic()
+
+    for entry in CommandJournalReader(path):
+        if stop_event is not None and stop_event.is_set():
+            break
+        if speed:
+            delay = start + entry.offset / speed - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+        method = getattr(target, entry.operation, None)
+        if method is None:
+            skipped += 1
+            continue
+        try:
+            if not method(*entry.args):
+                failures += 1
+        except Exception:
+            failures += 1
+        replayed += 1
+
+    elapsed = time.monotonic() - start
+    return {
+        'replayed': replayed,
+        'failures': failures,
+        'skipped': skipped,
+        'elapsed': elapsed,
+        'commands_per_second': replayed / elapsed if elapsed > 0 else 0.0
+    }
+
+
+class _NullBackend:
+    """Accepts every command; used to measure journal replay overhead"""
+
+    def __getattr__(self, name):
+        return lambda *args: True
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point: summarize or replay a journal"""
+    parser = argparse.ArgumentParser(description="Inspect or replay a hardware command journal")
+    parser.add_argument('journal', type=Path, help="Journal file")
+    parser.add_argument('--replay', action='store_true', help="Replay into a backend")
+    parser.add_argument('--max-speed', action='store_true', help="Ignore recorded timing")
+    parser.add_argument('--speed', type=float, default=1.0, help="Playback speed multiplier")
+    parser.add_argument('--dry-run', action='store_true', help="Replay into a null backend")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+
+    if not args.replay:
+        counts: Dict[str, int] = {}
+        failures = 0
+        duration = 0.0
+        for entry in CommandJournalReader(args.journal):
+            counts[entry.operation] = counts.get(entry.operation, 0) + 1
+            failures += not entry.success
+            duration = entry.offset
+        total = sum(counts.values())
+        print(f"{total} commands over {duration:.2f}s ({failures} failed)")
+        for operation, count in sorted(counts.items()):
+            print(f"  {operation}: {count}")
+        return 0
+
+    if args.dry_run:
+        target = _NullBackend()
+    else:
+        from .controller import HardwareController
+        target = HardwareController()
+
+    stats = replay_journal(args.journal, target, speed=None if args.max_speed else args.speed)
+    print(f"Replayed {stats['replayed']} commands in {stats['elapsed']:.2f}s "
+          f"({stats['commands_per_second']:.1f}/s, {stats['failures']} failed, "
+          f"{stats['skipped']} skipped)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
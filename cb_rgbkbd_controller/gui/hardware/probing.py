@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""Parallel, time-boxed hardware probing for fast detection"""
+
+import os
+import time
+import shutil
+import logging
+from pathlib import Path
+from typing import Callable, Dict, Any, List, Optional
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+
+from ..core.constants import (
+    ECTOOL_TIMEOUT, HARDWARE_DETECTION_TIMEOUT, HARDWARE_PROBE_TIMEOUT,
+    HARDWARE_PROBE_WORKERS
+)
+from ..utils.safe_subprocess import run_command
+
+KEYBOARD_BACKLIGHT_PATHS = [
+    '/sys/class/leds/chromeos::kbd_backlight',
+    '/sys/class/leds/platform::kbd_backlight',
+    '/sys/class/backlight/platform-keyboard-backlight'
+]
+ECTOOL_COMMON_PATHS = [
+    '/usr/local/bin/ectool',
+    '/usr/bin/ectool',
+    './ectool/build/src/ectool',
+    '../ectool/build/src/ectool'
+]
+OSIRIS_IDENTIFIERS = ('osiris',)
+OSIRIS_ID_SOURCES = [
+    '/sys/class/dmi/id/product_name',
+    '/sys/class/dmi/id/board_name',
+    '/etc/lsb-release'
+]
+
+
+def _find_ectool() -> Optional[str]:
+    """Locate an executable ectool without spawning a subprocess"""
+    for path in ECTOOL_COMMON_PATHS:
+        if Path(path).exists() and os.access(path, os.X_OK):
+            return path
+    return shutil.which('ectool')
+
+
+def probe_sysfs_backlight() -> Dict[str, Any]:
+    """Find a keyboard backlight LED in sysfs and check access to it"""
+    for path in KEYBOARD_BACKLIGHT_PATHS:
+        brightness_file = Path(path) / 'brightness'
+        if brightness_file.exists():
+            readable = os.access(brightness_file, os.R_OK)
+            writable = os.access(brightness_file, os.W_OK)
+            return {
+                'path': path,
+                'readable': readable,
+                'writable': writable,
+                'usable_method': 'ec_direct' if writable else None
+            }
+    return {'path': None, 'readable': False, 'writable': False, 'usable_method': None}
+
+
+def probe_ectool_presence() -> Dict[str, Any]:
+    """Check whether an ectool binary is installed"""
+    path = _find_ectool()
+    return {'path': path, 'present': path is not None}
+
+
+def probe_ectool_version() -> Dict[str, Any]:
+    """Confirm ectool can talk to the EC"""
+    path = _find_ectool()
+    if not path:
+        return {'path': None, 'version': None, 'usable_method': None}
+
+    cmd = [path, 'version'] if os.geteuid() == 0 else ['sudo', '-n', path, 'version']
+    result = run_command(cmd, timeout=ECTOOL_TIMEOUT)
+    ok = result.returncode == 0
+    return {
+        'path': path,
+        'version': result.stdout.strip().splitlines()[0] if ok and result.stdout.strip() else None,
+        'usable_method': 'ectool' if ok else None
+    }
+
+
+def probe_permissions() -> Dict[str, Any]:
+    """Check root and passwordless sudo availability"""
+    is_root = os.geteuid() == 0
+    sudo_ok = is_root
+    if not is_root and shutil.which('sudo'):
+        sudo_ok = run_command(['sudo', '-n', 'true'], timeout=HARDWARE_PROBE_TIMEOUT).returncode == 0
+    return {'is_root': is_root, 'passwordless_sudo': sudo_ok}
+
+
+def probe_osiris_identification() -> Dict[str, Any]:
+    """Identify OSIRIS hardware from DMI data and ChromeOS release info"""
+    for source in OSIRIS_ID_SOURCES:
+        try:
+            content = Path(source).read_text().lower()
+        except OSError:
+            continue
+        for identifier in OSIRIS_IDENTIFIERS:
+            if identifier in content:
+                return {'is_osiris': True, 'model': identifier.upper(), 'source': source}
+    return {'is_osiris': False, 'model': None, 'source': None}
+
+
+class HardwareProbe:
+    """
+    Description of a single independent detection probe
+
+    Essential probes are always waited for (up to their timeout); the rest
+    are abandoned as soon as a usable control method has been confirmed.
+    """
+
+    def __init__(self, name: str, func: Callable[[], Dict[str, Any]],
+                 timeout: float = HARDWARE_PROBE_TIMEOUT, essential: bool = True):
+        """
+        Initialize probe
+
+        Args:
+            name: Probe name used as key in the report
+            func: Callable returning the probe's result dictionary
+            timeout: Seconds the probe may take before it is abandoned
+            essential: Whether detection must wait for this probe
+        """
+        self.name = name
+        self.func = func
+        self.timeout = timeout
+        self.essential = essential
+
+
+DEFAULT_PROBES = [
+    HardwareProbe('osiris_identification', probe_osiris_identification),
+    HardwareProbe('sysfs_backlight', probe_sysfs_backlight),
+    HardwareProbe('ectool_presence', probe_ectool_presence),
+    HardwareProbe('ectool_version', probe_ectool_version, timeout=ECTOOL_TIMEOUT, essential=False),
+    HardwareProbe('permissions', probe_permissions, essential=False),
+]
+
+
+class ParallelHardwareProber:
+    """
+    Runs hardware probes concurrently on a small thread pool
+
+    Each probe gets its own deadline. Detection finishes as soon as every
+    essential probe has reported and some probe has confirmed a usable
+    control method, so cold-start detection costs roughly the latency of
+    the slowest essential probe instead of the sum of all probes.
+    """
+
+    def __init__(self, probes: Optional[List[HardwareProbe]] = None,
+                 max_workers: int = HARDWARE_PROBE_WORKERS,
+                 overall_timeout: float = HARDWARE_DETECTION_TIMEOUT,
+                 parent_logger: Optional[logging.Logger] = None):
+        """
+        Initialize prober
+
+        Args:
+            probes: Probes to run, defaults to DEFAULT_PROBES
+            max_workers: Thread pool size
+            overall_timeout: Hard upper bound for the whole detection
+            parent_logger: Parent logger instance
+        """
+        self.logger = (parent_logger.getChild('HardwareProber')
+                       if parent_logger else logging.getLogger('HardwareProber'))
+        self.probes = probes if probes is not None else DEFAULT_PROBES
+        self.max_workers = max_workers
+        self.overall_timeout = overall_timeout
+
+    @staticmethod
+    def _timed(probe: HardwareProbe, started: Dict[str, float]) -> Dict[str, Any]:
+        start_time = time.monotonic()
+        started[probe.name] = start_time
+        try:
+            result = probe.func()
+            status, error = 'ok', None
+        except Exception as e:
+            result, status, error = {}, 'error', str(e)
+        return {
+            'status': status,
+            'latency': time.monotonic() - start_time,
+            'result': result,
+            'error': error
+        }
+
+    def run(self) -> Dict[str, Any]:
+        """
+        Run all probes and assemble a structured detection report
+
+        Returns:
+            Dict[str, Any]: Per-probe status/latency plus derived hardware facts
+        """
+        start_time = time.monotonic()
+        overall_deadline = start_time + self.overall_timeout
+        reports: Dict[str, Dict[str, Any]] = {}
+        # Probe name -> time its worker picked it up; queued probes are absent
+        started: Dict[str, float] = {}
+        executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="HardwareProbe")
+        pending: Dict[Future, HardwareProbe] = {
+            executor.submit(self._timed, probe, started): probe for probe in self.probes
+        }
+        early_exit = False
+
+        def deadline(probe: HardwareProbe) -> float:
+            # A probe's own timeout only runs once it has left the queue
+            probe_start = started.get(probe.name)
+            if probe_start is None:
+                return overall_deadline
+            return min(probe_start + probe.timeout, overall_deadline)
+
+        try:
+            while pending:
+                now = time.monotonic()
+
+                # Expire probes that ran past their own or the overall deadline
+                for future, probe in list(pending.items()):
+                    if now >= deadline(probe):
+                        future.cancel()
+                        reports[probe.name] = {
+                            'status': 'timeout', 'latency': now - started.get(probe.name, start_time),
+                            'result': {}, 'error': f"timed out after {probe.timeout:.1f}s"
+                        }
+                        del pending[future]
+
+                if self._can_exit_early(reports, pending):
+                    early_exit = bool(pending)
+                    break
+                if not pending:
+                    break
+
+                next_deadline = min(deadline(p) for p in pending.values())
+                queued = [p.timeout for p in pending.values() if p.name not in started]
+                if queued:
+                    # Queued probes may start at any moment; recheck before
+                    # the earliest of them could expire
+                    next_deadline = min(next_deadline, now + min(queued))
+                done, _ = wait(pending, timeout=max(0.0, next_deadline - time.monotonic()),
+                               return_when=FIRST_COMPLETED)
+                for future in done:
+                    probe = pending.pop(future)
+                    reports[probe.name] = future.result()
+
+            for future, probe in pending.items():
+                future.cancel()
+                reports[probe.name] = {
+                    'status': 'skipped', 'latency': time.monotonic() - start_time,
+                    'result': {}, 'error': None
+                }
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        report = self._build_report(reports)
+        report['total_latency'] = time.monotonic() - start_time
+        report['early_exit'] = early_exit
+
+        self.logger.debug("Probe latencies: " + ", ".join(
+            f"{name}={data['latency'] * 1000:.0f}ms ({data['status']})"
+            for name, data in reports.items()))
+        return report
+
+    def _can_exit_early(self, reports: Dict[str, Dict[str, Any]],
+                        pending: Dict[Future, HardwareProbe]) -> bool:
+        """True once essential probes are done and a method is confirmed"""
+        if any(probe.essential for probe in pending.values()):
+            return False
+        return any(data['result'].get('usable_method') for data in reports.values())
+
+    @staticmethod
+    def _build_report(reports: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """Derive hardware facts from individual probe results"""
+        def result(name: str) -> Dict[str, Any]:
+            return reports.get(name, {}).get('result', {})
+
+        osiris = result('osiris_identification')
+        sysfs = result('sysfs_backlight')
+        is_osiris = osiris.get('is_osiris', False)
+
+        usable_methods = []
+        for data in reports.values():
+            method = data['result'].get('usable_method')
+            if method and method not in usable_methods:
+                usable_methods.append(method)
+
+        # ectool presence alone is enough to offer the method when the
+        # version probe was skipped by an early exit or timed out
+        ectool_path = result('ectool_version').get('path') or result('ectool_presence').get('path')
+        if ectool_path and 'ectool' not in usable_methods \
+                and reports.get('ectool_version', {}).get('status') != 'ok':
+            usable_methods.append('ectool')
+
+        preference_order = ['ec_direct', 'ectool'] if is_osiris else ['ectool', 'ec_direct']
+        preferred = next((m for m in preference_order if m in usable_methods), 'none')
+
+        return {
+            'osiris': {
+                'is_osiris': is_osiris,
+                'model': osiris.get('model'),
+                'keyboard_backlight_path': sysfs.get('path'),
+                'supported_methods': usable_methods
+            },
+            'sysfs_backlight_path': sysfs.get('path'),
+            'ectool_path': ectool_path,
+            'usable_methods': usable_methods,
+            'preferred_method': preferred,
+            'permissions': result('permissions'),
+            'probes': reports
+        }
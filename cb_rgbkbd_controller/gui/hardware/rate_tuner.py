@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""Adaptive update rate tuning driven by measured hardware write latency"""
+
+import time
+import logging
+import threading
+from collections import deque
+from typing import Callable, Deque, Dict, Any, List, Optional
+
+from ..core.constants import (
+    OSIRIS_KEY_COUNT, ADAPTIVE_RATE_MIN_HZ, ADAPTIVE_RATE_MAX_HZ,
+    ADAPTIVE_RATE_EWMA_ALPHA, ADAPTIVE_RATE_WINDOW_SIZE, ADAPTIVE_RATE_HEADROOM,
+    ADAPTIVE_RATE_ERROR_THRESHOLD, ADAPTIVE_RATE_SLOW_WRITE_THRESHOLD,
+    ADAPTIVE_RATE_PUBLISH_HYSTERESIS, ADAPTIVE_RATE_MIN_BATCH
+)
+
+RateListener = Callable[[float, int], None]
+
+
+class WriteLatencyStats:
+    """
+    Rolling write latency and error statistics
+
+    Keeps an exponentially weighted moving average of latency and error rate
+    alongside a bounded window of raw samples for percentile queries.
+    """
+
+    def __init__(self, alpha: float = ADAPTIVE_RATE_EWMA_ALPHA,
+                 window_size: int = ADAPTIVE_RATE_WINDOW_SIZE):
+        """
+        Initialize statistics
+
+        Args:
+            alpha: EWMA smoothing factor (0-1, higher reacts faster)
+            window_size: Number of latency samples kept for percentiles
+        """
+        self.alpha = alpha
+        self.ewma_latency = 0.0
+        self.ewma_error_rate = 0.0
+        self.sample_count = 0
+        self.error_count = 0
+        self._samples: Deque[float] = deque(maxlen=window_size)
+
+    def record(self, latency: float, success: bool):
+        """
+        Record a single write
+
+        Args:
+            latency: Per-key write latency in seconds
+            success: Whether the write succeeded
+        """
+        error = 0.0 if success else 1.0
+        if self.sample_count == 0:
+            self.ewma_latency = latency
+            self.ewma_error_rate = error
+        else:
+            self.ewma_latency += self.alpha * (latency - self.ewma_latency)
+            self.ewma_error_rate += self.alpha * (error - self.ewma_error_rate)
+
+        self.sample_count += 1
+        if not success:
+            self.error_count += 1
+        self._samples.append(latency)
+
+    def percentile(self, pct: float) -> float:
+        """
+        Get a latency percentile from the sample window
+
+        Args:
+            pct: Percentile (0-100)
+
+        Returns:
+            float: Latency in seconds, 0.0 if no samples were recorded
+        """
+        if not self._samples:
+            return 0.0
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Get statistics as a dictionary"""
+        return {
+            'samples': self.sample_count,
+            'errors': self.error_count,
+            'ewma_latency': self.ewma_latency,
+            'ewma_error_rate': self.ewma_error_rate,
+            'p50_latency': self.percentile(50),
+            'p95_latency': self.percentile(95),
+            'p99_latency': self.percentile(99)
+        }
+
+
+class AdaptiveRateController:
+    """
+    Chooses the fastest sustainable update rate and batch size
+
+    The rate is derived from the p95 per-key latency so that a batch fits
+    inside one frame interval with some headroom. key_count is the number
+    of keys a full frame needs: the whole keyboard on per-key backends, 1
+    on single-zone backends where a frame is a single write whatever its
+    size. When a full frame does not fit, the hardware writes batch_size
+    keys per cycle, never fewer than ADAPTIVE_RATE_MIN_BATCH, and catches
+    up over the following cycles. EC errors halve the rate (multiplicative
+    decrease) while healthy writes let it climb back towards the
+    sustainable value. Listeners, typically the effect scheduler,
+    are notified only when the chosen rate moves past a hysteresis band.
+    """
+
+    def __init__(self, base_rate: float, key_count: int = OSIRIS_KEY_COUNT,
+                 min_rate: float = ADAPTIVE_RATE_MIN_HZ,
+                 max_rate: float = ADAPTIVE_RATE_MAX_HZ,
+                 parent_logger: Optional[logging.Logger] = None):
+        """
+        Initialize rate controller
+
+        Args:
+            base_rate: Initial rate in Hz, usually the method's nominal rate
+            key_count: Keys in a full frame (1 for single-zone backends)
+            min_rate: Lowest rate the controller will fall back to
+            max_rate: Highest rate the controller will ever choose
+            parent_logger: Parent logger instance
+        """
+        self.logger = (parent_logger.getChild('AdaptiveRate')
+                       if parent_logger else logging.getLogger('AdaptiveRate'))
+
+        self._lock = threading.Lock()
+        self.stats = WriteLatencyStats()
+        self.key_count = key_count
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.effective_rate = self._clamp(base_rate or min_rate)
+        self.batch_size = key_count
+        self.degraded = False
+
+        self._published_rate = self.effective_rate
+        self._listeners: List[RateListener] = []
+
+    def _clamp(self, rate: float) -> float:
+        return max(self.min_rate, min(self.max_rate, rate))
+
+    def reset(self, base_rate: float, key_count: Optional[int] = None):
+        """
+        Discard collected samples and restart from a nominal rate
+
+        Args:
+            base_rate: New starting rate in Hz
+            key_count: Keys written per frame, unchanged if None
+        """
+        with self._lock:
+            self.stats = WriteLatencyStats()
+            if key_count is not None:
+                self.key_count = max(1, key_count)
+            self.effective_rate = self._clamp(base_rate or self.min_rate)
+            self.batch_size = self.key_count
+            self.degraded = False
+        self._publish(force=True)
+
+    def add_listener(self, listener: RateListener):
+        """
+        Register a callback invoked as listener(rate_hz, batch_size)
+
+        Args:
+            listener: Callback to notify when the chosen rate changes
+        """
+        with self._lock:
+            if listener not in self._listeners:
+                self._listeners.append(listener)
+        listener(self.effective_rate, self.batch_size)
+
+    def remove_listener(self, listener: RateListener):
+        """Unregister a rate listener"""
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def record_write(self, latency: float, success: bool, keys_written: int = 1):
+        """
+        Feed a completed hardware write into the tuner
+
+        Args:
+            latency: Wall time of the write in seconds
+            success: Whether the write succeeded
+            keys_written: Number of keys covered by the write
+        """
+        per_key_latency = latency / max(1, keys_written)
+
+        with self._lock:
+            self.stats.record(per_key_latency, success)
+            self._retune()
+
+        self._publish()
+
+    def _retune(self):
+        """Recompute rate and batch size from current statistics (lock held)"""
+        p95 = self.stats.percentile(95)
+        # Time of the smallest write cycle worth running: the whole frame on
+        # single-zone backends, a minimum batch of keys on per-key ones
+        frame_latency = p95 * min(self.key_count, ADAPTIVE_RATE_MIN_BATCH) * ADAPTIVE_RATE_HEADROOM
+
+        if self.stats.ewma_error_rate > ADAPTIVE_RATE_ERROR_THRESHOLD:
+            target = self.effective_rate * 0.5
+        elif frame_latency > 0:
+            sustainable = 1.0 / frame_latency
+            # Climb gradually so one fast sample cannot cause a burst of errors
+            target = min(sustainable, self.effective_rate * 1.1 + 0.5)
+        else:
+            target = self.effective_rate
+
+        was_degraded = self.degraded
+        # A single write, not a whole cycle, decides whether the EC is slow
+        self.degraded = p95 > ADAPTIVE_RATE_SLOW_WRITE_THRESHOLD
+        if self.degraded:
+            target = self.min_rate
+            if not was_degraded:
+                self.logger.warning(f"EC writes are slow (p95 {p95 * 1000:.2f} ms/write) - "
+                                    f"falling back to {self.min_rate:.1f} Hz")
+        elif was_degraded:
+            self.logger.info("EC write latency recovered - resuming adaptive rate")
+
+        self.effective_rate = self._clamp(target)
+
+        # Split the frame so that each write cycle fits in one interval
+        if p95 > 0:
+            budget = 1.0 / (self.effective_rate * ADAPTIVE_RATE_HEADROOM)
+            min_batch = min(self.key_count, ADAPTIVE_RATE_MIN_BATCH)
+            self.batch_size = max(min_batch, min(self.key_count, int(budget / p95)))
+        else:
+            self.batch_size = self.key_count
+
+    def _publish(self, force: bool = False):
+        """Notify listeners if the rate moved outside the hysteresis band"""
+        with self._lock:
+            rate = self.effective_rate
+            batch_size = self.batch_size
+            change = abs(rate - self._published_rate) / max(self._published_rate, 1e-6)
+            if not force and change < ADAPTIVE_RATE_PUBLISH_HYSTERESIS:
+                return
+            self._published_rate = rate
+            listeners = list(self._listeners)
+
+        self.logger.debug(f"Publishing update rate {rate:.1f} Hz (batch {batch_size})")
+        for listener in listeners:
+            try:
+                listener(rate, batch_size)
+            except Exception as e:
+                self.logger.error(f"Rate listener failed: {e}")
+
+    def get_min_interval(self) -> float:
+        """Get the minimum time between frame writes in seconds"""
+        return 1.0 / self.effective_rate
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get tuner state and latency statistics
+
+        Returns:
+            Dict[str, Any]: Rate, batch size and latency data
+        """
+        with self._lock:
+            stats = self.stats.to_dict()
+            stats.update({
+                'effective_rate': self.effective_rate,
+                'batch_size': self.batch_size,
+                'degraded': self.degraded,
+                'min_rate': self.min_rate,
+                'max_rate': self.max_rate,
+                'timestamp': time.time()
+            })
+            return stats
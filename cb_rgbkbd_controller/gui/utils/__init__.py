@@ -6,4 +6,5 @@ from .system_info import log_system_info, get_system_info_string, log_error_with
 from .decorators import safe_execute, CircuitBreaker
 from .input_validation import SafeInputValidation
 from .safe_subprocess import run_command
-__all__ = ['log_system_info', 'get_system_info_string', 'log_error_with_context', 'safe_execute', 'CircuitBreaker', 'SafeInputValidation', 'run_command']
\ No newline at end of file
+from .metrics import metrics_registry
+__all__ = ['log_system_info', 'get_system_info_string', 'log_error_with_context', 'safe_execute', 'CircuitBreaker', 'SafeInputValidation', 'run_command', 'metrics_registry']
\ No newline at end of file
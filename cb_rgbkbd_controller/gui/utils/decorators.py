@@ -2,6 +2,7 @@
 """Enhanced Decorators for RGB Controller with comprehensive error handling and performance monitoring"""
 
 import functools
+import random
 import time
 import threading
 import logging
@@ -12,6 +13,10 @@ from ..core.exceptions import (
     RGBControllerError, HardwareError, TimeoutError, CriticalError,
     log_error_context, should_retry_operation
 )
+from ..core.constants import (
+    CIRCUIT_BREAKER_THRESHOLD, CIRCUIT_BREAKER_TIMEOUT,
+    CIRCUIT_BREAKER_MAX_TIMEOUT, CIRCUIT_BREAKER_JITTER
+)
 
 
 def safe_execute(max_attempts: int = 3, severity: str = "error",
@@ -366,6 +371,188 @@ def deprecated(reason: str, version: str = "future",
     return decorator
 
 
+class CircuitBreaker:
+    """
+    Closed/open/half-open circuit breaker for hardware backends
+
+    While closed, calls pass through and consecutive failures are counted.
+    Reaching the threshold opens the breaker and every call is rejected
+    without touching the hardware. Once the backoff expires the breaker goes
+    half-open and lets exactly one probe call through: success closes it,
+    failure re-opens it with a doubled, jittered backoff.
+
+    Can be used directly via allow_request()/record_success()/record_failure()
+    or as a decorator, in which case rejected calls raise HardwareError.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str = "default",
+                 failure_threshold: int = CIRCUIT_BREAKER_THRESHOLD,
+                 reset_timeout: float = CIRCUIT_BREAKER_TIMEOUT,
+                 max_timeout: float = CIRCUIT_BREAKER_MAX_TIMEOUT,
+                 jitter: float = CIRCUIT_BREAKER_JITTER):
+        """
+        Initialize circuit breaker
+
+        Args:
+            name: Breaker name, usually the hardware method it guards
+            failure_threshold: Consecutive failures before opening
+            reset_timeout: Initial open period in seconds
+            max_timeout: Upper bound for the exponential backoff
+            jitter: Random +/- fraction applied to each backoff
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_timeout = max_timeout
+        self.jitter = jitter
+        self.logger = logging.getLogger(f"CircuitBreaker.{name}")
+
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._consecutive_failures = 0
+        self._consecutive_trips = 0
+        self._opened_at = 0.0
+        self._next_attempt_time = 0.0
+        self._probe_in_flight = False
+
+        self.counters: Dict[str, int] = {
+            'calls': 0,
+            'successes': 0,
+            'failures': 0,
+            'rejected': 0,
+            'trips': 0,
+            'probes': 0,
+            'probe_failures': 0
+        }
+
+    @property
+    def state(self) -> str:
+        """Current breaker state"""
+        with self._lock:
+            return self._state
+
+    @property
+    def is_open(self) -> bool:
+        """True while calls are being rejected"""
+        with self._lock:
+            return self._state == self.OPEN and time.monotonic() < self._next_attempt_time
+
+    @property
+    def next_attempt_time(self) -> float:
+        """Monotonic time at which the next probe will be allowed"""
+        with self._lock:
+            return self._next_attempt_time if self._state != self.CLOSED else 0.0
+
+    def allow_request(self) -> bool:
+        """
+        Check whether a call may proceed
+
+        Returns:
+            bool: True if the call should be attempted
+        """
+        with self._lock:
+            self.counters['calls'] += 1
+
+            if self._state == self.CLOSED:
+                return True
+
+            if self._state == self.OPEN and time.monotonic() >= self._next_attempt_time:
+                self._state = self.HALF_OPEN
+                self.logger.info(f"Circuit breaker '{self.name}' half-open - sending probe")
+
+            if self._state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                self.counters['probes'] += 1
+                return True
+
+            self.counters['rejected'] += 1
+            return False
+
+    def record_success(self):
+        """Record a successful call"""
+        with self._lock:
+            self.counters['successes'] += 1
+            self._consecutive_failures = 0
+
+            if self._state != self.CLOSED:
+                self.logger.info(f"Circuit breaker '{self.name}' closed - probe succeeded")
+                self._state = self.CLOSED
+                self._consecutive_trips = 0
+                self._probe_in_flight = False
+                self._next_attempt_time = 0.0
+
+    def record_failure(self):
+        """Record a failed call"""
+        with self._lock:
+            self.counters['failures'] += 1
+            self._consecutive_failures += 1
+
+            if self._state == self.HALF_OPEN:
+                self.counters['probe_failures'] += 1
+                self._probe_in_flight = False
+                self._trip()
+            elif self._state == self.CLOSED and self._consecutive_failures >= self.failure_threshold:
+                self._trip()
+
+    def _trip(self):
+        """Open the breaker with exponential backoff (lock held)"""
+        backoff = min(self.max_timeout, self.reset_timeout * (2 ** self._consecutive_trips))
+        backoff *= 1.0 + random.uniform(-self.jitter, self.jitter)
+
+        self._consecutive_trips += 1
+        self._state = self.OPEN
+        self._opened_at = time.monotonic()
+        self._next_attempt_time = self._opened_at + backoff
+        self.counters['trips'] += 1
+
+        self.logger.warning(f"Circuit breaker '{self.name}' opened after "
+                            f"{self._consecutive_failures} failures - retry in {backoff:.1f}s")
+
+    def reset(self):
+        """Force the breaker closed and clear the backoff"""
+        with self._lock:
+            self._state = self.CLOSED
+            self._consecutive_failures = 0
+            self._consecutive_trips = 0
+            self._probe_in_flight = False
+            self._next_attempt_time = 0.0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get breaker state and counters
+
+        Returns:
+            Dict[str, Any]: State, counters and time until next probe
+        """
+        with self._lock:
+            retry_in = max(0.0, self._next_attempt_time - time.monotonic()) if self._state == self.OPEN else 0.0
+            return {
+                'name': self.name,
+                'state': self._state,
+                'consecutive_failures': self._consecutive_failures,
+                'retry_in': retry_in,
+                **self.counters
+            }
+
+    def __call__(self, func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not self.allow_request():
+                raise HardwareError(f"Circuit breaker '{self.name}' is open", error_code="CIRCUIT_OPEN")
+            try:
+                result = func(*args, **kwargs)
+            except Exception:
+                self.record_failure()
+                raise
+            self.record_success()
+            return result
+        return wrapper
+
+
 # Global decorator instances for common use cases
 hardware_safe = safe_execute(
     max_attempts=2,
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""Persistent hardware detection cache keyed by a cheap system fingerprint"""
+
+import os
+import json
+import time
+import shutil
+import hashlib
+import logging
+import platform
+import threading
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+from ..core.constants import CACHE_DIR
+from .metrics import cache_requests
+
+DETECTION_CACHE_FILE = CACHE_DIR / 'hardware_detection.json'
+DETECTION_CACHE_VERSION = 1
+
+DMI_PRODUCT_NAME_PATH = Path('/sys/class/dmi/id/product_name')
+ECTOOL_CANDIDATE_PATHS = [
+    '/usr/local/bin/ectool',
+    '/usr/bin/ectool',
+    './ectool/build/src/ectool',
+    '../ectool/build/src/ectool'
+]
+
+
+def _read_dmi_product_name() -> str:
+    """Read the DMI product name without spawning a subprocess"""
+    try:
+        return DMI_PRODUCT_NAME_PATH.read_text().strip()
+    except OSError:
+        return ''
+
+
+def _ectool_signature() -> Dict[str, Any]:
+    """Locate ectool and return its path and mtime (no subprocess)"""
+    candidates = list(ECTOOL_CANDIDATE_PATHS)
+    which_path = shutil.which('ectool')
+    if which_path:
+        candidates.append(which_path)
+
+    for path in candidates:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        return {'path': os.path.abspath(path), 'mtime': stat.st_mtime_ns}
+
+    return {'path': None, 'mtime': None}
+
+
+def compute_hardware_fingerprint() -> str:
+    """
+    Compute a fingerprint of everything hardware detection depends on
+
+    Only reads a handful of files and stats, so it is cheap enough to run
+    on every launch before deciding whether detection results are stale.
+
+    Returns:
+        str: Hex digest identifying the current hardware/software setup
+    """
+    parts = {
+        'product_name': _read_dmi_product_name(),
+        'kernel': platform.release(),
+        'machine': platform.machine(),
+        'ectool': _ectool_signature()
+    }
+    encoded = json.dumps(parts, sort_keys=True).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class HardwareDetectionCache:
+    """
+    On-disk cache of hardware detection results
+
+    Entries are only returned when the stored fingerprint matches the
+    current system, so a kernel update, a different machine or a rebuilt
+    ectool binary automatically invalidate the cache.
+    """
+
+    def __init__(self, cache_file: Optional[Path] = None):
+        """
+        Initialize detection cache
+
+        Args:
+            cache_file: Optional custom cache file path
+        """
+        self.cache_file = Path(cache_file or DETECTION_CACHE_FILE)
+        self.logger = logging.getLogger('HardwareDetectionCache')
+        self._lock = threading.Lock()
+        self._fingerprint: Optional[str] = None
+        # Validated entry read from disk; None with _loaded set means a miss
+        self._entry: Optional[Dict[str, Any]] = None
+        self._loaded = False
+
+    @property
+    def fingerprint(self) -> str:
+        """Fingerprint of the running system, computed once per process"""
+        if self._fingerprint is None:
+            self._fingerprint = compute_hardware_fingerprint()
+        return self._fingerprint
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """
+        Load cached detection data for this system
+
+        The file is read and checked against the fingerprint once; later
+        calls reuse the result until update() or invalidate() runs.
+
+        Returns:
+            Optional[Dict[str, Any]]: Cached entry, or None on miss/mismatch
+        """
+        with self._lock:
+            if not self._loaded:
+                self._entry = self._read_entry()
+                self._loaded = True
+            return self._entry
+
+    def _read_entry(self) -> Optional[Dict[str, Any]]:
+        """Read the cache file and validate it against this system (lock held)"""
+        try:
+            with open(self.cache_file, 'r') as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Ignoring unreadable detection cache: {e}")
+            return None
+
+        if entry.get('version') != DETECTION_CACHE_VERSION:
+            return None
+        if entry.get('fingerprint') != self.fingerprint:
+            self.logger.info("Hardware fingerprint changed - detection cache invalidated")
+            return None
+
+        return entry
+
+    def get_section(self, section: str) -> Optional[Dict[str, Any]]:
+        """
+        Get one section ('hardware' or 'system_info') of a valid entry
+
+        Args:
+            section: Section name
+
+        Returns:
+            Optional[Dict[str, Any]]: Section data or None
+        """
+        entry = self.load()
+        data = entry.get(section) if entry else None
+        cache_requests.labels('detection', 'hit' if data is not None else 'miss').inc()
+        return data
+
+    def update(self, **sections: Dict[str, Any]) -> bool:
+        """
+        Merge sections into the cache entry and write it atomically
+
+        Args:
+            **sections: Section name to data, e.g. hardware={...}
+
+        Returns:
+            bool: True if the cache was written
+        """
+        entry = dict(self.load() or {})
+        entry.update(sections)
+        entry['version'] = DETECTION_CACHE_VERSION
+        entry['fingerprint'] = self.fingerprint
+        entry['timestamp'] = time.time()
+
+        with self._lock:
+            self._loaded = False
+            try:
+                self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+                tmp_file = self.cache_file.with_suffix('.tmp')
+                with open(tmp_file, 'w') as f:
+                    json.dump(entry, f, indent=2, default=str)
+                os.replace(tmp_file, self.cache_file)
+                return True
+            except OSError as e:
+                self.logger.warning(f"Could not write detection cache: {e}")
+                return False
+
+    def invalidate(self):
+        """Remove the cache file"""
+        with self._lock:
+            self._loaded = False
+            try:
+                self.cache_file.unlink()
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                self.logger.warning(f"Could not remove detection cache: {e}")
+
+
+# Global instance for convenience
+detection_cache = HardwareDetectionCache()
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""End-to-end frame latency instrumentation"""
+
+import time
+import bisect
+import itertools
+import threading
+from collections import deque
+from typing import Deque, Dict, Any, List, Optional
+
+from .metrics import MetricFamily, Sample, histogram_samples, metrics_registry
+
+FRAME_STAGES = ('render', 'compose', 'queue', 'write', 'total')
+
+# Bucket upper bounds in seconds: 0.1 ms to ~6.5 s, doubling each step
+LATENCY_BUCKETS = [0.0001 * (2 ** i) for i in range(17)]
+
+
+class FrameStamp:
+    """
+    Timing record carried by a single frame through the output pipeline
+
+    All times are time.monotonic() values; a stage left as None was not
+    reached (e.g. the frame was superseded in a latest-wins queue).
+    """
+
+    __slots__ = ('seq', 'render_start', 'composed', 'queued', 'write_start', 'written')
+
+    def __init__(self, seq: int):
+        self.seq = seq
+        self.render_start = time.monotonic()
+        self.composed: Optional[float] = None
+        self.queued: Optional[float] = None
+        self.write_start: Optional[float] = None
+        self.written: Optional[float] = None
+
+    def fork(self) -> 'FrameStamp':
+        """Copy the stamp so each output device can record its own write"""
+        stamp = FrameStamp.__new__(FrameStamp)
+        for name in self.__slots__:
+            setattr(stamp, name, getattr(self, name))
+        return stamp
+
+    def mark_composed(self):
+        self.composed = time.monotonic()
+
+    def mark_queued(self):
+        self.queued = time.monotonic()
+
+    def mark_write_start(self):
+        self.write_start = time.monotonic()
+
+    def mark_written(self):
+        self.written = time.monotonic()
+
+    def stage_latencies(self) -> Dict[str, float]:
+        """
+        Get the duration of each completed stage
+
+        Returns:
+            Dict[str, float]: Stage name to seconds
+        """
+        points = [('render', self.render_start, self.composed),
+                  ('compose', self.composed, self.queued),
+                  ('queue', self.queued, self.write_start),
+                  ('write', self.write_start, self.written),
+                  ('total', self.render_start, self.written)]
+        return {name: end - start for name, start, end in points
+                if start is not None and end is not None}
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram with approximate percentiles"""
+
+    def __init__(self, buckets: Optional[List[float]] = None):
+        """
+        Initialize histogram
+
+        Args:
+            buckets: Sorted bucket upper bounds in seconds
+        """
+        self.buckets = list(buckets or LATENCY_BUCKETS)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        """Record one latency in seconds"""
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, pct: float) -> float:
+        """
+        Estimate a percentile as the upper bound of its bucket
+
+        Args:
+            pct: Percentile (0-100)
+
+        Returns:
+            float: Latency in seconds, 0.0 if empty
+        """
+        if not self.count:
+            return 0.0
+        target = pct / 100.0 * self.count
+        running = 0
+        for index, bucket_count in enumerate(self.counts):
+            running += bucket_count
+            if running >= target:
+                return self.buckets[index] if index < len(self.buckets) else self.max
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Get histogram data as a dictionary"""
+        return {
+            'count': self.count,
+            'mean': self.total / self.count if self.count else 0.0,
+            'max': self.max,
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'p99': self.percentile(99),
+            'buckets': list(zip(self.buckets + [None], self.counts))
+        }
+
+
+class FrameLatencyTracker:
+    """
+    Collects per-stage latency histograms for frames reaching a device
+
+    Stamps are issued when rendering starts and handed back once a backend
+    finishes writing. Histograms are kept per output device as well as in
+    aggregate, so slow devices stand out.
+    """
+
+    def __init__(self, rate_window: int = 120):
+        """
+        Initialize tracker
+
+        Args:
+            rate_window: Completed frames kept for the delivered FPS estimate
+        """
+        self._lock = threading.Lock()
+        self._sequence = itertools.count(1)
+        self._completions: Deque[float] = deque(maxlen=rate_window)
+        self.reset()
+
+    def reset(self):
+        """Discard all recorded latencies"""
+        with self._lock:
+            self.stages = {stage: LatencyHistogram() for stage in FRAME_STAGES}
+            self.devices: Dict[str, Dict[str, LatencyHistogram]] = {}
+            self.frames_started = 0
+            self.frames_completed = 0
+            self.last_sequence = 0
+            self._completions.clear()
+
+    def new_frame(self) -> FrameStamp:
+        """Issue a stamp for a frame whose rendering starts now"""
+        stamp = FrameStamp(next(self._sequence))
+        with self._lock:
+            self.frames_started += 1
+        return stamp
+
+    def complete(self, stamp: FrameStamp, device: str = 'keyboard'):
+        """
+        Record a frame whose write has finished
+
+        Args:
+            stamp: Stamp issued by new_frame()
+            device: Output device that performed the write
+        """
+        latencies = stamp.stage_latencies()
+        with self._lock:
+            per_device = self.devices.get(device)
+            if per_device is None:
+                per_device = self.devices[device] = {stage: LatencyHistogram() for stage in FRAME_STAGES}
+            for stage, value in latencies.items():
+                self.stages[stage].observe(value)
+                per_device[stage].observe(value)
+            self.frames_completed += 1
+            self.last_sequence = max(self.last_sequence, stamp.seq)
+            if stamp.written is not None:
+                self._completions.append(stamp.written)
+
+    def get_delivered_fps(self) -> float:
+        """Get the rate at which frames recently reached devices"""
+        with self._lock:
+            if len(self._completions) < 2:
+                return 0.0
+            span = self._completions[-1] - self._completions[0]
+            return (len(self._completions) - 1) / span if span > 0 else 0.0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get per-stage latency histograms
+
+        Returns:
+            Dict[str, Any]: Aggregate and per-device histograms plus counters
+        """
+        fps = self.get_delivered_fps()
+        with self._lock:
+            return {
+                'frames_started': self.frames_started,
+                'frames_completed': self.frames_completed,
+                'last_sequence': self.last_sequence,
+                'delivered_fps': fps,
+                'stages': {stage: hist.to_dict() for stage, hist in self.stages.items()},
+                'devices': {device: {stage: hist.to_dict() for stage, hist in stages.items()}
+                            for device, stages in self.devices.items()}
+            }
+
+    def collect_metrics(self) -> List[MetricFamily]:
+        """
+        Export the stage histograms for the metrics registry
+
+        Stage 'render' is the frame render time and 'total' the output
+        latency from render start to a completed device write.
+
+        Returns:
+            List[MetricFamily]: Aggregate and per-device latency histograms
+        """
+        with self._lock:
+            stage_samples = []
+            for stage, hist in self.stages.items():
+                stage_samples.extend(histogram_samples(
+                    'rgbkbd_frame_stage_seconds', {'stage': stage},
+                    zip(hist.buckets + [None], hist.counts), hist.total))
+            device_samples = []
+            for device, stages in self.devices.items():
+                hist = stages['total']
+                device_samples.extend(histogram_samples(
+                    'rgbkbd_output_latency_seconds', {'device': device},
+                    zip(hist.buckets + [None], hist.counts), hist.total))
+            counters = [('rgbkbd_frames_started_total', 'Frames whose rendering started', self.frames_started),
+                        ('rgbkbd_frames_completed_total', 'Frame writes completed on any device',
+                         self.frames_completed)]
+        families = [
+            MetricFamily('rgbkbd_frame_stage_seconds', 'histogram',
+                         'Per-stage frame latency (render, compose, queue, write, total)', stage_samples),
+            MetricFamily('rgbkbd_output_latency_seconds', 'histogram',
+                         'Render start to completed write, per output device', device_samples),
+            MetricFamily('rgbkbd_delivered_fps', 'gauge', 'Rate at which frames recently reached devices',
+                         [Sample('rgbkbd_delivered_fps', {}, self.get_delivered_fps())]),
+        ]
+        families.extend(MetricFamily(name, 'counter', documentation, [Sample(name, {}, float(value))])
+                        for name, documentation, value in counters)
+        return families
+
+
+# Global instance for convenience
+frame_latency_tracker = FrameLatencyTracker()
+metrics_registry.register_collector('frame_latency', frame_latency_tracker.collect_metrics)
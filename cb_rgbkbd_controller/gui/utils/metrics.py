@@ -0,0 +1,477 @@
+#!/usr/bin/env python3
+"""
+Process-wide metrics registry with Prometheus text exposition
+
+Counters and histograms accumulate into one cell per writing thread, so
+the render loop and hardware writers update them without taking a lock
+or contending with each other; cells are only summed when the registry
+is read. State that already lives elsewhere (circuit breakers, frame
+latency histograms, process usage) is pulled in by collectors at read
+time instead of being mirrored on every update.
+"""
+
+import time
+import bisect
+import logging
+import threading
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows; process metrics are skipped there
+    resource = None
+
+METRICS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Bucket upper bounds in seconds: 0.1 ms to ~1.6 s, doubling each step
+DEFAULT_BUCKETS = [0.0001 * (2 ** i) for i in range(15)]
+
+
+class Sample(NamedTuple):
+    """One exposed value: full sample name, labels and value"""
+    name: str
+    labels: Dict[str, str]
+    value: float
+
+
+class MetricFamily(NamedTuple):
+    """A metric and its samples as produced by collect()"""
+    name: str
+    type: str
+    help: str
+    samples: List[Sample]
+
+
+class _ThreadCells:
+    """
+    Per-thread accumulators summed on read
+
+    Each thread only ever writes its own cell, so increments need no lock.
+    Cells of threads that have exited are folded into a retired total,
+    which keeps short-lived request threads from piling up.
+    """
+
+    def __init__(self, width: int):
+        self.width = width
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._cells: List[Tuple[threading.Thread, List[float]]] = []
+        self._retired = [0.0] * width
+
+    def cell(self) -> List[float]:
+        """Get the calling thread's cell"""
+        try:
+            return self._local.cell
+        except AttributeError:
+            cell = [0.0] * self.width
+            with self._lock:
+                self._fold_dead()
+                self._cells.append((threading.current_thread(), cell))
+            self._local.cell = cell
+            return cell
+
+    def _fold_dead(self):
+        live = []
+        for thread, cell in self._cells:
+            if thread.is_alive():
+                live.append((thread, cell))
+            else:
+                for i, value in enumerate(cell):
+                    self._retired[i] += value
+        self._cells = live
+
+    def totals(self) -> List[float]:
+        """Sum every thread's cell"""
+        with self._lock:
+            self._fold_dead()
+            totals = list(self._retired)
+            for _, cell in self._cells:
+                for i, value in enumerate(cell):
+                    totals[i] += value
+        return totals
+
+
+class _CounterChild:
+    def __init__(self):
+        self._cells = _ThreadCells(1)
+        self._local = self._cells._local
+
+    def inc(self, amount: float = 1.0):
+        try:
+            self._local.cell[0] += amount
+        except AttributeError:
+            self._cells.cell()[0] += amount
+
+    def get(self) -> float:
+        return self._cells.totals()[0]
+
+
+class _GaugeChild:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._value = 0.0
+        self._function: Optional[Callable[[], float]] = None
+
+    def set(self, value: float):
+        self._value = value
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1.0):
+        self.inc(-amount)
+
+    def set_function(self, function: Callable[[], float]):
+        """Read the gauge from a callable at collection time"""
+        self._function = function
+
+    def get(self) -> float:
+        function = self._function
+        return float(function()) if function is not None else self._value
+
+
+class _HistogramChild:
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = list(buckets)
+        # One slot per bucket, one for +Inf, then the running sum
+        self._cells = _ThreadCells(len(self.buckets) + 2)
+        self._local = self._cells._local
+
+    def observe(self, value: float):
+        try:
+            cell = self._local.cell
+        except AttributeError:
+            cell = self._cells.cell()
+        cell[bisect.bisect_left(self.buckets, value)] += 1
+        cell[-1] += value
+
+    def get(self) -> Tuple[List[float], float]:
+        """Get (non-cumulative bucket counts including +Inf, sum)"""
+        totals = self._cells.totals()
+        return totals[:-1], totals[-1]
+
+
+class _Metric:
+    type = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._children: Dict[Tuple[str, ...], object] = {}
+        if not self.labelnames:
+            self._default = self.labels()
+            # Unlabelled metrics update their only child directly
+            for method in ('inc', 'dec', 'set', 'observe', 'set_function'):
+                if hasattr(self._default, method):
+                    setattr(self, method, getattr(self._default, method))
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values) -> object:
+        """
+        Get the child for a set of label values
+
+        Callers on hot paths should look the child up once and keep it.
+
+        Args:
+            *values: One value per label name, in order
+
+        Returns:
+            object: Child metric supporting this metric's update methods
+        """
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {key}")
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _label_dict(self, key: Tuple[str, ...]) -> Dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    def _items(self):
+        with self._lock:
+            return list(self._children.items())
+
+    def collect(self) -> MetricFamily:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+
+    type = 'counter'
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0):
+        """Increment the unlabelled counter"""
+        self._default.inc(amount)
+
+    def collect(self) -> MetricFamily:
+        samples = [Sample(self.name, self._label_dict(key), child.get()) for key, child in self._items()]
+        return MetricFamily(self.name, self.type, self.documentation, samples)
+
+
+class Gauge(_Metric):
+    """Value that can go up and down"""
+
+    type = 'gauge'
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value: float):
+        """Set the unlabelled gauge"""
+        self._default.set(value)
+
+    def inc(self, amount: float = 1.0):
+        """Increase the unlabelled gauge"""
+        self._default.inc(amount)
+
+    def dec(self, amount: float = 1.0):
+        """Decrease the unlabelled gauge"""
+        self._default.dec(amount)
+
+    def set_function(self, function: Callable[[], float]):
+        """Read the unlabelled gauge from a callable at collection time"""
+        self._default.set_function(function)
+
+    def collect(self) -> MetricFamily:
+        samples = [Sample(self.name, self._label_dict(key), child.get()) for key, child in self._items()]
+        return MetricFamily(self.name, self.type, self.documentation, samples)
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in fixed buckets"""
+
+    type = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Optional[Sequence[float]] = None):
+        self.buckets = sorted(buckets or DEFAULT_BUCKETS)
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float):
+        """Record a value in the unlabelled histogram"""
+        self._default.observe(value)
+
+    def collect(self) -> MetricFamily:
+        samples = []
+        for key, child in self._items():
+            counts, total = child.get()
+            samples.extend(histogram_samples(self.name, self._label_dict(key),
+                                             zip(self.buckets + [float('inf')], counts), total))
+        return MetricFamily(self.name, self.type, self.documentation, samples)
+
+
+def histogram_samples(name: str, labels: Dict[str, str],
+                      buckets: Iterable[Tuple[Optional[float], float]], total: float) -> List[Sample]:
+    """
+    Build Prometheus histogram samples from per-bucket counts
+
+    Args:
+        name: Metric name
+        labels: Labels shared by every sample
+        buckets: (upper bound, count) pairs; None or inf marks the overflow bucket
+        total: Sum of observed values
+
+    Returns:
+        List[Sample]: Cumulative _bucket samples, then _sum and _count
+    """
+    samples = []
+    running = 0.0
+    for bound, count in buckets:
+        running += count
+        le = '+Inf' if bound is None or bound == float('inf') else _format_value(bound)
+        samples.append(Sample(f"{name}_bucket", {**labels, 'le': le}, running))
+    samples.append(Sample(f"{name}_sum", labels, total))
+    samples.append(Sample(f"{name}_count", labels, running))
+    return samples
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    if value == float('-inf'):
+        return '-Inf'
+    if value != value:
+        return 'NaN'
+    if float(value).is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape_label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _sample_key(sample: Sample) -> str:
+    if not sample.labels:
+        return sample.name
+    labels = ','.join(f'{name}="{_escape_label(value)}"' for name, value in sample.labels.items())
+    return f"{sample.name}{{{labels}}}"
+
+
+class MetricsRegistry:
+    """
+    Named metrics plus collectors, read as Prometheus text or a flat snapshot
+
+    Metric constructors are idempotent, so modules can declare the metrics
+    they update at import time without coordinating.
+    """
+
+    def __init__(self, parent_logger: Optional[logging.Logger] = None):
+        """
+        Initialize metrics registry
+
+        Args:
+            parent_logger: Parent logger instance
+        """
+        self.logger = (parent_logger.getChild('MetricsRegistry')
+                       if parent_logger else logging.getLogger('MetricsRegistry'))
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: Dict[str, Callable[[], Iterable[MetricFamily]]] = {}
+
+    def _get_or_create(self, cls, name: str, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} already registered as a {metric.type}")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """Get or create a counter"""
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        """Get or create a gauge"""
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Optional[Sequence[float]] = None) -> Histogram:
+        """Get or create a histogram"""
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def register_collector(self, key: str, collector: Callable[[], Iterable[MetricFamily]]):
+        """
+        Add a callable producing metric families at read time
+
+        Args:
+            key: Collector name; registering the same key again replaces it
+            collector: Callable returning MetricFamily instances
+        """
+        with self._lock:
+            self._collectors[key] = collector
+
+    def unregister_collector(self, key: str):
+        """Remove a collector"""
+        with self._lock:
+            self._collectors.pop(key, None)
+
+    def collect(self) -> List[MetricFamily]:
+        """
+        Read every metric and collector
+
+        Returns:
+            List[MetricFamily]: Families with their current samples
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors.items())
+        families = [metric.collect() for metric in metrics]
+        for key, collector in collectors:
+            try:
+                families.extend(collector())
+            except Exception as e:
+                # A broken source must not take the whole endpoint down
+                families.append(MetricFamily('rgbkbd_collector_errors', 'gauge',
+                                             'Collectors that raised on the last read',
+                                             [Sample('rgbkbd_collector_errors', {'collector': key}, 1.0)]))
+                self.logger.debug(f"Collector {key} failed: {e}")
+        return families
+
+    def render(self) -> str:
+        """
+        Render all metrics in the Prometheus text exposition format
+
+        Returns:
+            str: Exposition text
+        """
+        lines = []
+        for family in self.collect():
+            lines.append(f"# HELP {family.name} {family.help}")
+            lines.append(f"# TYPE {family.name} {family.type}")
+            for sample in family.samples:
+                lines.append(f"{_sample_key(sample)} {_format_value(sample.value)}")
+        return '\n'.join(lines) + '\n'
+
+    def snapshot(self) -> Dict[str, float]:
+        """
+        Get every sample as a flat dictionary
+
+        Keys use the exposition form, e.g. 'name{label="value"}', so the
+        same names appear in /metrics, the diagnostics export and the GUI.
+
+        Returns:
+            Dict[str, float]: Sample key to value
+        """
+        return {_sample_key(sample): sample.value
+                for family in self.collect() for sample in family.samples}
+
+
+_START_TIME = time.time()
+
+
+def collect_process_metrics() -> List[MetricFamily]:
+    """
+    Report CPU time, resident memory and thread count of this process
+
+    Reads /proc/self where available and falls back to getrusage().
+
+    Returns:
+        List[MetricFamily]: Standard process_* families
+    """
+    if resource is None:
+        return []
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    cpu_seconds = usage.ru_utime + usage.ru_stime
+    try:
+        with open('/proc/self/statm') as f:
+            rss_bytes = int(f.read().split()[1]) * resource.getpagesize()
+    except (OSError, IndexError, ValueError):
+        # ru_maxrss is the peak, in KiB on Linux
+        rss_bytes = usage.ru_maxrss * 1024
+
+    def family(name, kind, documentation, value):
+        return MetricFamily(name, kind, documentation, [Sample(name, {}, float(value))])
+
+    return [
+        family('process_cpu_seconds_total', 'counter', 'Total user and system CPU time in seconds', cpu_seconds),
+        family('process_resident_memory_bytes', 'gauge', 'Resident memory size in bytes', rss_bytes),
+        family('process_start_time_seconds', 'gauge', 'Start time of the process since the epoch', _START_TIME),
+        family('process_threads', 'gauge', 'Number of Python threads', threading.active_count()),
+    ]
+
+
+# Global instance for convenience
+metrics_registry = MetricsRegistry()
+metrics_registry.register_collector('process', collect_process_metrics)
+
+# Lookups against the caches the render and API paths rely on
+cache_requests = metrics_registry.counter(
+    'rgbkbd_cache_requests_total', 'Cache lookups by cache and result', ('cache', 'result'))
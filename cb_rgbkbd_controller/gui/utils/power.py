@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""Power supply state sampling from /sys/class/power_supply"""
+
+import logging
+import threading
+from pathlib import Path
+from typing import Callable, List, NamedTuple, Optional
+
+from ..core.constants import (
+    POWER_SUPPLY_PATH, POWER_SAMPLE_INTERVAL, POWER_LOW_BATTERY_THRESHOLD
+)
+
+
+class PowerState(NamedTuple):
+    """Snapshot of the machine's power source"""
+    on_battery: bool
+    capacity: Optional[int]
+    status: str
+    low_battery: bool
+
+    @property
+    def power_saving(self) -> bool:
+        """True when output should be throttled"""
+        return self.on_battery or self.low_battery
+
+
+AC_POWER = PowerState(on_battery=False, capacity=None, status='Unknown', low_battery=False)
+
+PowerListener = Callable[[PowerState], None]
+
+
+def _read_attr(supply: Path, name: str) -> Optional[str]:
+    try:
+        return (supply / name).read_text().strip()
+    except OSError:
+        return None
+
+
+def read_power_state(root: Path = Path(POWER_SUPPLY_PATH),
+                     low_battery_threshold: int = POWER_LOW_BATTERY_THRESHOLD) -> PowerState:
+    """
+    Read the current power source from sysfs
+
+    Machines without a battery, or where sysfs is unreadable, report AC.
+
+    Args:
+        root: power_supply class directory
+        low_battery_threshold: Capacity (%) below which the battery is low
+
+    Returns:
+        PowerState: Current power state
+    """
+    try:
+        supplies = sorted(root.iterdir())
+    except OSError:
+        return AC_POWER
+
+    ac_online = False
+    capacity: Optional[int] = None
+    status = 'Unknown'
+
+    for supply in supplies:
+        supply_type = _read_attr(supply, 'type')
+        if supply_type == 'Battery':
+            if _read_attr(supply, 'present') == '0':
+                continue
+            value = _read_attr(supply, 'capacity')
+            if value and value.isdigit():
+                capacity = int(value)
+            status = _read_attr(supply, 'status') or status
+        elif supply_type in ('Mains', 'USB', 'USB_C', 'USB_PD'):
+            if _read_attr(supply, 'online') == '1':
+                ac_online = True
+
+    if capacity is None and status == 'Unknown':
+        return AC_POWER
+
+    on_battery = not ac_online and status != 'Charging' and status != 'Full'
+    low_battery = capacity is not None and capacity < low_battery_threshold
+    return PowerState(on_battery=on_battery, capacity=capacity, status=status, low_battery=low_battery)
+
+
+class PowerMonitor:
+    """
+    Samples the power state in the background and reports transitions
+
+    Reading sysfs every few seconds is negligible; listeners are only
+    called when the state actually changes, so consumers never poll.
+    """
+
+    def __init__(self, interval: float = POWER_SAMPLE_INTERVAL,
+                 low_battery_threshold: int = POWER_LOW_BATTERY_THRESHOLD,
+                 root: Path = Path(POWER_SUPPLY_PATH),
+                 parent_logger: Optional[logging.Logger] = None):
+        """
+        Initialize power monitor
+
+        Args:
+            interval: Seconds between samples
+            low_battery_threshold: Capacity (%) below which the battery is low
+            root: power_supply class directory
+            parent_logger: Parent logger instance
+        """
+        self.logger = (parent_logger.getChild('PowerMonitor')
+                       if parent_logger else logging.getLogger('PowerMonitor'))
+        self.interval = interval
+        self.low_battery_threshold = low_battery_threshold
+        self.root = root
+        self._lock = threading.Lock()
+        self._listeners: List[PowerListener] = []
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.state = read_power_state(root, low_battery_threshold)
+
+    def add_listener(self, listener: PowerListener):
+        """
+        Register a callback for power state changes and start sampling
+
+        The listener is called immediately with the current state.
+
+        Args:
+            listener: Callback receiving the new PowerState
+        """
+        with self._lock:
+            if listener not in self._listeners:
+                self._listeners.append(listener)
+            if self._thread is None or not self._thread.is_alive():
+                self._stop_event.clear()
+                self._thread = threading.Thread(target=self._run, name="PowerMonitor", daemon=True)
+                self._thread.start()
+        listener(self.state)
+
+    def remove_listener(self, listener: PowerListener):
+        """Unregister a power state listener"""
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def stop(self):
+        """Stop background sampling"""
+        self._stop_event.set()
+
+    def sample(self) -> PowerState:
+        """
+        Read the power state now and notify listeners if it changed
+
+        Returns:
+            PowerState: Current power state
+        """
+        state = read_power_state(self.root, self.low_battery_threshold)
+        with self._lock:
+            changed = ((state.on_battery, state.low_battery, state.status) !=
+                       (self.state.on_battery, self.state.low_battery, self.state.status))
+            self.state = state
+            listeners = list(self._listeners) if changed else []
+
+        if changed:
+            self.logger.info(f"Power state changed: {state.status}, "
+                             f"capacity {state.capacity if state.capacity is not None else '?'}%, "
+                             f"power saving {'on' if state.power_saving else 'off'}")
+        for listener in listeners:
+            try:
+                listener(state)
+            except Exception as e:
+                self.logger.error(f"Power listener failed: {e}")
+        return state
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            self.sample()
+
+
+# Global instance for convenience
+power_monitor = PowerMonitor()
@@ -11,6 +11,7 @@ from pathlib import Path
 from ..core.exceptions import ResourceError, ValidationError
 from .decorators import safe_execute, performance_monitor
 from .safe_subprocess import run_command
+from .detection_cache import detection_cache
 
 
 class SystemInfo:
@@ -26,6 +27,23 @@ class SystemInfo:
         self.logger = logging.getLogger(f"{__name__}.SystemInfo")
         self._cache = {}
         self._cache_valid = False
+        self.loaded_from_disk = self._load_persistent_cache()
+
+    def _load_persistent_cache(self) -> bool:
+        """
+        Seed the in-memory cache from the on-disk detection cache
+
+        Returns:
+            bool: True if cached system information was loaded
+        """
+        cached = detection_cache.get_section('system_info')
+        if not cached:
+            return False
+
+        self._cache = cached
+        self._cache_valid = True
+        self.logger.debug("System information loaded from detection cache")
+        return True
 
     @safe_execute(max_attempts=1, severity="warning", fallback_return={})
     @performance_monitor(log_performance=False)
@@ -228,6 +246,10 @@ def is_compatible_system() -> bool:
 
 def get_recommended_hardware_method() -> Optional[str]:
     """Get recommended hardware control method for this system"""
+    cached = detection_cache.get_section('hardware')
+    if cached and cached.get('active_control_method') not in (None, 'none'):
+        return cached['active_control_method']
+
     methods = system_info.get_supported_hardware_methods()
 
     # Prefer EC Direct for OSIRIS hardware
@@ -0,0 +1,111 @@
+"""MQTT bridge against the in-process LocalBroker (the --loopback harness)"""
+
+import time
+
+import pytest
+
+from cb_rgbkbd_controller.gui.api.mqtt import LocalBroker, MQTTBridge, TopicTrie, main, resolve_zones
+from cb_rgbkbd_controller.gui.core.rgb_color import RGBColor
+from cb_rgbkbd_controller.gui.hardware.fanout import OutputFanout, VirtualOutputDevice
+
+FRAME_WINDOW = 0.05
+MAPPINGS = {'rgb/wasd': [1, 2, 3, 4], 'rgb/numpad': [17, 18, 19, 20], 'rgb/all/+': [5, 6]}
+
+
+@pytest.fixture
+def loopback():
+    fanout = OutputFanout()
+    preview = VirtualOutputDevice("Loopback", rate_hz=1000.0)
+    fanout.add_device(preview)
+    fanout.start()
+    broker = LocalBroker()
+    bridge = MQTTBridge(fanout, MAPPINGS, client_factory=broker.client, frame_window=FRAME_WINDOW)
+    bridge.listen('rgb/#')
+    assert bridge.start()
+    yield broker, bridge, preview
+    bridge.stop()
+    fanout.stop()
+
+
+def _drain(bridge, preview, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if not bridge._pending and preview.frames_written >= bridge.frames_submitted:
+            break
+        time.sleep(FRAME_WINDOW / 5)
+    time.sleep(FRAME_WINDOW * 2)
+
+
+def _keys(pattern):
+    return resolve_zones(MAPPINGS[pattern])
+
+
+def test_loopback_main(capsys):
+    assert main(['--loopback']) == 0
+    assert 'mapped keys match' in capsys.readouterr().out
+
+
+def test_trie_matches_wildcards():
+    trie = TopicTrie()
+    for pattern in ('rgb/wasd', 'rgb/+', 'rgb/#', '#', '+/+/zone', '$SYS/#'):
+        trie.add(pattern, pattern)
+
+    assert sorted(trie.match('rgb/wasd')) == ['#', 'rgb/#', 'rgb/+', 'rgb/wasd']
+    assert sorted(trie.match('rgb')) == ['#', 'rgb/#']
+    assert sorted(trie.match('rgb/a/zone')) == ['#', '+/+/zone', 'rgb/#']
+    # Wildcards at the first level never match $ topics
+    assert trie.match('$SYS/load') == ['$SYS/#']
+    assert trie.remove('rgb/+')
+    assert 'rgb/+' not in trie.match('rgb/wasd')
+
+
+def test_mapped_topic_round_trip(loopback):
+    broker, bridge, preview = loopback
+    broker.publish('rgb/wasd', '#00ff00')
+    broker.publish('rgb/all/left', '#0000ff')
+    broker.publish('rgb/unmapped', '#ffffff')
+    _drain(bridge, preview)
+
+    assert all(preview.last_frame[key] == RGBColor(0, 255, 0) for key in _keys('rgb/wasd'))
+    assert all(preview.last_frame[key] == RGBColor(0, 0, 255) for key in _keys('rgb/all/+'))
+    assert bridge.messages_unmapped == 1
+
+
+def test_burst_coalesces_into_few_writes(loopback):
+    broker, bridge, preview = loopback
+    topics = ['rgb/wasd', 'rgb/numpad']
+    start = time.monotonic()
+    for index in range(1000):
+        broker.publish(topics[index % 2], f"#{index % 256:02x}00{index // 256:02x}")
+    _drain(bridge, preview)
+    elapsed = time.monotonic() - start
+
+    # At most one frame per window, plus the leading edge
+    max_writes = int(elapsed / FRAME_WINDOW) + 2
+    assert bridge.messages_received == 1000
+    assert bridge.frames_submitted <= max_writes
+    assert preview.frames_written <= bridge.frames_submitted
+    stats = bridge.get_stats()
+    assert (stats['messages_applied'] + stats['messages_coalesced'] + stats['messages_dropped']
+            == 1000)
+    # The newest message of each topic wins
+    assert preview.last_frame[_keys('rgb/wasd')[0]] == RGBColor(998 % 256, 0, 998 // 256)
+    assert preview.last_frame[_keys('rgb/numpad')[0]] == RGBColor(999 % 256, 0, 999 // 256)
+
+
+def test_repeat_is_dropped_until_overwritten(loopback):
+    broker, bridge, preview = loopback
+    key = _keys('rgb/wasd')[0]
+    broker.publish('rgb/wasd', '#ff0000')
+    _drain(bridge, preview)
+    broker.publish('rgb/wasd', '#ff0000')
+    _drain(bridge, preview)
+    assert bridge.messages_dropped == 1
+
+    # Another topic paints over the key; the same payload must apply again
+    broker.publish('rgb/keys', f'{{"zones": {{"{key + 1}": "#0000ff"}}}}')
+    _drain(bridge, preview)
+    broker.publish('rgb/wasd', '#ff0000')
+    _drain(bridge, preview)
+    assert bridge.messages_dropped == 1
+    assert preview.last_frame[key] == RGBColor(255, 0, 0)
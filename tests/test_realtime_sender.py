@@ -0,0 +1,103 @@
+"""DDP/E1.31 receiver driven by the realtime-sender harness"""
+
+import socket
+import time
+
+import pytest
+
+from cb_rgbkbd_controller.gui.api.realtime import (
+    RealtimeReceiver, build_ddp_packet, build_e131_packet, is_late, main, _test_pattern
+)
+from cb_rgbkbd_controller.gui.core.constants import OSIRIS_KEY_COUNT
+from cb_rgbkbd_controller.gui.hardware.fanout import OutputFanout, VirtualOutputDevice
+
+
+@pytest.fixture
+def loopback():
+    fanout = OutputFanout()
+    preview = VirtualOutputDevice("Loopback", rate_hz=1000.0)
+    fanout.add_device(preview)
+    fanout.start()
+    receiver = RealtimeReceiver(fanout, host='127.0.0.1', ddp_port=0, e131_port=0)
+    assert receiver.start()
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def send(protocol, packet):
+        sock.sendto(packet, ('127.0.0.1', receiver.bound_ports[protocol]))
+
+    yield receiver, preview, send
+    sock.close()
+    receiver.stop()
+    fanout.stop()
+
+
+def _settle(receiver, packets, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while receiver.packets_received < packets and time.monotonic() < deadline:
+        time.sleep(0.01)
+    time.sleep(0.05)
+
+
+def _packed(frame):
+    return bytes(component for color in frame for component in color.to_tuple())
+
+
+@pytest.mark.parametrize('protocol', ['ddp', 'e131'])
+def test_sender_loopback_main(protocol, capsys):
+    assert main(['--loopback', '--protocol', protocol, '--frames', '60', '--fps', '0']) == 0
+    assert 'final frame matches' in capsys.readouterr().out
+
+
+def test_is_late_window():
+    assert not is_late(5, None, 16, 8)
+    assert is_late(5, 5, 16, 8)
+    assert is_late(3, 5, 16, 8)
+    assert not is_late(6, 5, 16, 8)
+    # Wrap-around: 1 follows 15
+    assert not is_late(1, 15, 16, 8)
+
+
+def test_ddp_round_trip_and_late_drop(loopback):
+    receiver, preview, send = loopback
+    newer = _test_pattern(5, OSIRIS_KEY_COUNT)
+    older = _test_pattern(3, OSIRIS_KEY_COUNT)
+    send('ddp', build_ddp_packet(newer, sequence=5))
+    _settle(receiver, 1)
+    send('ddp', build_ddp_packet(older, sequence=3))
+    _settle(receiver, 2)
+
+    assert receiver.frames_submitted == 1
+    assert receiver.packets_late == 1
+    assert _packed(preview.last_frame) == newer
+
+
+def test_ddp_split_frame_waits_for_push(loopback):
+    receiver, preview, send = loopback
+    pixels = _test_pattern(7, OSIRIS_KEY_COUNT)
+    half = len(pixels) // 2
+    send('ddp', build_ddp_packet(pixels[:half], sequence=1, push=False))
+    send('ddp', build_ddp_packet(pixels[half:], sequence=2, offset=half, push=True))
+    _settle(receiver, 2)
+
+    assert receiver.frames_submitted == 1
+    assert _packed(preview.last_frame) == pixels
+
+
+def test_e131_round_trip_and_late_drop(loopback):
+    receiver, preview, send = loopback
+    newer = _test_pattern(40, OSIRIS_KEY_COUNT)
+    send('e131', build_e131_packet(newer, sequence=40))
+    _settle(receiver, 1)
+    send('e131', build_e131_packet(_test_pattern(30, OSIRIS_KEY_COUNT), sequence=30))
+    _settle(receiver, 2)
+
+    assert receiver.packets_late == 1
+    assert _packed(preview.last_frame) == newer
+
+
+def test_invalid_packets_are_counted(loopback):
+    receiver, _, send = loopback
+    send('e131', b'not an e131 packet')
+    _settle(receiver, 1)
+    assert receiver.packets_invalid == 1
+    assert receiver.frames_submitted == 0
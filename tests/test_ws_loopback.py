@@ -0,0 +1,100 @@
+"""Frame stream codec and the ws-loopback harness against both API servers"""
+
+import pytest
+
+from cb_rgbkbd_controller.gui.core.frame_codec import (
+    FRAME_BYTES, STREAM_FORMAT_RAW, STREAM_FORMAT_VERSIONED, StreamCodec, decode_frame
+)
+
+STREAM_MODES = [(STREAM_FORMAT_VERSIONED, True), (STREAM_FORMAT_VERSIONED, False),
+                (STREAM_FORMAT_RAW, False)]
+
+
+def _frame(step: int) -> bytes:
+    data = bytearray(FRAME_BYTES)
+    key = step % (FRAME_BYTES // 3)
+    data[key * 3:key * 3 + 3] = bytes((step % 256, 255, 0))
+    return bytes(data)
+
+
+@pytest.mark.parametrize('stream_format,delta', STREAM_MODES)
+def test_codec_round_trip(stream_format, delta):
+    sender = StreamCodec(stream_format, delta)
+    receiver = StreamCodec(stream_format, delta)
+    for step in range(50):
+        assert receiver.decode(sender.encode(_frame(step))) == _frame(step)
+
+
+def test_codec_first_frame_is_whole():
+    codec = StreamCodec(STREAM_FORMAT_VERSIONED, delta=True)
+    first = codec.encode(_frame(1))
+    # Decodes without any base, so a fresh receiver can always start
+    assert decode_frame(first) == _frame(1)
+
+
+def test_raw_codec_sends_bare_frames():
+    codec = StreamCodec(STREAM_FORMAT_RAW, delta=True)
+    assert not codec.delta
+    assert codec.encode(_frame(3)) == _frame(3)
+
+
+def test_codec_rejects_wrong_size_and_unknown_format():
+    with pytest.raises(ValueError):
+        StreamCodec(STREAM_FORMAT_RAW).decode(b'\x00' * 12)
+    with pytest.raises(ValueError):
+        StreamCodec('bogus')
+    with pytest.raises(ValueError):
+        StreamCodec.from_params({'format': 'bogus'})
+
+
+def test_codec_from_params():
+    codec = StreamCodec.from_params({'delta': '1'})
+    assert codec.format == STREAM_FORMAT_VERSIONED and codec.delta
+    assert StreamCodec.from_params({'format': 'raw', 'delta': '1'}).query() == 'format=raw&delta=0'
+
+
+@pytest.fixture(params=['flask', 'async'])
+def stream_url(request):
+    pytest.importorskip('simple_websocket')
+    from cb_rgbkbd_controller.gui.api.websocket import WEBSOCKET_PATH
+    if request.param == 'flask':
+        pytest.importorskip('flask_sock')
+        from cb_rgbkbd_controller.gui.api.server import APIServer
+        server = APIServer(host='127.0.0.1', port=0)
+    else:
+        from cb_rgbkbd_controller.gui.api.async_server import AsyncAPIServer
+        server = AsyncAPIServer(host='127.0.0.1', port=0)
+    assert server.start()
+    yield f"ws://127.0.0.1:{server.bound_port}{WEBSOCKET_PATH}"
+    server.stop()
+
+
+@pytest.mark.parametrize('stream_format,delta', STREAM_MODES)
+def test_loopback_echoes_every_frame(stream_url, stream_format, delta):
+    from cb_rgbkbd_controller.gui.api.websocket import run_loopback
+    stats = run_loopback(stream_url, 100, delta=delta, stream_format=stream_format)
+    assert stats['frames'] == 100
+    assert stats['mismatches'] == 0
+
+
+def test_loopback_versioned_is_smaller_than_raw(stream_url):
+    from cb_rgbkbd_controller.gui.api.websocket import run_loopback
+    versioned = run_loopback(stream_url, 50, delta=True)
+    raw = run_loopback(stream_url, 50, delta=False, stream_format=STREAM_FORMAT_RAW)
+    assert raw['bytes_sent'] == 50 * FRAME_BYTES
+    assert versioned['bytes_sent'] < raw['bytes_sent']
+
+
+def test_unknown_format_closes_connection(stream_url):
+    import simple_websocket
+    client = simple_websocket.Client.connect(f"{stream_url}?format=bogus")
+    with pytest.raises(simple_websocket.ConnectionClosed):
+        client.receive(timeout=2.0)
+
+
+def test_ws_loopback_main():
+    pytest.importorskip('simple_websocket')
+    pytest.importorskip('flask_sock')
+    from cb_rgbkbd_controller.gui.api.websocket import main
+    assert main(['--frames', '50']) == 0
+    assert main(['--frames', '50', '--format', STREAM_FORMAT_RAW]) == 0